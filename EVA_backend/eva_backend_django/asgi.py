@@ -59,6 +59,8 @@ async def initialize_services():
             logger.info("准备初始化 Memory 服务 ...")
             from memory_service_app.utils.central_executive import central_executive
             await central_executive.initialize()
+            from memory_service_app.utils.conversation_writer import conversation_writer
+            await conversation_writer.start()
             logger.info("✅ Memory 服务初始化完成")
             
             break  # 如果成功，跳出循环
@@ -83,6 +85,13 @@ async def lifespan_app(scope, receive, send):
                 await initialize_services()
                 await send({"type": "lifespan.startup.complete"})
             elif message["type"] == "lifespan.shutdown":
+                # 先写完排队中的对话，再关闭 SecondMe 连接
+                from memory_service_app.utils.conversation_writer import conversation_writer
+                await conversation_writer.close()
+                from memory_service_app.utils.central_executive import central_executive
+                await central_executive.memory_adapter.close()
+                from llm_manager_app.utils.llm_service import llm_service
+                await llm_service.close()
                 from memory_service_app.utils.redis_client import close_redis
                 await close_redis()
                 await send({"type": "lifespan.shutdown.complete"})
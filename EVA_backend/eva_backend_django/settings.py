@@ -170,6 +170,7 @@ MEDIA_ROOT = Path(str(safe_config('MEDIA_ROOT', default='/app/media')))
 TTS_OUTPUT_DIR = Path(str(safe_config('TTS_OUTPUT_DIR', default='/app/media/tts_output')))
 USE_CHAT_TTS = safe_config("USE_CHAT_TTS", default=True, cast=bool)
 TTS_URL_PREFIX = f"{MEDIA_URL}tts_output/"
+TTS_CACHE_MAX_BYTES = safe_config("TTS_CACHE_MAX_BYTES", default=200 * 1024 * 1024, cast=int)
 
 MEMORY_CONSOLIDATION_HOURS = safe_config('MEMORY_CONSOLIDATION_HOURS', default=24, cast=int)
 MEMORY_RETENTION_THRESHOLD = safe_config('MEMORY_RETENTION_THRESHOLD', default=0.6, cast=float)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+LLM 客户端 HTTP 会话复用微基准
+
+在本地启动一个立即返回的 OpenAI 兼容桩服务，对比：
+- 每次请求新建 aiohttp.ClientSession（原先 DeepSeekClient._call_api 的做法）
+- LLMClient 的共享连接池会话（当前实现）
+
+桩服务不做任何计算，两者的耗时差即会话创建与 TCP 建连的开销；
+真实服务还需要 TLS 握手，实际差距更大。
+
+用法（在 EVA_backend 目录下）：
+    python -m llm_manager_app.bench_llm_session [--requests 500] [--concurrency 1]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Awaitable, Callable, List
+
+import aiohttp
+from django.conf import settings
+
+COMPLETION = json.dumps({
+    "id": "chatcmpl-stub",
+    "object": "chat.completion",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+}).encode("utf-8")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """立即返回固定结果的 chat/completions 桩服务（HTTP/1.1 长连接）"""
+
+    protocol_version = "HTTP/1.1"
+    # 响应头和响应体一次写出，避免小包分开发送时触发延迟确认
+    wbufsize = 1 << 16
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(COMPLETION)))
+        self.end_headers()
+        self.wfile.write(COMPLETION)
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def measure(name: str, call: Callable[[], Awaitable[dict]], requests: int, concurrency: int) -> None:
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            result = await call()
+            latencies.append(time.perf_counter() - start)
+            if "error" in result:
+                raise SystemExit(f"{name} 请求失败: {result['error']}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<8} mean={statistics.mean(latencies) * 1000:7.2f}ms "
+        f"p50={percentile(latencies, 0.5) * 1000:7.2f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:7.2f}ms "
+        f"p99={percentile(latencies, 0.99) * 1000:7.2f}ms "
+        f"吞吐={requests / elapsed:8.1f} 次/秒"
+    )
+
+
+async def run(base_url: str, requests: int, concurrency: int) -> None:
+    from llm_manager_app.utils.llm_service import DeepSeekClient
+
+    client = DeepSeekClient()
+    messages = [{"role": "user", "content": "你好"}]
+
+    async def fresh_session():
+        # 原实现：每次请求新建会话，连接用完即关闭
+        async with aiohttp.ClientSession() as session:
+            async with session.post(base_url, json={"messages": messages}) as response:
+                return await client._handle_response(response)
+
+    async def pooled_session():
+        return await client._call_api(messages)
+
+    # 预热导入与桩服务
+    await measure("warmup", pooled_session, 10, 1)
+    await measure("fresh", fresh_session, requests, concurrency)
+    await measure("pooled", pooled_session, requests, concurrency)
+    await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM 客户端 HTTP 会话复用微基准")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+
+    # 只需要 LLM_APIS 配置，不加载完整的 Django 项目
+    if not settings.configured:
+        settings.configure(LLM_APIS={"deepseek": {"BASE_URL": base_url, "API_KEY": "sk-stub", "MODEL": "stub"}})
+    print(f"桩服务 {base_url}，请求 {args.requests} 次，并发 {args.concurrency}")
+    asyncio.run(run(base_url, args.requests, args.concurrency))
+    server.shutdown()
@@ -3,22 +3,32 @@
 import asyncio
 import json
 import uuid
-import re  # 新增正则库
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Set
 from channels.generic.websocket import AsyncWebsocketConsumer
 from logs.logs import logger
-from llm_manager_app.utils.llm_service import llm_service, Message
-from memory_service_app.utils.redis_client import set_key, get_key  # ✅ 引入 Redis 客户端方法
+from llm_manager_app.utils.llm_service import llm_service, Message, LLMStreamError
+from llm_manager_app.utils.response_filter import BracketFilter, filter_brackets
+from memory_service_app.utils.redis_client import set_key, get_key, redis_client  # ✅ 引入 Redis 客户端方法
+from llm_manager_app.utils.latency_histogram import LatencyHistogram
 from master_evolution.user_info_manager import user_info_manager
 import logging
 import time
 
+# 记忆等待阶段的延迟直方图（进程级，所有 LLMConsumer 共享）
+memory_wait_histogram = LatencyHistogram("llm_memory_wait")
+# 每累计多少个样本输出一次直方图摘要
+MEMORY_WAIT_REPORT_EVERY = 50
+
 class LLMConsumer(AsyncWebsocketConsumer):
     def __init__(self, *args, **kwargs):
         logging.debug("【DEBUG】LLMConsumer.__init__ 被调用")
         super().__init__(*args, **kwargs)
         self.llm_service = llm_service
         self.group_name = "llm_group"
+        # 等待记忆检索结果的 Future，按 message_id 索引，由 memory_ready 事件直接唤醒
+        self._pending_memory: Dict[str, asyncio.Future] = {}
+        # 正在执行的对话轮次任务
+        self._turn_tasks: Set[asyncio.Task] = set()
         logger.info("🔄 LLMConsumer 初始化完成")
 
     async def connect(self):
@@ -48,6 +58,14 @@ class LLMConsumer(AsyncWebsocketConsumer):
     async def disconnect(self, close_code):
         """断开 WebSocket 连接"""
         try:
+            # 取消尚未完成的记忆等待和对话任务
+            for future in self._pending_memory.values():
+                if not future.done():
+                    future.cancel()
+            self._pending_memory.clear()
+            for task in list(self._turn_tasks):
+                task.cancel()
+
             # 离开 llm_group 组
             logger.info("🔄 准备离开 llm_group...")
             if not self.channel_layer:
@@ -79,6 +97,7 @@ class LLMConsumer(AsyncWebsocketConsumer):
                 api_choice = data.get("api_choice", "deepseek")  # 默认使用 deepseek
                 need_speech = data.get("need_speech", False)
                 voice_index = data.get("voice_index", 0)
+                stream = data.get("stream", True)  # 默认流式推送 response_delta
 
                 if not user_message:
                     logger.warning("⚠️ 无效的 LLM 请求: 消息为空")
@@ -90,99 +109,13 @@ class LLMConsumer(AsyncWebsocketConsumer):
 
                 logger.info(f"📩 收到用户输入[{message_id}]: {user_message}")
 
-                try:
-                    # 提取并保存用户信息(新增)
-                    extracted_info = await user_info_manager.extract_and_save_user_info(user_message)
-                    if extracted_info:
-                        logger.info(f"✅ 从用户消息中提取到信息: {extracted_info}")
-
-                    # 将用户消息存入 Redis
-                    logger.info(f"💾 开始存储用户消息到 Redis (message_id={message_id})")
-                    await set_key(f"user_msg:{message_id}", user_message)
-                    logger.info(f"✅ 用户消息已存入 Redis (message_id={message_id})")
-
-                    # 向 memory_group 发送消息，请求相关记忆
-                    logging.debug(f"【DEBUG】LLMConsumer.group_send memory_group: message_id={message_id}, user_message={user_message}")
-                    await self.channel_layer.group_send(
-                        "memory_group",
-                        {
-                            "type": "retrieve_memory",
-                            "message_id": message_id,
-                            "user_message": user_message
-                        }
-                    )
-                    logger.info(f"✅ 记忆请求已发送到 memory_group (message_id={message_id})")
-
-                    # 等待记忆检索完成
-                    logging.debug(f"【DEBUG】LLMConsumer._wait_for_memory 调用: message_id={message_id}")
-                    final_context = await self._wait_for_memory(message_id)
-                    logger.info(f"✅ 记忆检索完成 (message_id={message_id})")
-                    
-                    # 生成完整回答
-                    logger.info(f"🤖 开始生成 LLM 回答 (message_id={message_id})")
-                    response = await self._generate_llm_response({
-                        "user_message": user_message,
-                        "final_context": final_context,
-                        "api_choice": api_choice
-                    })
-                    logger.info(f"✅ LLM 回答生成完成 (message_id={message_id})")
-
-                    # === 自动过滤括号内容（动作/表情/拟人化）===
-                    # 过滤所有中文/英文括号内内容
-                    response = re.sub(r"[（(][^）)]*[）)]", "", response)
-                    # 去除多余空格
-                    response = re.sub(r"\s+", " ", response).strip()
-                    logger.info(f"✅ 已过滤括号内容后的回复: {response}")
-
-                    # 如果需要语音
-                    logger.info(f"[TTS-DEBUG] need_speech={need_speech}, response={response}, voice_index={voice_index}")
-                    speech_url = None
-                    if need_speech:
-                        try:
-                            from speech.speech_manager import SpeechManager
-                            speech_manager = SpeechManager()
-                            logger.info(f"[TTS-DEBUG] SpeechManager 初始化成功，准备生成语音...")
-                            speech_url = await speech_manager.generate_speech(
-                                response,
-                                voice_index=voice_index
-                            )
-                            logger.info(f"✅ 语音生成完成: {speech_url}")
-                        except Exception as e:
-                            logger.error(f"❌ 语音生成失败: {str(e)}", exc_info=True)
-                            import traceback
-                            logger.error(traceback.format_exc())
-                    logger.info(f"[TTS-DEBUG] speech_url={speech_url}")
-                    
-                    logger.info(f"📤 准备发送响应给用户 (message_id={message_id})")
-                    await self.send(text_data=json.dumps({
-                        "type": "response",
-                        "message_id": message_id,
-                        "response": response,
-                        "context": final_context,
-                        "speech_url": speech_url
-                    }))
-                    logger.info(f"✅ 响应已发送给用户 (message_id={message_id})")
-
-                    # 将对话发送给 MemoryConsumer 保存到工作记忆
-                    logging.debug(f"【DEBUG】LLMConsumer.group_send memory_group: message_id={message_id}, user_message={user_message}, response={response}, final_context={final_context}")
-                    await self.channel_layer.group_send(
-                        "memory_group",
-                        {
-                            "type": "save_conversation",
-                            "message_id": message_id,
-                            "user_message": user_message,
-                            "assistant_response": response,
-                            "final_context": final_context
-                        }
-                    )
-                    logger.info(f"✅ 对话已发送到 memory_group 等待保存 (message_id={message_id})")
-
-                except Exception as e:
-                    logger.error(f"❌ 生成响应失败: {str(e)}", exc_info=True)
-                    await self.send(text_data=json.dumps({
-                        "type": "error",
-                        "message": f"生成响应失败: {str(e)}"
-                    }))
+                # 对话轮次在独立任务中执行，避免阻塞 consumer 的事件分发，
+                # 否则 memory_ready 事件要等本轮结束后才会被处理
+                task = asyncio.create_task(self._process_chat_turn(
+                    message_id, user_message, api_choice, need_speech, voice_index, stream
+                ))
+                self._turn_tasks.add(task)
+                task.add_done_callback(self._turn_tasks.discard)
             else:
                 logger.warning(f"⚠️ 未知的消息类型: {message_type}")
                 await self.send(text_data=json.dumps({
@@ -203,36 +136,267 @@ class LLMConsumer(AsyncWebsocketConsumer):
                 "message": f"消息处理失败: {str(e)}"
             }))
 
+    async def _process_chat_turn(self, message_id: str, user_message: str, api_choice: str,
+                                 need_speech: bool, voice_index: int, stream: bool = True):
+        """处理一轮对话：记忆检索 -> LLM 生成 -> 语音合成 -> 发送响应 -> 保存对话"""
+        try:
+            # 一次往返：存储用户消息并读取用户信息版本戳
+            logger.info(f"💾 开始存储用户消息到 Redis (message_id={message_id})")
+            async with redis_client.pipeline() as pipe:
+                pipe.set(f"user_msg:{message_id}", user_message, ex=3600)
+                pipe.get(user_info_manager.version_key)
+            user_info_version = pipe.results[1]
+            logger.info(f"✅ 用户消息已存入 Redis (message_id={message_id})")
+
+            # 提取并保存用户信息(新增)，与记忆检索并行进行
+            extract_task = asyncio.create_task(user_info_manager.extract_and_save_user_info(user_message))
+
+            try:
+                # 先登记等待者再发送请求，确保 memory_ready 不会早于登记到达
+                self._register_memory_waiter(message_id)
+
+                # 向 memory_group 发送消息，请求相关记忆
+                logging.debug(f"【DEBUG】LLMConsumer.group_send memory_group: message_id={message_id}, user_message={user_message}")
+                await self.channel_layer.group_send(
+                    "memory_group",
+                    {
+                        "type": "retrieve_memory",
+                        "message_id": message_id,
+                        "user_message": user_message
+                    }
+                )
+                logger.info(f"✅ 记忆请求已发送到 memory_group (message_id={message_id})")
+
+                # 等待记忆检索完成
+                logging.debug(f"【DEBUG】LLMConsumer._wait_for_memory 调用: message_id={message_id}")
+                final_context = await self._wait_for_memory(message_id)
+            except BaseException:
+                # 本轮被取消或记忆请求失败时一并取消用户信息提取，避免任务脱离管理继续运行
+                extract_task.cancel()
+                raise
+            logger.info(f"✅ 记忆检索完成 (message_id={message_id})")
+
+            try:
+                extracted_info = await extract_task
+                if extracted_info:
+                    logger.info(f"✅ 从用户消息中提取到信息: {extracted_info}")
+            except Exception as e:
+                logger.warning(f"⚠️ 用户信息提取失败: {str(e)}")
+            # 版本未变时直接使用本地缓存的扁平化视图，无需再读取 Redis
+            user_info = await user_info_manager.get_flat_user_info(known_version=user_info_version)
+
+            # 生成回答（流式时边生成边推送 response_delta）
+            logger.info(f"🤖 开始生成 LLM 回答 (message_id={message_id}, stream={stream})")
+            llm_request = {
+                "user_message": user_message,
+                "final_context": final_context,
+                "api_choice": api_choice,
+                "user_info": user_info
+            }
+            # 流式生成且需要语音时，边生成边分句合成
+            speech_pipeline = self._create_speech_pipeline(message_id, voice_index) if (stream and need_speech) else None
+            try:
+                if stream:
+                    response = await self._stream_llm_response(llm_request, message_id, speech_pipeline)
+                else:
+                    response = await self._generate_llm_response(llm_request)
+                    # === 自动过滤括号内容（动作/表情/拟人化）===
+                    response = filter_brackets(response)
+                logger.info(f"✅ LLM 回答生成完成 (message_id={message_id})")
+                logger.info(f"✅ 已过滤括号内容后的回复: {response}")
+
+                # 如果需要语音
+                logger.info(f"[TTS-DEBUG] need_speech={need_speech}, response={response}, voice_index={voice_index}")
+                speech_url = None
+                speech_segments = None
+                if speech_pipeline is not None:
+                    speech_segments = await speech_pipeline.finish()
+                    logger.info(f"✅ 分段语音生成完成: {speech_segments}")
+            except (asyncio.CancelledError, Exception):
+                # 生成失败或连接断开取消本轮时，停止未完成的分句合成，避免之后向已关闭的连接发送
+                if speech_pipeline is not None:
+                    speech_pipeline.cancel()
+                raise
+            if speech_pipeline is None and need_speech:
+                try:
+                    from speech.speech_manager import SpeechManager
+                    speech_manager = SpeechManager()
+                    logger.info(f"[TTS-DEBUG] SpeechManager 初始化成功，准备生成语音...")
+                    speech_url = await speech_manager.generate_speech(
+                        response,
+                        voice_index=voice_index
+                    )
+                    logger.info(f"✅ 语音生成完成: {speech_url}")
+                except Exception as e:
+                    logger.error(f"❌ 语音生成失败: {str(e)}", exc_info=True)
+                    import traceback
+                    logger.error(traceback.format_exc())
+            logger.info(f"[TTS-DEBUG] speech_url={speech_url}")
+
+            logger.info(f"📤 准备发送响应给用户 (message_id={message_id})")
+            await self.send(text_data=json.dumps({
+                "type": "response",
+                "message_id": message_id,
+                "response": response,
+                "context": final_context,
+                "speech_url": speech_url,
+                "speech_segments": speech_segments
+            }))
+            logger.info(f"✅ 响应已发送给用户 (message_id={message_id})")
+
+            # 将对话发送给 MemoryConsumer 保存到工作记忆
+            logging.debug(f"【DEBUG】LLMConsumer.group_send memory_group: message_id={message_id}, user_message={user_message}, response={response}, final_context={final_context}")
+            await self.channel_layer.group_send(
+                "memory_group",
+                {
+                    "type": "save_conversation",
+                    "message_id": message_id,
+                    "user_message": user_message,
+                    "assistant_response": response,
+                    "final_context": final_context
+                }
+            )
+            logger.info(f"✅ 对话已发送到 memory_group 等待保存 (message_id={message_id})")
+
+        except Exception as e:
+            logger.error(f"❌ 生成响应失败: {str(e)}", exc_info=True)
+            await self.send(text_data=json.dumps({
+                "type": "error",
+                "message": f"生成响应失败: {str(e)}"
+            }))
+
+    def _register_memory_waiter(self, message_id: str) -> asyncio.Future:
+        """登记一个等待记忆检索结果的 Future"""
+        future = self._pending_memory.get(message_id)
+        if future is None or future.done():
+            future = asyncio.get_running_loop().create_future()
+            self._pending_memory[message_id] = future
+        return future
+
     async def _wait_for_memory(self, message_id: str, timeout: float = 5.0):
-        """等待记忆检索完成"""
+        """等待记忆检索完成
+
+        优先等待 memory_ready 事件直接唤醒 Future；超时后再读取一次 Redis，
+        作为跨进程投递（事件未送达本 consumer）时的回退。
+        """
         logging.debug(f"【DEBUG】LLMConsumer._wait_for_memory 被调用，message_id: {message_id}, timeout: {timeout}")
+        memory_key = f"memory:{message_id}"
+        future = self._register_memory_waiter(message_id)
+        logger.info(f"⏳ 开始等待记忆 (message_id={message_id})")
+        start_time = time.perf_counter()
         try:
-            memory_key = f"memory:{message_id}"
-            logger.info(f"⏳ 开始等待记忆 (message_id={message_id})")
-            start_time = time.time()
-            while True:
-                logger.debug(f"🔄 尝试获取记忆 (message_id={message_id})")
+            try:
+                memory = await asyncio.wait_for(future, timeout=timeout)
+                logger.info(f"✅ 成功获取记忆 (message_id={message_id})")
+                return memory
+            except asyncio.TimeoutError:
                 memory = await get_key(memory_key)
-                logger.info(f"[LLMConsumer] 从 Redis 读取到的记忆内容 (key={memory_key}): {memory}")
                 if memory:
-                    logger.info(f"✅ 成功获取记忆 (message_id={message_id})")
+                    logger.info(f"✅ 通过 Redis 回退获取记忆 (message_id={message_id})")
                     return memory
-                if time.time() - start_time > timeout:
-                    logger.warning(f"⏳ 记忆检索超时 (message_id={message_id})")
-                    return "记忆检索超时，使用默认上下文继续。"
-                logger.debug(f"⏳ 记忆尚未就绪，继续等待 (message_id={message_id})")
-                await asyncio.sleep(0.5)
+                logger.warning(f"⏳ 记忆检索超时 (message_id={message_id})")
+                return "记忆检索超时，使用默认上下文继续。"
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"❌ 等待记忆检索失败: {str(e)}", exc_info=True)
             return "记忆检索失败，使用默认上下文继续。"
+        finally:
+            self._pending_memory.pop(message_id, None)
+            memory_wait_histogram.observe(time.perf_counter() - start_time)
+            if memory_wait_histogram.count % MEMORY_WAIT_REPORT_EVERY == 0:
+                logger.info(f"📊 记忆等待延迟统计: {memory_wait_histogram.snapshot()}")
 
     async def _generate_llm_response(self, data: Dict) -> str:
         """生成LLM回答，自动解析final_context并分块注入prompt"""
+        try:
+            messages = await self._build_llm_messages(data)
+            response = await self.llm_service.generate(messages=messages)
+            if isinstance(response, dict) and "content" in response:
+                return response.get("content", "暂时无法回答") 
+            elif hasattr(response, "generations") and response.generations:
+                return response.generations[0].message.content
+            else:
+                logger.warning(f"⚠️ 未知的响应格式: {type(response)}")
+                return "暂时无法回答(响应格式错误)"
+        except Exception as e:
+            logger.error(f"❌ 生成LLM回答失败: {str(e)}", exc_info=True)
+            raise
+
+    async def _stream_llm_response(self, data: Dict, message_id: str, speech_pipeline=None) -> str:
+        """流式生成LLM回答，逐段推送过滤后的 response_delta，返回完整回复
+
+        流式调用失败时回退到一次性生成，随后的 response 帧会覆盖已推送的片段。
+        传入 speech_pipeline 时，过滤后的文本同时送入分句语音合成。
+        """
+        messages = await self._build_llm_messages(data)
+        bracket_filter = BracketFilter()
+        parts = []
+        try:
+            async for delta in self.llm_service.stream(messages):
+                text = bracket_filter.feed(delta)
+                if text:
+                    parts.append(text)
+                    if speech_pipeline is not None:
+                        speech_pipeline.feed(text)
+                    await self.send(text_data=json.dumps({
+                        "type": "response_delta",
+                        "message_id": message_id,
+                        "delta": text
+                    }))
+            tail = bracket_filter.flush()
+            if tail:
+                parts.append(tail)
+                if speech_pipeline is not None:
+                    speech_pipeline.feed(tail)
+                await self.send(text_data=json.dumps({
+                    "type": "response_delta",
+                    "message_id": message_id,
+                    "delta": tail
+                }))
+        except LLMStreamError as e:
+            logger.warning(f"⚠️ 流式生成失败，回退到一次性生成 (message_id={message_id}): {str(e)}")
+            response = filter_brackets(await self._generate_llm_response(data))
+            # 已推送过片段时语音保持与已合成部分一致，否则用回退结果合成
+            if speech_pipeline is not None and not parts:
+                speech_pipeline.feed(response)
+            return response
+
+        if not parts:
+            logger.warning(f"⚠️ 流式生成无内容 (message_id={message_id})")
+            return "暂时无法回答"
+        return "".join(parts)
+
+    def _create_speech_pipeline(self, message_id: str, voice_index: int):
+        """创建分句语音流水线，每段合成完成后按顺序推送 speech_segment 帧；失败时返回 None"""
+        try:
+            from speech.speech_manager import SpeechManager
+            from speech.speech_pipeline import SpeechPipeline
+            speech_manager = SpeechManager()
+        except Exception as e:
+            logger.error(f"❌ 语音流水线初始化失败，回退为整段合成: {str(e)}", exc_info=True)
+            return None
+
+        async def on_segment(index: int, speech_url: Optional[str], text: str):
+            await self.send(text_data=json.dumps({
+                "type": "speech_segment",
+                "message_id": message_id,
+                "index": index,
+                "speech_url": speech_url,
+                "text": text
+            }))
+
+        return SpeechPipeline(speech_manager, voice_index=voice_index, on_segment=on_segment)
+
+    async def _build_llm_messages(self, data: Dict) -> List[Message]:
+        """构建发送给LLM的消息列表，自动解析final_context并分块注入prompt"""
         try:
             user_message = data["user_message"]
-            # 获取用户个性化信息
+            # 获取用户个性化信息（调用方已批量读取时直接复用）
             try:
-                user_info = await user_info_manager.get_flat_user_info()
+                user_info = data.get("user_info")
+                if user_info is None:
+                    user_info = await user_info_manager.get_flat_user_info()
                 if user_info:
                     logger.info(f"✅ 已获取用户扁平化信息用于个性化对话：{list(user_info.keys())}")
             except Exception as e:
@@ -275,16 +439,9 @@ class LLMConsumer(AsyncWebsocketConsumer):
             self.llm_service.current_provider = api_choice
             logger.info(f"🔄 设置LLM提供商: {api_choice}")
             logger.info(f"📝 发送给 LLM 的 prompt: {[m.to_dict() for m in messages]}")
-            response = await self.llm_service.generate(messages=messages)
-            if isinstance(response, dict) and "content" in response:
-                return response.get("content", "暂时无法回答") 
-            elif hasattr(response, "generations") and response.generations:
-                return response.generations[0].message.content
-            else:
-                logger.warning(f"⚠️ 未知的响应格式: {type(response)}")
-                return "暂时无法回答(响应格式错误)"
+            return messages
         except Exception as e:
-            logger.error(f"❌ 生成LLM回答失败: {str(e)}", exc_info=True)
+            logger.error(f"❌ 构建LLM消息失败: {str(e)}", exc_info=True)
             raise
 
     # 处理 memory_group 返回的记忆检索结果
@@ -311,11 +468,17 @@ class LLMConsumer(AsyncWebsocketConsumer):
         logger.info(f"📥 收到 memory_ready 消息: {event}")
         message_id = event.get("message_id")
         final_context = event.get("final_context")
-        
-        # 将记忆内容写入Redis
-        memory_key = f"memory:{message_id}"
-        await set_key(memory_key, final_context, ex=3600)
-        
+
+        # 本 consumer 正在等待该消息时直接唤醒，无需经过 Redis
+        future = self._pending_memory.get(message_id)
+        if future is not None:
+            if not future.done():
+                future.set_result(final_context)
+        else:
+            # 等待者不在本 consumer，写入 Redis 供跨进程回退读取
+            memory_key = f"memory:{message_id}"
+            await set_key(memory_key, final_context, ex=3600)
+
         logger.info(f"✅ 记忆已准备就绪 (message_id={message_id})")
         
         # 可以选择通知前端记忆已就绪
@@ -0,0 +1,83 @@
+# EVA_backend/llm_manager_app/utils/latency_histogram.py
+
+import bisect
+import threading
+from typing import Dict, List, Optional, Sequence
+
+# 默认分桶上界（毫秒），最后一个桶收集所有超出上界的样本
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """固定分桶的延迟直方图
+
+    用于统计各阶段耗时（如等待记忆检索），只保存分桶计数，
+    内存占用与样本数无关，可以长期驻留在进程中。
+    """
+
+    def __init__(self, name: str, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.name = name
+        self._bounds: List[float] = sorted(buckets_ms)
+        self._counts: List[int] = [0] * (len(self._bounds) + 1)
+        self._total = 0
+        self._sum_ms = 0.0
+        self._max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """记录一次耗时（秒）"""
+        elapsed_ms = seconds * 1000
+        index = bisect.bisect_left(self._bounds, elapsed_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._total += 1
+            self._sum_ms += elapsed_ms
+            self._max_ms = max(self._max_ms, elapsed_ms)
+
+    @property
+    def count(self) -> int:
+        return self._total
+
+    def percentile(self, q: float) -> Optional[float]:
+        """按分桶上界估算分位数（毫秒），无样本时返回 None"""
+        with self._lock:
+            if not self._total:
+                return None
+            rank = q * self._total
+            seen = 0
+            for index, bucket_count in enumerate(self._counts):
+                seen += bucket_count
+                if seen >= rank and bucket_count:
+                    if index < len(self._bounds):
+                        return self._bounds[index]
+                    return self._max_ms
+            return self._max_ms
+
+    def snapshot(self) -> Dict:
+        """获取直方图快照，便于日志输出或接口返回"""
+        buckets = {}
+        with self._lock:
+            for index, bucket_count in enumerate(self._counts):
+                label = f"<={self._bounds[index]}ms" if index < len(self._bounds) else f">{self._bounds[-1]}ms"
+                buckets[label] = bucket_count
+            total = self._total
+            avg_ms = self._sum_ms / total if total else 0.0
+            max_ms = self._max_ms
+        return {
+            "name": self.name,
+            "count": total,
+            "avg_ms": round(avg_ms, 3),
+            "max_ms": round(max_ms, 3),
+            "p50_ms": self.percentile(0.5),
+            "p90_ms": self.percentile(0.9),
+            "p99_ms": self.percentile(0.99),
+            "buckets": buckets,
+        }
+
+    def reset(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self._counts = [0] * (len(self._bounds) + 1)
+            self._total = 0
+            self._sum_ms = 0.0
+            self._max_ms = 0.0
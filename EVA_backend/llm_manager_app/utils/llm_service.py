@@ -1,6 +1,6 @@
 # EVA_backend/llm_manager_app/utils/llm_service.py
 
-from typing import Any, Dict, List, Optional, Union, Tuple, Callable, Type
+from typing import Any, AsyncIterator, Dict, List, Optional, Union, Tuple, Callable, Type
 from django.conf import settings
 from tenacity import retry, stop_after_attempt, wait_random_exponential
 from langchain_core.language_models import BaseChatModel
@@ -25,9 +25,21 @@ class ProcessingTimeoutError(Exception):
         self.message = message
         super().__init__(f"[{code}] {message}")
 
+class LLMStreamError(Exception):
+    """流式生成异常"""
+    def __init__(self, message: str = "流式生成失败"):
+        self.message = message
+        super().__init__(message)
+
 # 定义默认超时时间（秒）
 DEFAULT_TIMEOUT = 30  # 30秒超时
 
+# HTTP 连接池默认配置，可在 settings.LLM_APIS[provider] 中覆盖
+DEFAULT_POOL_LIMIT = 20           # 连接池总连接数上限
+DEFAULT_POOL_LIMIT_PER_HOST = 10  # 单个主机连接数上限
+DEFAULT_KEEPALIVE_TIMEOUT = 60    # 空闲连接保活时间（秒）
+DEFAULT_DNS_CACHE_TTL = 300       # DNS 缓存时间（秒）
+
 
 class Message:
     def __init__(self, role: str, content: str):
@@ -44,10 +56,97 @@ class LLMClient:
         self.config = settings.LLM_APIS.get(provider, {})
         # 从配置中获取超时设置，如果没有则使用默认值
         self.timeout = self.config.get("TIMEOUT", DEFAULT_TIMEOUT)
+        # 长连接会话，首次调用时在当前事件循环中懒创建，复用 TCP/TLS 连接
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取（必要时创建）带连接池的共享会话"""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._session_loop is loop:
+            return self._session
+
+        # 会话绑定在创建它的事件循环上，循环变化时需要重建
+        if self._session is not None and not self._session.closed and self._session_loop is not loop:
+            logger.warning(f"{self.provider} HTTP 会话所属事件循环已变化，重新创建会话")
+            self._session = None
+
+        connector = aiohttp.TCPConnector(
+            limit=self.config.get("POOL_LIMIT", DEFAULT_POOL_LIMIT),
+            limit_per_host=self.config.get("POOL_LIMIT_PER_HOST", DEFAULT_POOL_LIMIT_PER_HOST),
+            keepalive_timeout=self.config.get("KEEPALIVE_TIMEOUT", DEFAULT_KEEPALIVE_TIMEOUT),
+            ttl_dns_cache=self.config.get("DNS_CACHE_TTL", DEFAULT_DNS_CACHE_TTL),
+            use_dns_cache=True,
+        )
+        self._session = aiohttp.ClientSession(connector=connector)
+        self._session_loop = loop
+        logger.info(f"{self.provider} HTTP 会话已创建（连接池复用）")
+        return self._session
+
+    async def close(self):
+        """关闭共享会话及其连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info(f"{self.provider} HTTP 会话已关闭")
+        self._session = None
+        self._session_loop = None
 
     async def _call_api(self, messages: List[dict]) -> dict:
         raise NotImplementedError
 
+    async def _stream_api(self, messages: List[dict]) -> AsyncIterator[str]:
+        """以 SSE 方式流式调用 OpenAI 兼容接口，逐段产出增量文本
+
+        超时按两次数据之间的间隔计算，而不是整次生成的总时长。
+        """
+        headers = {
+            "Authorization": f"Bearer {self.config.get('API_KEY', '')}",
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream"
+        }
+        payload = {
+            "model": self.config.get("MODEL", "default-model"),
+            "messages": messages,
+            "temperature": self.config.get("TEMPERATURE", 0.7),
+            "max_tokens": self.config.get("MAX_TOKENS", 1024),
+            "stream": True
+        }
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+
+        session = await self._get_session()
+        try:
+            async with session.post(self.config.get("BASE_URL", ""), headers=headers, json=payload, timeout=timeout) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"{self.provider} 流式API返回错误: {response.status}, {error_text}")
+                    raise LLMStreamError(f"API返回错误: {response.status}")
+
+                # StreamReader 按行迭代，SSE 事件以 "data: " 开头
+                async for raw_line in response.content:
+                    line = raw_line.decode("utf-8", errors="ignore").strip()
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = json.loads(data)
+                    except json.JSONDecodeError:
+                        logger.warning(f"{self.provider} 流式数据解析失败: {data[:100]}")
+                        continue
+                    choices = chunk.get("choices") or []
+                    if not choices:
+                        continue
+                    delta = (choices[0].get("delta") or {}).get("content")
+                    if delta:
+                        yield delta
+        except asyncio.TimeoutError:
+            logger.error(f"{self.provider} 流式API读取超时 ({self.timeout}秒)")
+            raise LLMStreamError(f"{self.provider} 流式API读取超时 ({self.timeout}秒)")
+        except aiohttp.ClientError as e:
+            logger.error(f"{self.provider} 流式API调用失败: {str(e)}")
+            raise LLMStreamError(f"API请求错误: {str(e)}")
+
 
 class DeepSeekClient(LLMClient):
     def __init__(self):
@@ -66,14 +165,15 @@ class DeepSeekClient(LLMClient):
         }
 
         try:
-            # 使用asyncio.wait_for增加超时控制
-            async with aiohttp.ClientSession() as session:
-                async def make_request():
-                    async with session.post(self.config.get("BASE_URL", ""), headers=headers, json=payload) as response:
-                        return await self._handle_response(response)
-                
-                # 添加超时控制
-                return await asyncio.wait_for(make_request(), timeout=self.timeout)
+            # 复用共享会话，使用asyncio.wait_for增加超时控制
+            session = await self._get_session()
+
+            async def make_request():
+                async with session.post(self.config.get("BASE_URL", ""), headers=headers, json=payload) as response:
+                    return await self._handle_response(response)
+
+            # 添加超时控制
+            return await asyncio.wait_for(make_request(), timeout=self.timeout)
         except asyncio.TimeoutError:
             timeout_msg = f"DeepSeek API调用超时 ({self.timeout}秒)"
             logger.error(timeout_msg)
@@ -129,14 +229,15 @@ class SiliconFlowClient(LLMClient):
         }
 
         try:
-            # 使用asyncio.wait_for增加超时控制
-            async with aiohttp.ClientSession() as session:
-                async def make_request():
-                    async with session.post(self.config.get("BASE_URL", ""), headers=headers, json=payload) as response:
-                        return await self._handle_response(response)
-                
-                # 添加超时控制
-                return await asyncio.wait_for(make_request(), timeout=self.timeout)
+            # 复用共享会话，使用asyncio.wait_for增加超时控制
+            session = await self._get_session()
+
+            async def make_request():
+                async with session.post(self.config.get("BASE_URL", ""), headers=headers, json=payload) as response:
+                    return await self._handle_response(response)
+
+            # 添加超时控制
+            return await asyncio.wait_for(make_request(), timeout=self.timeout)
         except asyncio.TimeoutError:
             timeout_msg = f"SiliconFlow API调用超时 ({self.timeout}秒)"
             logger.error(timeout_msg)
@@ -210,6 +311,14 @@ class LLMManager(BaseChatModel):
         }
         self.current_provider = "deepseek"
 
+    async def close(self):
+        """关闭所有提供商客户端的 HTTP 会话"""
+        for client in self._clients.values():
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"关闭 {client.provider} 客户端失败: {str(e)}")
+
     def _format_messages(self, messages: List[Message]) -> List[dict]:
         return [msg.to_dict() for msg in messages]
 
@@ -397,6 +506,29 @@ class LLMManager(BaseChatModel):
             
         return response
 
+    async def stream(self, messages: List[Message]) -> AsyncIterator[str]:
+        """流式生成回复
+
+        Args:
+            messages: 消息列表
+
+        Yields:
+            str: 模型输出的增量文本
+
+        Raises:
+            LLMStreamError: 提供商不存在或流式调用失败
+        """
+        if not self.is_initialized:
+            await self.initialize()
+
+        client = self._clients.get(self.current_provider)
+        if not client:
+            raise LLMStreamError(f"未找到提供商: {self.current_provider}")
+
+        formatted_messages = self._format_messages(messages)
+        async for delta in client._stream_api(formatted_messages):
+            yield delta
+
 
 # 创建单例实例
 llm_service = LLMManager()
\ No newline at end of file
@@ -0,0 +1,71 @@
+# EVA_backend/llm_manager_app/utils/response_filter.py
+
+# 中英文左右括号
+OPEN_BRACKETS = "（("
+CLOSE_BRACKETS = "）)"
+
+
+class BracketFilter:
+    """增量括号过滤器（流式版）
+
+    与原先对完整回复执行的两步正则等价：
+        re.sub(r"[（(][^）)]*[）)]", "", text)
+        re.sub(r"\\s+", " ", text).strip()
+    即删除括号及其中的动作/表情描述，并把连续空白折叠为一个空格、去掉首尾空白。
+
+    文本可以按任意位置切分后依次 feed，括号跨越分块边界时同样能正确过滤。
+    未闭合的括号内容会先缓存，流结束时由 flush 原样输出（与正则不匹配时的行为一致）。
+    """
+
+    def __init__(self):
+        self._in_bracket = False
+        self._bracket_buffer: list = []
+        self._pending_space = False
+        self._emitted_any = False
+
+    def feed(self, chunk: str) -> str:
+        """输入一段文本，返回可以立即输出的过滤结果"""
+        output = []
+        for char in chunk:
+            if self._in_bracket:
+                if char in CLOSE_BRACKETS:
+                    # 括号闭合，丢弃整段括号内容
+                    self._in_bracket = False
+                    self._bracket_buffer = []
+                else:
+                    self._bracket_buffer.append(char)
+            elif char in OPEN_BRACKETS:
+                self._in_bracket = True
+                self._bracket_buffer = [char]
+            else:
+                self._emit(char, output)
+        return "".join(output)
+
+    def flush(self) -> str:
+        """流结束：输出未闭合括号的缓存内容，丢弃末尾空白"""
+        output = []
+        if self._in_bracket:
+            self._in_bracket = False
+            buffered = self._bracket_buffer
+            self._bracket_buffer = []
+            for char in buffered:
+                self._emit(char, output)
+        self._pending_space = False
+        return "".join(output)
+
+    def _emit(self, char: str, output: list) -> None:
+        """空白折叠：连续空白延迟为一个空格，仅在后面出现非空白字符时输出"""
+        if char.isspace():
+            self._pending_space = True
+            return
+        if self._pending_space and self._emitted_any:
+            output.append(" ")
+        self._pending_space = False
+        self._emitted_any = True
+        output.append(char)
+
+
+def filter_brackets(text: str) -> str:
+    """对完整文本执行括号过滤"""
+    bracket_filter = BracketFilter()
+    return bracket_filter.feed(text) + bracket_filter.flush()
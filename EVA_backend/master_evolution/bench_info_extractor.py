@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+用户信息规则抽取微基准
+
+对比预编译抽取引擎与原先逐字段逐规则扫描的实现，并校验两者结果一致。
+
+用法（在 EVA_backend 目录下）：
+    python -m master_evolution.bench_info_extractor [--rounds 2000] [--corpus messages.txt]
+
+--corpus 可指定一行一条消息的文本文件（如导出的真实聊天记录），默认使用内置语料。
+"""
+
+import argparse
+import os
+import re
+import time
+from typing import Any, Dict, List
+from master_evolution.info_extractor import InfoExtractor
+
+PATTERNS_PATH = os.path.join(os.path.dirname(__file__), 'user_info_config', 'extraction_patterns.json')
+
+# 内置语料：取自日常对话的典型消息，大部分不包含个人信息
+DEFAULT_CORPUS = [
+    "你好呀",
+    "今天天气怎么样？",
+    "帮我查一下明天上海的天气",
+    "哈哈哈哈，太好笑了",
+    "晚安，明天见",
+    "你能给我讲个笑话吗",
+    "刚才说到哪了？",
+    "这个问题有点复杂，你再解释一遍",
+    "帮我写一封请假邮件，理由是家里有事",
+    "把这段话翻译成英文：今天的会议改到下午三点",
+    "推荐几本适合周末读的书吧",
+    "最近工作压力好大",
+    "嗯嗯，好的，谢谢",
+    "为什么天空是蓝色的？",
+    "提醒我八点吃药",
+    "你记得我上次说的事情吗",
+    "我叫小明，今年25岁",
+    "我今年30岁了，在北京做程序员",
+    "我是一名医生，平时很忙",
+    "我住在杭州西湖附近",
+    "我喜欢吃火锅，尤其是麻辣的",
+    "我最爱的颜色是蓝色",
+    "我喜欢听周杰伦的歌",
+    "我的生日是1995年6月18日",
+    "我对花生过敏，点菜的时候注意一下",
+    "我是女生，别叫我哥们",
+    "我希望你能简洁一点回答",
+    "我的爱好是爬山和摄影",
+    "我不吃辣，也不吃香菜",
+    "我是素食者",
+    "这是什么意思？",
+    "今天是星期几",
+    "我在开会，晚点再聊",
+    "我做了一个很奇怪的梦",
+    "我喜欢看科幻电影，最近在看星际穿越",
+    "叫我阿杰就行",
+    "我已经毕业三年了",
+    "我来自四川成都",
+    "他是我的同事，人挺好的",
+    "OK，就这么定了",
+]
+
+
+def legacy_extract(extraction_patterns: Dict[str, List[Dict[str, Any]]], message: str) -> Dict[str, Any]:
+    """原先的逐字段逐规则实现，作为对照基线"""
+    info = {}
+    for field, patterns_list in extraction_patterns.items():
+        for pattern_dict in patterns_list:
+            patterns = pattern_dict.get("patterns", [])
+            max_length = pattern_dict.get("max_length", 30)
+            suffixes = pattern_dict.get("suffixes", [""])
+            type_check = pattern_dict.get("type", None)
+            keywords = pattern_dict.get("keywords", [])
+            for pattern in patterns:
+                if pattern in message:
+                    parts = message.split(pattern, 1)
+                    if len(parts) <= 1:
+                        continue
+                    text_part = parts[1]
+                    if keywords:
+                        found_keyword = False
+                        for keyword in keywords:
+                            if keyword in text_part:
+                                if field == "gender":
+                                    if keyword in ["男生", "男人", "男的"]:
+                                        info[field] = "male"
+                                    elif keyword in ["女生", "女人", "女的"]:
+                                        info[field] = "female"
+                                else:
+                                    info[field] = keyword
+                                found_keyword = True
+                                break
+                        if found_keyword:
+                            break
+                        continue
+                    value = text_part.split("，")[0].split("。")[0].split(",")[0].split(".")[0].strip()
+                    if suffixes != [""]:
+                        has_suffix = False
+                        for suffix in suffixes:
+                            if suffix in value:
+                                value = value.split(suffix)[0].strip()
+                                has_suffix = True
+                                break
+                        if not has_suffix:
+                            continue
+                    if type_check == "number":
+                        num_match = re.search(r'\d+', value)
+                        if num_match:
+                            num_value = int(num_match.group())
+                            if num_value <= pattern_dict.get("max_value", float('inf')):
+                                info[field] = num_value
+                    elif type_check == "date":
+                        date_match = re.search(r'\d{1,4}[-/年]\d{1,2}[-/月]\d{1,2}[日]?', value)
+                        if date_match:
+                            info[field] = date_match.group()
+                    else:
+                        if 1 <= len(value) <= max_length:
+                            info[field] = value
+                            break
+    return info
+
+
+def run(corpus: List[str], rounds: int) -> None:
+    extractor = InfoExtractor(PATTERNS_PATH)
+    patterns = extractor.patterns
+
+    mismatches = [m for m in corpus if extractor.extract(m) != legacy_extract(patterns, m)]
+    if mismatches:
+        raise SystemExit(f"结果不一致的消息: {mismatches}")
+
+    total = len(corpus) * rounds
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in corpus:
+            legacy_extract(patterns, message)
+    legacy_seconds = time.perf_counter() - start
+
+    extractor.stats.update({"messages": 0, "fast_path": 0})
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in corpus:
+            extractor.extract(message)
+    compiled_seconds = time.perf_counter() - start
+
+    print(f"语料 {len(corpus)} 条 x {rounds} 轮，结果一致")
+    print(f"原实现:   {legacy_seconds / total * 1e6:8.2f} µs/条")
+    print(f"预编译:   {compiled_seconds / total * 1e6:8.2f} µs/条")
+    print(f"加速比:   {legacy_seconds / compiled_seconds:8.2f}x")
+    print(f"快路径:   {extractor.stats['fast_path'] / extractor.stats['messages']:8.2%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="用户信息规则抽取微基准")
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--corpus", help="一行一条消息的语料文件")
+    args = parser.parse_args()
+
+    corpus = DEFAULT_CORPUS
+    if args.corpus:
+        with open(args.corpus, 'r', encoding='utf-8') as f:
+            corpus = [line.strip() for line in f if line.strip()]
+    run(corpus, args.rounds)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+用户信息规则抽取引擎
+
+把 user_info_config/extraction_patterns.json 中的规则预编译为：
+1. 一个组合触发词正则（零宽前瞻 + 最长优先的交替），一次扫描得到消息中出现的全部触发词
+2. 每个字段的规则列表，只对出现了触发词的字段执行
+
+消息中没有任何触发词时直接返回空结果（快路径）。
+规则文件修改后按修改时间自动重新加载，无需重启服务。
+"""
+
+import json
+import os
+import re
+import time
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+from logs.logs import logger
+
+# 规则文件修改检查的最小间隔（秒），避免每条消息都 stat 文件
+DEFAULT_RELOAD_CHECK_INTERVAL = 2.0
+
+# 取值截断：遇到第一个中英文逗号或句号为止
+VALUE_END_PATTERN = re.compile(r"[，。,.]")
+NUMBER_PATTERN = re.compile(r"\d+")
+DATE_PATTERN = re.compile(r"\d{1,4}[-/年]\d{1,2}[-/月]\d{1,2}[日]?")
+
+MALE_KEYWORDS = ("男生", "男人", "男的")
+FEMALE_KEYWORDS = ("女生", "女人", "女的")
+
+
+class _Rule:
+    """单条预编译规则（对应 JSON 中的一个 pattern_dict）"""
+
+    __slots__ = ("patterns", "max_length", "suffixes", "type_check", "keywords", "max_value")
+
+    def __init__(self, pattern_dict: Dict[str, Any]):
+        self.patterns: Tuple[str, ...] = tuple(pattern_dict.get("patterns", []))
+        self.max_length = pattern_dict.get("max_length", 30)
+        self.suffixes: Tuple[str, ...] = tuple(pattern_dict.get("suffixes", [""]))
+        self.type_check = pattern_dict.get("type", None)
+        self.keywords: Tuple[str, ...] = tuple(pattern_dict.get("keywords", []))
+        self.max_value = pattern_dict.get("max_value", float('inf'))
+
+
+class InfoExtractor:
+    """预编译、可热加载的用户信息规则抽取器
+
+    抽取结果与逐字段逐规则执行 `pattern in message` 的原始实现一致，
+    只是跳过了没有触发词的字段。
+    """
+
+    def __init__(self, patterns_path: str, reload_check_interval: float = DEFAULT_RELOAD_CHECK_INTERVAL):
+        self.patterns_path = patterns_path
+        self.reload_check_interval = reload_check_interval
+        self.patterns: Dict[str, List[Dict[str, Any]]] = {}
+        self._rules: List[Tuple[str, List[_Rule]]] = []
+        self._field_triggers: Dict[str, FrozenSet[str]] = {}
+        self._trigger_regex: Optional[re.Pattern] = None
+        # 触发词 -> 它包含的所有触发词（含自身），用于补全同一位置被更长触发词遮挡的短触发词
+        self._implied: Dict[str, FrozenSet[str]] = {}
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self.stats = {"messages": 0, "fast_path": 0, "reloads": 0}
+        self._load()
+
+    # ---------- 加载与编译 ----------
+
+    def _load(self) -> None:
+        try:
+            mtime = os.path.getmtime(self.patterns_path)
+            with open(self.patterns_path, 'r', encoding='utf-8') as f:
+                patterns = json.load(f)
+        except Exception as e:
+            if self._mtime is None:
+                logger.warning(f"⚠️ 用户信息抽取规则加载失败，规则抽取不可用: {e}")
+            else:
+                logger.warning(f"⚠️ 用户信息抽取规则重新加载失败，继续使用旧规则: {e}")
+            return
+        self.load_patterns(patterns)
+        self._mtime = mtime
+
+    def load_patterns(self, patterns: Dict[str, List[Dict[str, Any]]]) -> None:
+        """编译规则字典（字段 -> 规则列表）"""
+        rules = [(field, [_Rule(pattern_dict) for pattern_dict in pattern_list])
+                 for field, pattern_list in patterns.items()]
+        field_triggers = {
+            field: frozenset(p for rule in field_rules for p in rule.patterns if p)
+            for field, field_rules in rules
+        }
+        triggers: Set[str] = set().union(*field_triggers.values()) if field_triggers else set()
+        if triggers:
+            # 最长优先，保证同一位置匹配到最长的触发词；更短的由 _implied 补全
+            alternation = "|".join(re.escape(t) for t in sorted(triggers, key=len, reverse=True))
+            trigger_regex = re.compile(f"(?=({alternation}))")
+        else:
+            trigger_regex = None
+        implied = {
+            trigger: frozenset(other for other in triggers if other in trigger)
+            for trigger in triggers
+        }
+
+        self.patterns = patterns
+        self._rules = rules
+        self._field_triggers = field_triggers
+        self._trigger_regex = trigger_regex
+        self._implied = implied
+
+    def _maybe_reload(self) -> None:
+        """规则文件修改时间变化时重新加载"""
+        now = time.monotonic()
+        if now - self._last_check < self.reload_check_interval:
+            return
+        self._last_check = now
+        try:
+            mtime = os.path.getmtime(self.patterns_path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self._load()
+            self.stats["reloads"] += 1
+            logger.info(f"🔄 用户信息抽取规则已重新加载: {len(self._rules)} 个字段")
+
+    # ---------- 抽取 ----------
+
+    def find_triggers(self, message: str) -> Set[str]:
+        """一次扫描找出消息中出现的全部触发词"""
+        if self._trigger_regex is None:
+            return set()
+        present: Set[str] = set()
+        for match in self._trigger_regex.finditer(message):
+            trigger = match.group(1)
+            if trigger not in present:
+                present.update(self._implied[trigger])
+        return present
+
+    def extract(self, message: str) -> Dict[str, Any]:
+        """按规则从消息中抽取用户信息"""
+        self._maybe_reload()
+        self.stats["messages"] += 1
+        present = self.find_triggers(message)
+        if not present:
+            self.stats["fast_path"] += 1
+            return {}
+
+        info = {}
+        for field, field_rules in self._rules:
+            if self._field_triggers[field].isdisjoint(present):
+                continue
+            for rule in field_rules:
+                for pattern in rule.patterns:
+                    if pattern not in present:
+                        continue
+                    parts = message.split(pattern, 1)
+                    if len(parts) <= 1:
+                        continue
+                    text_part = parts[1]
+                    if rule.keywords:
+                        keyword = self._match_keyword(rule.keywords, text_part)
+                        if keyword is None:
+                            continue
+                        if field == "gender":
+                            if keyword in MALE_KEYWORDS:
+                                info[field] = "male"
+                            elif keyword in FEMALE_KEYWORDS:
+                                info[field] = "female"
+                        else:
+                            info[field] = keyword
+                        break
+                    value = VALUE_END_PATTERN.split(text_part, 1)[0].strip()
+                    if rule.suffixes != ("",):
+                        for suffix in rule.suffixes:
+                            if suffix in value:
+                                value = value.split(suffix)[0].strip()
+                                break
+                        else:
+                            continue
+                    if rule.type_check == "number":
+                        num_match = NUMBER_PATTERN.search(value)
+                        if num_match:
+                            num_value = int(num_match.group())
+                            if num_value <= rule.max_value:
+                                info[field] = num_value
+                    elif rule.type_check == "date":
+                        date_match = DATE_PATTERN.search(value)
+                        if date_match:
+                            info[field] = date_match.group()
+                    else:
+                        if 1 <= len(value) <= rule.max_length:
+                            info[field] = value
+                            break
+        return info
+
+    @staticmethod
+    def _match_keyword(keywords: Tuple[str, ...], text: str) -> Optional[str]:
+        for keyword in keywords:
+            if keyword in text:
+                return keyword
+        return None
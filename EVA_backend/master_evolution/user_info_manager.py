@@ -14,28 +14,40 @@
 
 import json
 import asyncio
-import re
+import time
 from typing import Dict, Any, Optional, List, Tuple, Set
 from logs.logs import logger
-from memory_service_app.utils.redis_client import set_key, get_key
+from memory_service_app.utils.redis_client import redis_client
+from master_evolution.info_extractor import InfoExtractor
 import os
 
 # 默认永久保存
 DEFAULT_EXPIRY = None
+# 列表型偏好的字段名分隔符："food[]火锅" 表示 food 列表中的一项，字段值为追加时间戳
+LIST_FIELD_SEPARATOR = "[]"
 
 class UserInfoManager:
-    """用户信息管理器，提供异步API接口"""
+    """用户信息管理器，提供异步API接口
+
+    存储布局：
+    - user_info:<类别>        每个类别一个哈希表，字段值为 JSON 编码，按字段增量写入
+    - user_info_categories    已写入过的类别索引（哈希表）
+    - user_info_version       版本戳，每次写入 INCR，用于判断本地扁平化缓存是否过期
+    旧版整体 JSON 存放在 user_info 字符串键中，首次访问时自动迁移。
+    """
     
     def __init__(self):
         """初始化用户信息管理器"""
+        # 旧版整体 JSON 的键名，同时作为类别哈希表的前缀
         self.user_info_key = "user_info"
-        # 动态加载用户信息分类和提取规则
+        self.version_key = "user_info_version"
+        self.categories_key = "user_info_categories"
+        # 动态加载用户信息分类和提取规则（提取规则预编译，文件修改后自动重新加载）
         config_dir = os.path.join(os.path.dirname(__file__), 'user_info_config')
+        self.extractor = InfoExtractor(os.path.join(config_dir, 'extraction_patterns.json'))
         try:
             with open(os.path.join(config_dir, 'info_categories.json'), 'r', encoding='utf-8') as f:
                 self.info_categories = json.load(f)
-            with open(os.path.join(config_dir, 'extraction_patterns.json'), 'r', encoding='utf-8') as f:
-                self.extraction_patterns = json.load(f)
         except Exception as e:
             # 加载失败时使用默认配置
             self.info_categories = {
@@ -47,34 +59,189 @@ class UserInfoManager:
                 "device": ["device_type", "os", "browser"],
                 "custom": []
             }
-            self.extraction_patterns = {}
             print(f"[警告] 用户信息配置加载失败: {e}")
+        # 读取时一并拉取的类别（occupation 由 _categorize_info 单独归类）
+        self._known_categories: Set[str] = set(self.info_categories) | {"occupation"}
+        # 扁平化视图缓存及其对应的版本戳，任何写入都会使其失效
+        self._flat_cache: Optional[Dict[str, Any]] = None
+        self._flat_version: Optional[int] = None
+        self._migrated = False
+        self._migration_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def extraction_patterns(self) -> Dict[str, List[Dict[str, Any]]]:
+        """当前生效的提取规则（原始 JSON 结构）"""
+        return self.extractor.patterns
+
+    # ---------- 存储布局工具 ----------
+
+    def _category_key(self, category: str) -> str:
+        return f"{self.user_info_key}:{category}"
+
+    @staticmethod
+    def _encode_value(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False)
+
+    @staticmethod
+    def _decode_value(raw: str) -> Any:
+        try:
+            return json.loads(raw)
+        except (TypeError, ValueError):
+            return raw
+
+    @staticmethod
+    def _parse_version(raw: Any) -> int:
+        try:
+            return int(raw)
+        except (TypeError, ValueError):
+            return 0
+
+    def _decode_category(self, fields: Dict[str, str]) -> Dict[str, Any]:
+        """将类别哈希表还原为字段字典，列表型偏好按追加顺序合并为列表"""
+        values: Dict[str, Any] = {}
+        list_items: Dict[str, List[Tuple[int, str]]] = {}
+        for field, raw in fields.items():
+            if LIST_FIELD_SEPARATOR in field:
+                name, item = field.split(LIST_FIELD_SEPARATOR, 1)
+                list_items.setdefault(name, []).append((self._parse_version(raw), item))
+            else:
+                values[field] = self._decode_value(raw)
+        for name, items in list_items.items():
+            ordered = [item for _, item in sorted(items)]
+            # 同名的单值字段（如规则抽取写入的 food）排在列表最前
+            scalar = values.get(name)
+            if scalar is not None and not isinstance(scalar, list) and scalar not in ordered:
+                ordered.insert(0, scalar)
+            values[name] = ordered
+        return values
+
+    def _encode_category(self, fields: Dict[str, Any]) -> Dict[str, str]:
+        """将字段字典编码为哈希字段，列表值拆成逐项字段"""
+        encoded = {}
+        stamp = time.time_ns()
+        for field, value in fields.items():
+            if isinstance(value, list):
+                for offset, item in enumerate(value):
+                    encoded[f"{field}{LIST_FIELD_SEPARATOR}{item}"] = str(stamp + offset)
+            else:
+                encoded[field] = self._encode_value(value)
+        return encoded
+
+    async def _stale_fields(self, categorized: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+        """读取将被替换的字段当前存储的哈希字段（单值字段及其全部列表项）"""
+        categories = list(categorized)
+        async with redis_client.pipeline() as pipe:
+            for category in categories:
+                pipe.hgetall(self._category_key(category))
+        stale = {}
+        for category, existing in zip(categories, pipe.results):
+            names = categorized[category]
+            fields = [field for field in (existing or {}) if field.split(LIST_FIELD_SEPARATOR, 1)[0] in names]
+            if fields:
+                stale[category] = fields
+        return stale
+
+    async def _write_fields(self, categorized: Dict[str, Dict[str, Any]], replace: bool = True) -> int:
+        """写入多个类别的字段，登记类别并递增版本戳，返回新版本号
+
+        replace=True 时字段的新值替换旧值：同一 pipeline 中先 HDEL 旧的单值字段和列表项再 HSET，
+        列表可以缩短或清空；replace=False 时列表值逐项追加（add_preference）。
+        """
+        await self._ensure_migrated()
+        categorized = {category: fields for category, fields in categorized.items() if fields}
+        if not categorized:
+            return self._flat_version or 0
+        stale = await self._stale_fields(categorized) if replace else {}
+        async with redis_client.pipeline() as pipe:
+            for category, fields in categorized.items():
+                key = self._category_key(category)
+                if category in stale:
+                    pipe.hdel(key, *stale[category])
+                encoded = self._encode_category(fields)
+                if encoded:
+                    pipe.hset(key, mapping=encoded)
+            pipe.hset(self.categories_key, mapping={category: "1" for category in categorized})
+            pipe.incr(self.version_key)
+        self._known_categories.update(categorized)
+        # 本地缓存失效，下次读取按新版本重新加载
+        self._flat_cache = None
+        self._flat_version = None
+        return self._parse_version(pipe.results[-1])
+
+    async def _load_all(self) -> Tuple[Dict[str, Dict[str, Any]], int]:
+        """读取全部类别哈希表，返回 (分类信息, 版本号)
+
+        版本戳排在同一 pipeline 的最前面读取：若读取期间发生写入，
+        得到的数据只会比版本戳更新，下次读取时版本不一致会重新加载。
+        """
+        await self._ensure_migrated()
+        categories = sorted(self._known_categories)
+        async with redis_client.pipeline() as pipe:
+            pipe.get(self.version_key)
+            pipe.hgetall(self.categories_key)
+            for category in categories:
+                pipe.hgetall(self._category_key(category))
+        version = self._parse_version(pipe.results[0])
+        registered = pipe.results[1] or {}
+        hashes = dict(zip(categories, pipe.results[2:]))
+
+        # 其他进程写入的新类别，再补读一次
+        extra = [category for category in registered if category not in hashes]
+        if extra:
+            async with redis_client.pipeline() as pipe:
+                for category in extra:
+                    pipe.hgetall(self._category_key(category))
+            hashes.update(zip(extra, pipe.results))
+            self._known_categories.update(extra)
+
+        info = {
+            category: self._decode_category(fields)
+            for category, fields in hashes.items() if fields
+        }
+        return info, version
+
+    async def _ensure_migrated(self) -> None:
+        """首次访问时把旧版 user_info 整体 JSON 迁移为按类别的哈希表"""
+        if self._migrated:
+            return
+        if self._migration_lock is None:
+            self._migration_lock = asyncio.Lock()
+        async with self._migration_lock:
+            if self._migrated:
+                return
+            legacy = self.parse_user_info(await redis_client.get(self.user_info_key))
+            if isinstance(legacy, dict) and legacy:
+                categorized = {
+                    category: self._encode_category(fields)
+                    for category, fields in legacy.items() if isinstance(fields, dict) and fields
+                }
+                async with redis_client.pipeline() as pipe:
+                    for category, fields in categorized.items():
+                        pipe.hset(self._category_key(category), mapping=fields)
+                    if categorized:
+                        pipe.hset(self.categories_key, mapping={category: "1" for category in categorized})
+                    pipe.incr(self.version_key)
+                    pipe.delete(self.user_info_key)
+                self._known_categories.update(categorized)
+                self._flat_cache = None
+                self._flat_version = None
+                logger.info(f"✅ 用户信息已迁移为分类哈希存储: {list(categorized)}")
+            self._migrated = True
     
     async def save_user_info(self, user_info: Dict[str, Any], expiry: int = DEFAULT_EXPIRY) -> bool:
         """
-        永久保存用户信息到Redis
+        永久保存用户信息到Redis（按字段写入，替换这些字段的旧值，不影响其他字段）
         
         Args:
             user_info: 用户信息字典
-            expiry: 过期时间（秒），默认None表示永久保存
+            expiry: 兼容旧接口保留；分类哈希存储下用户信息始终永久保存
             
         Returns:
             保存成功返回True，否则返回False
         """
         try:
-            # 增加判空处理，防止 existing_info 为 None
-            existing_info = await asyncio.wait_for(self.get_user_info(), timeout=5)
-            if existing_info is None:
-                existing_info = {}
             categorized_info = self._categorize_info(user_info)
-            for category, fields in categorized_info.items():
-                if category not in existing_info:
-                    existing_info[category] = {}
-                for field, value in fields.items():
-                    if field in existing_info[category] and existing_info[category][field] == value:
-                        continue
-                    existing_info[category][field] = value
-            await set_key(self.user_info_key, json.dumps(existing_info, ensure_ascii=False), expiry)
+            await self._write_fields(categorized_info)
             logger.info(f"✅ 用户信息保存成功: {user_info}")
             return True
         except Exception as e:
@@ -110,37 +277,60 @@ class UserInfoManager:
         从Redis获取用户信息
         
         Returns:
-            用户信息字典，不存在则返回None
+            按类别组织的用户信息字典，不存在则返回None
         """
         try:
-            user_info_str = await get_key(self.user_info_key)
-            if user_info_str:
-                return json.loads(user_info_str)
-            return None
+            info, _ = await self._load_all()
+            return info or None
         except Exception as e:
             logger.error(f"❌ 获取用户信息失败: {str(e)}")
             return None
-    
-    async def get_flat_user_info(self) -> Dict[str, Any]:
-        """获取扁平化的用户信息（用于对话生成）"""
+
+    def parse_user_info(self, user_info_str: Optional[str]) -> Optional[Dict[str, Any]]:
+        """解析旧版整体存储的用户信息 JSON（迁移时使用）"""
+        if not user_info_str:
+            return None
         try:
-            info = await self.get_user_info()
-            if not info:
-                return {}
-                
-            # 扁平化信息
-            flat_info = {}
-            for category, fields in info.items():
+            return json.loads(user_info_str)
+        except json.JSONDecodeError as e:
+            logger.error(f"❌ 解析用户信息失败: {str(e)}")
+            return None
+
+    @staticmethod
+    def flatten_user_info(info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """将分类存储的用户信息扁平化"""
+        flat_info = {}
+        for fields in (info or {}).values():
+            if isinstance(fields, dict):
                 flat_info.update(fields)
-            
-            return flat_info
+        return flat_info
+    
+    async def get_flat_user_info(self, known_version: Any = None) -> Dict[str, Any]:
+        """获取扁平化的用户信息（用于对话生成）
+
+        Args:
+            known_version: 调用方已批量读取的版本戳（user_info_version 的值），
+                传入时省去一次读取；与缓存版本一致则直接返回缓存
+        """
+        try:
+            await self._ensure_migrated()
+            if known_version is None:
+                known_version = await redis_client.get(self.version_key)
+            version = self._parse_version(known_version)
+            if self._flat_cache is not None and self._flat_version == version:
+                return dict(self._flat_cache)
+
+            info, version = await self._load_all()
+            self._flat_cache = self.flatten_user_info(info)
+            self._flat_version = version
+            return dict(self._flat_cache)
         except Exception as e:
             logger.error(f"❌ 获取扁平化用户信息失败: {str(e)}")
             return {}
     
     async def update_user_info(self, category: str, key: str, value: Any) -> bool:
         """
-        更新用户信息的特定字段
+        更新用户信息的特定字段（替换旧值，列表值整体替换）
         
         Args:
             category: 信息类别（如basic, preferences等）
@@ -151,22 +341,12 @@ class UserInfoManager:
             更新成功返回True，否则返回False
         """
         try:
-            user_info = await self.get_user_info() or {}
-            
-            # 确保类别存在
-            if category not in user_info:
-                user_info[category] = {}
-                
-            # 更新字段值
-            user_info[category][key] = value
-            
             # 添加新字段到相应类别集合中
-            if category in self.info_categories and key not in self.info_categories[category]:
-                if category == "custom":
-                    self.info_categories["custom"].add(key)
-                
-            # 永久保存信息
-            return await set_key(self.user_info_key, json.dumps(user_info))
+            if category == "custom" and key not in self.info_categories["custom"]:
+                self.info_categories["custom"].append(key)
+
+            await self._write_fields({category: {key: value}})
+            return True
         except Exception as e:
             logger.error(f"❌ 更新用户信息失败: {str(e)}")
             return False
@@ -175,6 +355,9 @@ class UserInfoManager:
         """
         添加用户偏好
         
+        每个偏好值是 preferences 哈希表中的独立字段，追加即一次 HSET，
+        重复添加同一值是幂等的，并发追加不同值也不会互相覆盖。
+        
         Args:
             preference_type: 偏好类型（如food, music等）
             value: 偏好值
@@ -183,26 +366,12 @@ class UserInfoManager:
             添加成功返回True，否则返回False
         """
         try:
-            user_info = await self.get_user_info() or {}
-            
-            # 确保preferences类别存在
-            if "preferences" not in user_info:
-                user_info["preferences"] = {}
-                
-            # 对于偏好，我们保存为列表，以支持多个值
-            if preference_type not in user_info["preferences"]:
-                user_info["preferences"][preference_type] = []
-                
-            # 如果偏好值不在列表中，则添加
-            if value not in user_info["preferences"][preference_type]:
-                user_info["preferences"][preference_type].append(value)
-                
             # 更新类别集合
             if preference_type not in self.info_categories["preferences"]:
-                self.info_categories["preferences"].add(preference_type)
-                
-            # 永久保存信息
-            return await set_key(self.user_info_key, json.dumps(user_info))
+                self.info_categories["preferences"].append(preference_type)
+
+            await self._write_fields({"preferences": {preference_type: [value]}}, replace=False)
+            return True
         except Exception as e:
             logger.error(f"❌ 添加用户偏好失败: {str(e)}")
             return False
@@ -236,67 +405,8 @@ class UserInfoManager:
                     return info
             except Exception as e:
                 logger.warning(f"[LLM抽取失败，回退规则] {e}")
-        # 2. 规则兜底
-        info = {}
-        for field, patterns_list in self.extraction_patterns.items():
-            for pattern_dict in patterns_list:
-                patterns = pattern_dict.get("patterns", [])
-                max_length = pattern_dict.get("max_length", 30)
-                suffixes = pattern_dict.get("suffixes", [""])
-                type_check = pattern_dict.get("type", None)
-                keywords = pattern_dict.get("keywords", [])
-                for pattern in patterns:
-                    if pattern in message:
-                        parts = message.split(pattern, 1)
-                        if len(parts) <= 1:
-                            continue
-                        text_part = parts[1]
-                        if keywords:
-                            found_keyword = False
-                            for keyword in keywords:
-                                if keyword in text_part:
-                                    if field == "gender":
-                                        if keyword in ["男生", "男人", "男的"]:
-                                            info[field] = "male"
-                                        elif keyword in ["女生", "女人", "女的"]:
-                                            info[field] = "female"
-                                    else:
-                                        info[field] = keyword
-                                    found_keyword = True
-                                    break
-                            if found_keyword:
-                                break
-                            continue
-                        value = text_part.split("，")[0].split("。")[0].split(",")[0].split(".")[0].strip()
-                        if suffixes != [""]:
-                            has_suffix = False
-                            for suffix in suffixes:
-                                if suffix in value:
-                                    value = value.split(suffix)[0].strip()
-                                    has_suffix = True
-                                    break
-                            if not has_suffix:
-                                continue
-                        if type_check == "number":
-                            try:
-                                num_match = re.search(r'\d+', value)
-                                if num_match:
-                                    num_value = int(num_match.group())
-                                    max_value = pattern_dict.get("max_value", float('inf'))
-                                    if num_value <= max_value:
-                                        info[field] = num_value
-                            except ValueError:
-                                continue
-                        elif type_check == "date":
-                            date_pattern = r'\d{1,4}[-/年]\d{1,2}[-/月]\d{1,2}[日]?'
-                            date_match = re.search(date_pattern, value)
-                            if date_match:
-                                info[field] = date_match.group()
-                        else:
-                            if 1 <= len(value) <= max_length:
-                                info[field] = value
-                                break
-        return info
+        # 2. 规则兜底（预编译规则，无触发词时直接跳过）
+        return self.extractor.extract(message)
         
     async def extract_and_save_user_info(self, message: str) -> Dict[str, Any]:
         """
@@ -317,7 +427,15 @@ class UserInfoManager:
     async def clear_user_info(self) -> bool:
         """清除用户信息（仅用于测试）"""
         try:
-            await set_key(self.user_info_key, "", 1)  # 设置为空并在1秒后过期
+            await self._ensure_migrated()
+            categories = self._known_categories | set(await redis_client.hgetall(self.categories_key))
+            async with redis_client.pipeline() as pipe:
+                for category in categories:
+                    pipe.delete(self._category_key(category))
+                pipe.delete(self.categories_key)
+                pipe.incr(self.version_key)
+            self._flat_cache = None
+            self._flat_version = None
             return True
         except Exception as e:
             logger.error(f"❌ 清除用户信息失败: {str(e)}")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+RedisClient 内存回退存储（MemoryStore）微基准
+
+在 1k / 100k / 1M 条目规模下测量 MemoryStore 的单次操作耗时：
+带 TTL 的写入、命中/未命中读取、超出容量时的淘汰写入、哈希表读写和过期清扫。
+同时给出原先 dict 缓存（超出 max_items 时全量排序并移除最旧的 20%）在淘汰写入上的对照，
+包括一个完整淘汰周期的平均耗时和其中最慢一次写入（即触发排序的那次）。
+
+用法（在 EVA_backend 目录下）：
+    python -m memory_service_app.bench_memory_store [--sizes 1000 100000 1000000] [--ops 200000]
+"""
+
+import argparse
+import gc
+import random
+import time
+from typing import Callable, Dict, List
+
+from memory_service_app.utils.memory_store import MemoryStore
+
+# 原实现默认的本地缓存过期时间（秒）
+LEGACY_MEMORY_TTL = 3600
+
+
+class LegacyMemoryCache:
+    """原 RedisClient._memory_cache 的写入路径，作为对照基线"""
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self._memory_cache: Dict[str, Dict] = {}
+
+    def set(self, key: str, value: str, ex: int = None) -> None:
+        timestamp = time.monotonic()
+        self._memory_cache[key] = {
+            "value": value,
+            "timestamp": timestamp,
+            "expires": timestamp + (ex or LEGACY_MEMORY_TTL)
+        }
+        # 超出容量时按时间戳全量排序，移除最旧的 20%
+        if len(self._memory_cache) > self.max_items:
+            items_to_remove = int(self.max_items * 0.2)
+            sorted_items = sorted(self._memory_cache.items(), key=lambda x: x[1].get("timestamp", 0))
+            for i in range(items_to_remove):
+                if i < len(sorted_items):
+                    del self._memory_cache[sorted_items[i][0]]
+
+
+def per_op(fn: Callable[[int], None], ops: int) -> float:
+    """执行 ops 次 fn(i)，返回每次的平均耗时（微秒）
+
+    与 timeit 一样计时期间关闭 GC，避免大量对象时的回收停顿混入结果
+    """
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for i in range(ops):
+            fn(i)
+        return (time.perf_counter() - start) / ops * 1e6
+    finally:
+        gc.enable()
+
+
+def worst_op(fn: Callable[[int], None], ops: int) -> float:
+    """逐次计时执行 ops 次 fn(i)，返回最慢一次的耗时（微秒）"""
+    worst = 0.0
+    gc.disable()
+    try:
+        for i in range(ops):
+            start = time.perf_counter()
+            fn(i)
+            worst = max(worst, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return worst * 1e6
+
+
+def bench_size(size: int, ops: int, legacy: bool) -> Dict[str, float]:
+    store = MemoryStore(max_items=size)
+    keys = [f"user_msg:{i}" for i in range(size)]
+    ops = min(ops, size)
+    probes = [keys[random.randrange(size)] for _ in range(ops)]
+
+    results = {}
+    results["set+ttl"] = per_op(lambda i: store.set(keys[i], "v", ttl=3600), size)
+    results["get 命中"] = per_op(lambda i: store.get(probes[i]), ops)
+    results["get 未命中"] = per_op(lambda i: store.get(f"missing:{i}"), ops)
+    # 容量已满，每次写入都淘汰一条最久未使用的项
+    results["set 淘汰"] = per_op(lambda i: store.set(f"new:{i}", "v", ttl=3600), ops)
+    results["set 淘汰最慢"] = worst_op(lambda i: store.set(f"newer:{i}", "v", ttl=3600), ops)
+
+    hashes = max(1, ops // 10)
+    results["hset"] = per_op(lambda i: store.hset(f"user_info:{i % hashes}", f"f{i}", "v"), ops)
+    results["hget"] = per_op(lambda i: store.hget(f"user_info:{i % hashes}", f"f{i}"), ops)
+
+    # 一批立即过期的项，测量清扫的单项耗时
+    expiring = min(ops, 100000)
+    for i in range(expiring):
+        store.set(f"expiring:{i}", "v", ttl=1e-6)
+    time.sleep(0.01)
+    start = time.perf_counter()
+    removed = store.sweep_expired(max_items=expiring * 2)
+    results["sweep/项"] = (time.perf_counter() - start) / max(1, removed) * 1e6
+
+    if legacy:
+        # 原实现每超出容量一次就排序并移除 20%，测一个完整的淘汰周期
+        cycle = int(size * 0.2) + 1
+        cache = LegacyMemoryCache(max_items=size)
+        for key in keys:
+            cache._memory_cache[key] = {"value": "v", "timestamp": time.monotonic(), "expires": 0}
+        results["原实现 set 淘汰"] = per_op(lambda i: cache.set(f"new:{i}", "v"), cycle)
+        results["原实现 set 淘汰最慢"] = worst_op(lambda i: cache.set(f"newer:{i}", "v"), cycle)
+    return results
+
+
+def run(sizes: List[int], ops: int, legacy_max_size: int) -> None:
+    print(f"每项为单次操作耗时（µs），未注明的为平均值；读写各 {ops} 次（不超过规模）")
+    for size in sizes:
+        results = bench_size(size, ops, size <= legacy_max_size)
+        line = "  ".join(f"{name}={value:.2f}" for name, value in results.items())
+        print(f"{size:>9,} 条: {line}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MemoryStore 微基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--ops", type=int, default=200000)
+    parser.add_argument("--legacy-max-size", type=int, default=1000000,
+                        help="超过该规模不再运行原实现对照")
+    args = parser.parse_args()
+    random.seed(0)
+    run(args.sizes, args.ops, args.legacy_max_size)
@@ -7,6 +7,7 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 from logs.logs import logger
 from memory_service_app.utils.central_executive import central_executive, CentralExecutive
 from memory_service_app.utils.redis_client import get_key, set_key, redis_client
+from memory_service_app.utils.conversation_writer import conversation_writer
 from channels.layers import get_channel_layer
 from channels.layers import BaseChannelLayer as ChannelLayerWrapper
 from datetime import datetime
@@ -227,19 +228,17 @@ class MemoryConsumer(AsyncWebsocketConsumer):
         
         while retry_count <= max_retries:
             try:
-                # 保存用户消息到 Redis
-                user_msg_key = f"user_msg:{message_id}"
-                await set_key(user_msg_key, user_message, ex=3600)
-                
                 # SecondMe 已替换原有记忆系统，此处 combine_context 调用已移除，无需再拼接上下文
                 final_context = "系统记忆暂时不可用，将仅使用当前对话响应。"
                 if not final_context:
                     logger.warning(f"[MemoryConsumer] 最终上下文为空")
                     return "系统记忆暂时不可用，将仅使用当前对话响应。"
 
-                # 写入 Redis
-                memory_key = f"memory:{message_id}"
-                await set_key(memory_key, final_context, ex=3600)
+                # 用户消息与检索结果一次往返写入 Redis
+                await redis_client.mset({
+                    f"user_msg:{message_id}": user_message,
+                    f"memory:{message_id}": final_context
+                }, ex=3600)
                 
                 logger.info(f"[MemoryConsumer] 记忆检索成功，返回上下文大小: {len(final_context)} 字符")
                 return final_context
@@ -270,6 +269,7 @@ class MemoryConsumer(AsyncWebsocketConsumer):
 
             # 构建对话上下文
             conversation_context = {
+                "message_id": message_id,
                 "user_message": user_message,
                 "assistant_response": assistant_response,
                 "system_context": system_context,
@@ -283,17 +283,9 @@ class MemoryConsumer(AsyncWebsocketConsumer):
             #     input_text=conversation_context["user_message"],
             #     response_text=conversation_context["assistant_response"]
             # )
-            logger.info(f"[DEBUG][save_conversation] 即将调用 central_executive.process_input")
-            try:
-                process_result = await self.central_executive.process_input(user_message)
-                logger.info(f"[DEBUG][save_conversation] central_executive.process_input 返回: {process_result}")
-                if process_result:
-                    stage = process_result.get("stage", "unknown")
-                    logger.info(f"✅ 中央执行器处理完成 (message_id={message_id}), 阶段={stage}")
-                else:
-                    logger.warning(f"[DEBUG][save_conversation] process_input 返回 None 或空")
-            except Exception as e:
-                logger.error(f"❌ central_executive.process_input 调用异常: {str(e)}", exc_info=True)
+            # 交给后台写入队列，不阻塞后续的 retrieve_memory 事件
+            queued = conversation_writer.submit(conversation_context)
+            logger.info(f"[DEBUG][save_conversation] 已提交后台写入 (message_id={message_id}, queued={queued})")
 
         except Exception as e:
             logger.error(f"❌ save_conversation 主流程异常: {str(e)}", exc_info=True)
@@ -1,2 +1,322 @@
 
-# Create your tests here.
+# EVA_backend/memory_service_app/tests.py
+import asyncio
+import os
+import tempfile
+from unittest import mock
+from django.test import SimpleTestCase
+from redis.exceptions import ResponseError
+from memory_service_app.utils import redis_client as redis_client_module
+from memory_service_app.utils.redis_client import RedisClient
+from memory_service_app.utils.conversation_writer import ConversationWriter
+from memory_service_app.utils.memory_classifier_adapter import SecondMeMemoryAdapter
+from master_evolution import user_info_manager as user_info_manager_module
+from master_evolution.user_info_manager import UserInfoManager
+
+
+class FakeRedis:
+    """可切换可用状态的本地 Redis 替身"""
+
+    def __init__(self):
+        self.up = True
+        self.data = {}
+        self.hashes = {}
+
+    def _check(self):
+        if not self.up:
+            raise ConnectionError("redis down")
+
+    async def ping(self):
+        self._check()
+        return True
+
+    async def set(self, key, value, ex=None):
+        self._check()
+        self.data[key] = value
+        return True
+
+    async def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    async def delete(self, key):
+        self._check()
+        self.data.pop(key, None)
+
+    async def hset(self, name, key=None, value=None, mapping=None):
+        self._check()
+        fields = dict(mapping or {})
+        if key is not None:
+            fields[key] = value
+        self.hashes.setdefault(name, {}).update(fields)
+        return len(fields)
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append(("set", key, value))
+
+    def get(self, key):
+        self.commands.append(("get", key))
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        fields = dict(mapping or {})
+        if key is not None:
+            fields[key] = value
+        self.commands.append(("hset", name, fields))
+
+    def delete(self, key):
+        self.commands.append(("del", key))
+
+    def hdel(self, name, *keys):
+        self.commands.append(("hdel", name, keys))
+
+    def incrby(self, key, amount):
+        self.commands.append(("incrby", key, amount))
+
+    def _run(self, command):
+        if command[0] == "set":
+            self.redis.data[command[1]] = command[2]
+            return True
+        if command[0] == "get":
+            return self.redis.data.get(command[1])
+        if command[0] == "hset":
+            if command[1] in self.redis.data:
+                raise ResponseError("WRONGTYPE Operation against a key holding the wrong kind of value")
+            self.redis.hashes.setdefault(command[1], {}).update(command[2])
+            return len(command[2])
+        if command[0] == "del":
+            return int(self.redis.data.pop(command[1], None) is not None)
+        if command[0] == "hdel":
+            fields = self.redis.hashes.get(command[1], {})
+            return sum(fields.pop(key, None) is not None for key in command[2])
+        if command[0] == "incrby":
+            self.redis.data[command[1]] = str(int(self.redis.data.get(command[1], 0)) + command[2])
+            return int(self.redis.data[command[1]])
+
+    async def execute(self, raise_on_error=True):
+        # 与 redis-py 的非事务管道一致：逐条执行，单条出错不影响其他命令
+        self.redis._check()
+        results = []
+        for command in self.commands:
+            try:
+                results.append(self._run(command))
+            except ResponseError as e:
+                results.append(e)
+        errors = [result for result in results if isinstance(result, Exception)]
+        if raise_on_error and errors:
+            raise errors[0]
+        return results
+
+
+@mock.patch.object(redis_client_module, "send_system_notification_to_frontend", new=mock.AsyncMock())
+@mock.patch.dict(redis_client_module.REDIS_CONFIG["recovery"], {"initial_delay": 0.01, "max_delay": 0.02})
+class RedisRecoveryTestCase(SimpleTestCase):
+    def _make_client(self):
+        client = RedisClient()
+        client._client = FakeRedis()
+        return client
+
+    async def _wait_until(self, predicate, timeout=1.0):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not predicate():
+            if asyncio.get_running_loop().time() > deadline:
+                self.fail("等待条件超时")
+            await asyncio.sleep(0.01)
+
+    async def test_writes_during_outage_are_replayed(self):
+        """Redis 故障期间的写操作在恢复后重放，并自动切回 Redis"""
+        client = self._make_client()
+        fake = client._client
+        fake.up = False
+
+        await client.set("user_msg:1", "你好")
+        await client.hset("user_info:basic", "name", "小明")
+        self.assertTrue(client._use_memory_fallback)
+        self.assertEqual(await client.get("user_msg:1"), "你好")
+
+        fake.up = True
+        await self._wait_until(lambda: not client._use_memory_fallback)
+
+        self.assertEqual(fake.data["user_msg:1"], "你好")
+        self.assertEqual(fake.hashes["user_info:basic"]["name"], "小明")
+        self.assertEqual(len(client._journal), 0)
+        await client.close()
+
+    async def test_stays_in_fallback_while_redis_down(self):
+        """Redis 未恢复时保持回退模式，写日志不丢失"""
+        client = self._make_client()
+        fake = client._client
+        fake.up = False
+
+        await client.set("memory:1", "上下文", ex=3600)
+        await client.delete("user_msg:1")
+        await asyncio.sleep(0.05)
+
+        self.assertTrue(client._use_memory_fallback)
+        self.assertEqual(len(client._journal), 2)
+        await client.close()
+
+    async def test_pipeline_in_memory_mode_matches_single_commands(self):
+        """内存模式下 pipeline 的结果与单条命令一致，写操作进入重放日志"""
+        client = self._make_client()
+        client._client.up = False
+        client._enter_fallback()
+
+        async with client.pipeline() as pipe:
+            pipe.set("user_msg:1", "你好", ex=3600)
+            pipe.hset("user_info:basic", mapping={"name": "小明", "age": 18})
+            pipe.get("user_msg:1")
+            pipe.hmget("user_info:basic", ["name", "age", "missing"])
+
+        self.assertEqual(pipe.results, [True, 2, "你好", ["小明", "18", None]])
+        self.assertEqual(len(client._journal), 3)
+        await client.close()
+
+    async def test_pipeline_command_error_does_not_fall_back(self):
+        """单条命令出错时抛出该错误，已生效的命令不在内存中重做，也不进入回退模式"""
+        client = self._make_client()
+        fake = client._client
+        fake.data["user_info:basic"] = "旧版字符串值"
+
+        with self.assertRaises(ResponseError):
+            async with client.pipeline() as pipe:
+                pipe.set("user_msg:1", "你好", ex=3600)
+                pipe.hset("user_info:basic", mapping={"name": "小明"})
+                pipe.incr("user_info_version")
+
+        self.assertIsInstance(pipe.results[1], ResponseError)
+        self.assertEqual(fake.data["user_msg:1"], "你好")
+        self.assertEqual(fake.data["user_info_version"], "1")
+        self.assertFalse(client._use_memory_fallback)
+        self.assertEqual(len(client._journal), 0)
+        await client.close()
+
+    async def test_incr_during_outage_replays_as_increment(self):
+        """回退期间的自增以增量重放，不会覆盖其他进程在 Redis 中的自增"""
+        client = self._make_client()
+        fake = client._client
+        fake.data["user_info_version"] = "5"
+        fake.up = False
+
+        self.assertEqual(await client.incr("user_info_version"), 1)
+        # 其他进程在 Redis 恢复前已完成自增
+        fake.data["user_info_version"] = "6"
+        fake.up = True
+        await self._wait_until(lambda: not client._use_memory_fallback)
+
+        self.assertEqual(fake.data["user_info_version"], "7")
+        await client.close()
+
+
+@mock.patch.object(redis_client_module, "send_system_notification_to_frontend", new=mock.AsyncMock())
+class UserInfoManagerTestCase(SimpleTestCase):
+    def setUp(self):
+        # 内存回退模式下的 RedisClient，pipeline 在本地执行
+        self.client = RedisClient()
+        self.client._client = FakeRedis()
+        self.client._client.up = False
+        patcher = mock.patch.object(user_info_manager_module, "redis_client", self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = UserInfoManager()
+
+    async def test_saving_shorter_list_replaces_old_items(self):
+        """保存更短的列表或单值时替换旧值，add_preference 仍为追加"""
+        self.client._enter_fallback()
+        await self.manager.save_user_info({"food": ["火锅", "烧烤", "寿司"]})
+        await self.manager.save_user_info({"food": ["面条"]})
+        self.assertEqual((await self.manager.get_flat_user_info())["food"], ["面条"])
+
+        await self.manager.add_preference("food", "饺子")
+        self.assertEqual((await self.manager.get_flat_user_info())["food"], ["面条", "饺子"])
+
+        await self.manager.update_user_info("preferences", "food", "米饭")
+        self.assertEqual((await self.manager.get_flat_user_info())["food"], "米饭")
+
+        await self.manager.update_user_info("preferences", "food", [])
+        self.assertNotIn("food", await self.manager.get_flat_user_info())
+        await self.client.close()
+
+
+class ConversationWriterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.persisted = []
+        self.gate = asyncio.Event()
+        self.spill_path = os.path.join(tempfile.mkdtemp(), "spill.jsonl")
+
+    async def _persist(self, conversation):
+        await self.gate.wait()
+        self.persisted.append(conversation["message_id"])
+
+    async def test_submit_does_not_wait_for_persist(self):
+        """提交后立即返回，队列满时丢弃最旧的对话"""
+        writer = ConversationWriter(self._persist, queue_size=3, workers=1, spill_path=self.spill_path)
+        for i in range(5):
+            writer.submit({"message_id": i})
+        self.assertEqual(writer.stats["dropped"], 2)
+
+        self.gate.set()
+        await writer.flush(timeout=1)
+        self.assertEqual(self.persisted, [2, 3, 4])
+        self.assertEqual(writer.metrics()["persist_latency"]["count"], 3)
+        await writer.close()
+
+    async def test_spilled_conversations_are_replayed(self):
+        """溢出到磁盘及关闭时未写完的对话在下次启动时回放"""
+        writer = ConversationWriter(
+            self._persist, queue_size=2, workers=1, overflow="spill", spill_path=self.spill_path
+        )
+        for i in range(4):
+            writer.submit({"message_id": i})
+        await writer.close(timeout=0.05)
+        self.assertTrue(os.path.exists(self.spill_path))
+
+        self.gate.set()
+        writer = ConversationWriter(
+            self._persist, queue_size=4, workers=1, overflow="spill", spill_path=self.spill_path
+        )
+        await writer.start()
+        await writer.close(timeout=1)
+        self.assertEqual(sorted(self.persisted), [0, 1, 2, 3])
+        self.assertFalse(os.path.exists(self.spill_path))
+
+    async def test_worker_persists_a_batch_concurrently(self):
+        """单个 worker 一次取出一批对话并发写入，全部写完才算完成"""
+        writer = ConversationWriter(self._persist, queue_size=10, workers=1, batch_size=4, spill_path=self.spill_path)
+        for i in range(6):
+            writer.submit({"message_id": i})
+        await asyncio.sleep(0.01)
+        self.assertEqual([c["message_id"] for c in writer._inflight[0]], [0, 1, 2, 3])
+
+        self.gate.set()
+        await writer.flush(timeout=1)
+        self.assertEqual(sorted(self.persisted), list(range(6)))
+        self.assertEqual(writer.stats["persisted"], 6)
+        await writer.close()
+
+
+class SecondMeMemoryAdapterTestCase(SimpleTestCase):
+    async def test_cancelled_wait_withdraws_pending_memory(self):
+        """等待写入的调用被取消时，尚未发送的记忆从队列撤回"""
+        adapter = SecondMeMemoryAdapter()
+        adapter.flush_interval = 60
+        task = asyncio.create_task(adapter.add_memory("你好", wait=True))
+        await asyncio.sleep(0)
+        self.assertEqual(len(adapter._pending), 1)
+
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(adapter._pending, [])
+        adapter._flush_task.cancel()
@@ -88,7 +88,11 @@ class CentralExecutive(BaseMemoryModule):
 
         logger.info("[CentralExecutive] 初始化完成")
 
-    async def process_input(self, raw_input: str) -> Optional[Dict]:
+    async def process_input(self, raw_input: str, wait: bool = False) -> Optional[Dict]:
+        """
+        处理输入并写入记忆
+        :param wait: 为 True 时等待记忆实际写入 SecondMe 后返回，否则入队即返回
+        """
         logger.info(f"[DEBUG][central_executive.process_input] 被调用，raw_input: {raw_input}")
         try:
             # 1. 直接处理原始输入
@@ -99,7 +103,7 @@ class CentralExecutive(BaseMemoryModule):
                 return {"stage": "short_term", "reason": "input_empty", "input": raw_input}
 
             # 2. 通过 MemoryClassifierAdapter 添加记忆
-            add_result = await self.memory_adapter.add_memory(processed["clean_text"])
+            add_result = await self.memory_adapter.add_memory(processed["clean_text"], wait=wait)
             logger.info(f"[CentralExecutive] 已保存记忆: {processed['clean_text'][:30]}... 结果: {add_result}")
             store_result = {
                 "status": "stored",
@@ -0,0 +1,261 @@
+# EVA_backend/memory_service_app/utils/conversation_writer.py
+
+import os
+import json
+import time
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from logs.logs import logger
+from llm_manager_app.utils.latency_histogram import LatencyHistogram
+
+# 写入队列参数，可通过环境变量覆盖
+DEFAULT_QUEUE_SIZE = int(os.environ.get("MEMORY_WRITE_QUEUE_SIZE", "500"))
+DEFAULT_WORKERS = int(os.environ.get("MEMORY_WRITE_WORKERS", "2"))
+# 每个 worker 一次最多并发写入的对话数，与 SecondMe 适配器的批量大小对齐以便合并为一次请求
+DEFAULT_BATCH_SIZE = int(os.environ.get("MEMORY_WRITE_BATCH_SIZE", os.environ.get("SECONDME_MEMORY_BATCH_SIZE", "16")))
+# 队列满时的策略: drop_oldest 丢弃最旧的一条; spill 溢出写入磁盘，队列空闲后回放
+DEFAULT_OVERFLOW = os.environ.get("MEMORY_WRITE_OVERFLOW", "drop_oldest").lower()
+DEFAULT_SPILL_PATH = os.environ.get("MEMORY_WRITE_SPILL_PATH", "data/memory_write_spill.jsonl")
+DEFAULT_SHUTDOWN_TIMEOUT = float(os.environ.get("MEMORY_WRITE_SHUTDOWN_TIMEOUT", "10"))
+# 每完成多少次写入输出一次统计日志
+REPORT_EVERY = 50
+
+
+class ConversationWriter:
+    """
+    💾 对话记忆后台写入器（write-behind）
+
+    - submit 只把对话放入有界队列并立即返回，回复链路不等待记忆写入
+    - 固定数量的 worker 每次从队列取出至多 batch_size 条对话，并发调用 persist 写入记忆；
+      persist 等到记忆实际写入后才返回，写入延迟统计与关闭时的溢出保证都覆盖真实写入
+    - 队列满时按 overflow 策略丢弃最旧的对话或溢出到磁盘
+    - close 时等待队列写完（超时则把剩余对话溢出到磁盘，下次启动回放）
+    """
+
+    def __init__(
+        self,
+        persist: Callable[[Dict], Awaitable[Optional[Dict]]],
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        workers: int = DEFAULT_WORKERS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        overflow: str = DEFAULT_OVERFLOW,
+        spill_path: str = DEFAULT_SPILL_PATH,
+    ):
+        if overflow not in ("drop_oldest", "spill"):
+            logger.warning(f"⚠️ 未知的记忆写入溢出策略: {overflow}，使用 drop_oldest")
+            overflow = "drop_oldest"
+        self.persist = persist
+        self.queue_size = queue_size
+        self.worker_count = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.overflow = overflow
+        self.spill_path = spill_path
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[asyncio.Task] = []
+        # worker 编号 -> 正在写入的对话，关闭超时时一并溢出
+        self._inflight: Dict[int, List[Dict]] = {}
+        self._spill_lock: Optional[asyncio.Lock] = None
+        self._closing = False
+        self._has_spill = os.path.exists(spill_path)
+        self.latency = LatencyHistogram("memory_persist")
+        self.stats = {"submitted": 0, "persisted": 0, "failed": 0, "dropped": 0, "spilled": 0, "replayed": 0}
+
+    def _ensure_started(self):
+        """在当前事件循环上创建队列和 worker（循环变化时重建）"""
+        loop = asyncio.get_running_loop()
+        if self._queue is not None and self._loop is loop:
+            return
+        if self._queue is not None:
+            logger.warning("⚠️ 记忆写入队列所属事件循环已变化，重新创建队列")
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._loop = loop
+        self._spill_lock = asyncio.Lock()
+        self._closing = False
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"memory-writer-{index}")
+            for index in range(self.worker_count)
+        ]
+        logger.info(f"✅ 记忆写入队列已启动: 容量={self.queue_size}, worker={self.worker_count}, 溢出策略={self.overflow}")
+
+    async def start(self):
+        """启动 worker，并回放上次关闭时溢出到磁盘的对话"""
+        self._ensure_started()
+        await self._replay_spill()
+
+    def submit(self, conversation: Dict) -> bool:
+        """
+        提交一条待写入的对话，不等待写入
+        :return: 是否进入了内存队列（溢出到磁盘或被丢弃时为 False）
+        """
+        self._ensure_started()
+        self.stats["submitted"] += 1
+        item = (time.perf_counter(), conversation)
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.overflow == "spill":
+            self._spill([conversation])
+            return False
+
+        # drop_oldest: 丢掉最旧的一条为新对话腾出位置
+        try:
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self.stats["dropped"] += 1
+            logger.warning(f"⚠️ 记忆写入队列已满 ({self.queue_size})，丢弃最旧的对话，累计丢弃 {self.stats['dropped']} 条")
+        except asyncio.QueueEmpty:
+            pass
+        self._queue.put_nowait(item)
+        return True
+
+    async def _worker(self, index: int):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            self._inflight[index] = [conversation for _, conversation in batch]
+            reported = self.latency.count // REPORT_EVERY
+            try:
+                results = await asyncio.gather(
+                    *(self.persist(conversation) for _, conversation in batch), return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        self.stats["failed"] += 1
+                        logger.error(f"❌ 后台写入对话记忆失败 (worker={index}): {str(result)}", exc_info=result)
+                    else:
+                        self.stats["persisted"] += 1
+            finally:
+                self._inflight.pop(index, None)
+                # 统计从入队到写入完成的总耗时
+                finished_at = time.perf_counter()
+                for enqueued_at, _ in batch:
+                    self.latency.observe(finished_at - enqueued_at)
+                    self._queue.task_done()
+
+            if self.latency.count // REPORT_EVERY != reported:
+                logger.info(f"📊 记忆写入统计: {self.metrics()}")
+            if self._has_spill and self._queue.empty() and not self._closing:
+                await self._replay_spill()
+
+    def _spill(self, conversations: List[Dict]):
+        """把对话追加到磁盘溢出文件"""
+        try:
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for conversation in conversations:
+                    f.write(json.dumps(conversation, ensure_ascii=False) + "\n")
+            self.stats["spilled"] += len(conversations)
+            self._has_spill = True
+            logger.warning(f"⚠️ {len(conversations)} 条对话已溢出到磁盘: {self.spill_path}")
+        except Exception as e:
+            self.stats["dropped"] += len(conversations)
+            logger.error(f"❌ 对话溢出到磁盘失败，丢弃 {len(conversations)} 条: {str(e)}")
+
+    async def _replay_spill(self):
+        """把磁盘上溢出的对话重新放回队列，放不下的留在文件中"""
+        if not os.path.exists(self.spill_path):
+            self._has_spill = False
+            return
+        async with self._spill_lock:
+            try:
+                with open(self.spill_path, "r", encoding="utf-8") as f:
+                    lines = [line for line in f if line.strip()]
+            except Exception as e:
+                logger.error(f"❌ 读取对话溢出文件失败: {str(e)}")
+                return
+
+            replayed = 0
+            now = time.perf_counter()
+            while replayed < len(lines) and not self._queue.full():
+                try:
+                    conversation = json.loads(lines[replayed])
+                except json.JSONDecodeError:
+                    logger.warning("⚠️ 跳过损坏的对话溢出记录")
+                else:
+                    self._queue.put_nowait((now, conversation))
+                replayed += 1
+
+            remaining = lines[replayed:]
+            if remaining:
+                with open(self.spill_path, "w", encoding="utf-8") as f:
+                    f.writelines(remaining)
+            else:
+                os.remove(self.spill_path)
+                self._has_spill = False
+            self.stats["replayed"] += replayed
+            if replayed:
+                logger.info(f"🔁 已回放 {replayed} 条溢出的对话，剩余 {len(remaining)} 条")
+
+    def metrics(self) -> Dict:
+        """队列深度与写入延迟指标"""
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            **self.stats,
+            "persist_latency": self.latency.snapshot(),
+        }
+
+    async def flush(self, timeout: Optional[float] = None):
+        """等待队列中已有的对话全部写入"""
+        if self._queue is None:
+            return
+        await asyncio.wait_for(self._queue.join(), timeout)
+
+    async def close(self, timeout: float = DEFAULT_SHUTDOWN_TIMEOUT):
+        """写完剩余对话后停止 worker；超时未写完的对话溢出到磁盘"""
+        if self._queue is None:
+            return
+        self._closing = True
+        pending = self._queue.qsize()
+        if pending:
+            logger.info(f"💾 关闭前写入剩余 {pending} 条对话")
+        try:
+            await self.flush(timeout)
+        except asyncio.TimeoutError:
+            # 正在写入的对话随 worker 取消从适配器队列撤回，由溢出文件在下次启动时补写
+            leftover = [conversation for batch in self._inflight.values() for conversation in batch]
+            self._inflight.clear()
+            while not self._queue.empty():
+                leftover.append(self._queue.get_nowait()[1])
+                self._queue.task_done()
+            logger.warning(f"⚠️ 关闭超时，{len(leftover)} 条对话未写入")
+            if leftover:
+                self._spill(leftover)
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._loop = None
+        logger.info(f"✅ 记忆写入队列已关闭: {self.metrics()}")
+
+
+async def _persist_conversation(conversation: Dict) -> Optional[Dict]:
+    from memory_service_app.utils.central_executive import central_executive
+
+    # wait=True: 等 SecondMe 实际写入后返回，写入失败计入 failed
+    result = await central_executive.process_input(conversation["user_message"], wait=True)
+    if result and result.get("stage") == "error":
+        raise RuntimeError(result.get("error"))
+    adapter_result = (result or {}).get("result", {}).get("adapter_result")
+    if isinstance(adapter_result, dict) and adapter_result.get("success") is False:
+        raise RuntimeError(adapter_result.get("error"))
+    if result:
+        logger.info(f"✅ 中央执行器处理完成 (message_id={conversation.get('message_id')}), 阶段={result.get('stage', 'unknown')}")
+    else:
+        logger.warning(f"⚠️ process_input 返回 None 或空 (message_id={conversation.get('message_id')})")
+    return result
+
+
+# 全局单例
+conversation_writer = ConversationWriter(_persist_conversation)
@@ -1,61 +1,209 @@
 import os
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
 import httpx
 from logs.logs import logger
 
+# 连接池与写入队列参数，可通过环境变量覆盖
+DEFAULT_MAX_CONNECTIONS = int(os.environ.get("SECONDME_MAX_CONNECTIONS", "20"))
+DEFAULT_MAX_KEEPALIVE = int(os.environ.get("SECONDME_MAX_KEEPALIVE", "10"))
+DEFAULT_KEEPALIVE_EXPIRY = float(os.environ.get("SECONDME_KEEPALIVE_EXPIRY", "30"))
+DEFAULT_FLUSH_INTERVAL = float(os.environ.get("SECONDME_MEMORY_FLUSH_INTERVAL", "2.0"))
+DEFAULT_BATCH_SIZE = int(os.environ.get("SECONDME_MEMORY_BATCH_SIZE", "16"))
+DEFAULT_QUEUE_LIMIT = int(os.environ.get("SECONDME_MEMORY_QUEUE_LIMIT", "1000"))
+# 写入记忆只需要 SecondMe 接收对话，不需要完整生成回复
+DEFAULT_MEMORY_MAX_TOKENS = int(os.environ.get("SECONDME_MEMORY_MAX_TOKENS", "1"))
+DEFAULT_SYSTEM_PROMPT = "你是一个有记忆的助手。"
+
 
 class SecondMeMemoryAdapter:
     """
     🧠 SecondMe 记忆系统适配器
     用于统一对接 SecondMe 的嵌入式记忆 API（包括存储与检索）
+
+    - 所有请求复用一个带连接池（keep-alive）的 httpx.AsyncClient，关闭时释放
+    - add_memory 只入队，后台按时间间隔或批量大小合并为一次 chat 请求写入
+    - 相同参数的 get_memory 在请求未返回前只发出一次，其余调用共享结果
     """
 
     def __init__(self):
         self.api_host = os.environ.get("SECONDME_API_URL", "http://localhost:8002")
         self.chat_url = f"{self.api_host}/api/kernel2/chat"
         self.search_url = f"{self.api_host}/api/memory/search"
+        self.flush_interval = DEFAULT_FLUSH_INTERVAL
+        self.batch_size = DEFAULT_BATCH_SIZE
+        self.queue_limit = DEFAULT_QUEUE_LIMIT
+        self.memory_max_tokens = DEFAULT_MEMORY_MAX_TOKENS
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        # 待写入记忆: (system_prompt, user_input, 等待结果的 future 或 None)
+        self._pending: List[Tuple[str, str, Optional[asyncio.Future]]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._background: set = set()
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self.stats = {"queued": 0, "written": 0, "batches": 0, "failed": 0, "searches": 0, "coalesced": 0}
         logger.info(f"[SecondMeAdapter] 初始化成功，Chat 接口: {self.chat_url}")
 
-    async def add_memory(self, user_input: str, system_prompt: str = "你是一个有记忆的助手。"):
+    async def initialize(self):
+        """提前创建连接池"""
+        await self._get_client()
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """获取（必要时创建）带连接池的共享客户端"""
+        loop = asyncio.get_running_loop()
+        if self._client is not None and not self._client.is_closed and self._client_loop is loop:
+            return self._client
+
+        # 客户端绑定在创建它的事件循环上，循环变化时需要重建
+        if self._client is not None and not self._client.is_closed and self._client_loop is not loop:
+            logger.warning("[SecondMeAdapter] HTTP 客户端所属事件循环已变化，重新创建客户端")
+            self._flush_lock = None
+
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=DEFAULT_MAX_CONNECTIONS,
+                max_keepalive_connections=DEFAULT_MAX_KEEPALIVE,
+                keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(15.0, connect=5.0),
+        )
+        self._client_loop = loop
+        logger.info("[SecondMeAdapter] HTTP 客户端已创建（连接池复用）")
+        return self._client
+
+    async def add_memory(self, user_input: str, system_prompt: str = DEFAULT_SYSTEM_PROMPT, wait: bool = False):
         """
-        将用户输入通过对话格式写入 SecondMe 系统，让其自动融合上下文并学习。
+        将用户输入加入写入队列，由后台批量通过对话格式写入 SecondMe 系统。
         :param user_input: 用户内容
         :param system_prompt: 系统提示词（可选）
-        :return: 响应结果（生成内容或写入结果）
+        :param wait: 为 True 时等待本条所在批次写入完成并返回其结果
+        :return: 入队确认；wait=True 时为写入结果
         """
-        data = {
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_input}
-            ],
-            "stream": False
-        }
+        if len(self._pending) >= self.queue_limit:
+            logger.warning(f"[SecondMeAdapter] ⚠️ 记忆写入队列已满 ({len(self._pending)})，立即刷新")
+            await self.flush()
+
+        future = asyncio.get_running_loop().create_future() if wait else None
+        self._pending.append((system_prompt, user_input, future))
+        self.stats["queued"] += 1
+
+        if len(self._pending) >= self.batch_size:
+            task = asyncio.create_task(self.flush())
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+        if future is not None:
+            try:
+                return await future
+            except asyncio.CancelledError:
+                # 调用方放弃等待（如关闭超时后由调用方另行保存）：尚未发送的本条从队列撤回，避免重复写入
+                self._pending = [entry for entry in self._pending if entry[2] is not future]
+                raise
+        return {"success": True, "queued": True, "pending": len(self._pending)}
+
+    async def _flush_later(self):
+        """后台定时刷新，队列清空后退出"""
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.post(self.chat_url, json=data, timeout=15)
-                resp.raise_for_status()
-                logger.debug(f"[SecondMeAdapter] ✅ 添加记忆成功: {user_input[:30]}...")
-                return resp.json()
+            while self._pending:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+        except asyncio.CancelledError:
+            pass
         except Exception as e:
-            logger.error(f"[SecondMeAdapter] ❌ 添加记忆失败: {e}")
-            return {"success": False, "error": str(e)}
+            logger.error(f"[SecondMeAdapter] ❌ 后台刷新记忆失败: {e}")
+
+    async def flush(self):
+        """把队列中的记忆全部写入 SecondMe"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:len(batch)]
+                await self._send_batch(batch)
+
+    async def _send_batch(self, batch: List[Tuple[str, str, Optional[asyncio.Future]]]):
+        # 同一系统提示词的连续记忆合并为一次对话请求
+        groups: List[Tuple[str, List[Tuple[str, Optional[asyncio.Future]]]]] = []
+        for system_prompt, user_input, future in batch:
+            if groups and groups[-1][0] == system_prompt:
+                groups[-1][1].append((user_input, future))
+            else:
+                groups.append((system_prompt, [(user_input, future)]))
+
+        client = await self._get_client()
+        for system_prompt, items in groups:
+            data = {
+                "messages": [{"role": "system", "content": system_prompt}]
+                + [{"role": "user", "content": user_input} for user_input, _ in items],
+                "stream": False,
+                "max_tokens": self.memory_max_tokens,
+            }
+            try:
+                resp = await client.post(self.chat_url, json=data)
+                resp.raise_for_status()
+                result = resp.json()
+                self.stats["written"] += len(items)
+                logger.debug(f"[SecondMeAdapter] ✅ 批量添加记忆成功: {len(items)} 条")
+            except Exception as e:
+                self.stats["failed"] += len(items)
+                logger.error(f"[SecondMeAdapter] ❌ 批量添加记忆失败 ({len(items)} 条): {e}")
+                result = {"success": False, "error": str(e)}
+            self.stats["batches"] += 1
+            for _, future in items:
+                if future is not None and not future.done():
+                    future.set_result(result)
 
     async def get_memory(self, query: str, top_k: int = 5):
         """
-        从 SecondMe 系统中检索语义相似记忆内容
+        从 SecondMe 系统中检索语义相似记忆内容（相同查询进行中时共享同一请求）
         :param query: 查询文本
         :param top_k: 返回结果数
         :return: 检索结果列表
         """
+        key = (asyncio.get_running_loop(), query, top_k)
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            task = asyncio.create_task(self._search(query, top_k))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: 单个调用方被取消不影响共享请求
+        return await asyncio.shield(task)
+
+    async def _search(self, query: str, top_k: int):
         params = {"query": query, "top_k": top_k}
+        self.stats["searches"] += 1
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(self.search_url, params=params, timeout=10)
-                resp.raise_for_status()
-                logger.debug(f"[SecondMeAdapter] ✅ 检索记忆成功: {query}")
-                return resp.json()
+            client = await self._get_client()
+            resp = await client.get(self.search_url, params=params, timeout=10)
+            resp.raise_for_status()
+            logger.debug(f"[SecondMeAdapter] ✅ 检索记忆成功: {query}")
+            return resp.json()
         except Exception as e:
             logger.error(f"[SecondMeAdapter] ❌ 检索记忆失败: {e}")
             return {"success": False, "error": str(e)}
 
+    async def close(self):
+        """写入剩余记忆并关闭连接池"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        if self._pending:
+            logger.info(f"[SecondMeAdapter] 关闭前写入剩余 {len(self._pending)} 条记忆")
+            await self.flush()
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("[SecondMeAdapter] HTTP 客户端已关闭")
+        self._client = None
+        self._client_loop = None
+
 # 兼容旧代码的类名别名
 MemoryClassifierAdapter = SecondMeMemoryAdapter
@@ -0,0 +1,207 @@
+# EVA_backend/memory_service_app/utils/memory_store.py
+
+import asyncio
+import heapq
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from logs.logs import logger
+
+# 过期清扫间隔（秒）
+DEFAULT_SWEEP_INTERVAL = 30
+# 单次清扫最多处理的过期项，避免长时间占用事件循环
+DEFAULT_SWEEP_BATCH = 1000
+
+
+class _Entry:
+    """存储项：字符串值或哈希表（dict），以及过期时间（None 表示不过期）"""
+
+    __slots__ = ("value", "expires_at")
+
+    def __init__(self, value, expires_at: Optional[float]):
+        self.value = value
+        self.expires_at = expires_at
+
+
+class MemoryStore:
+    """进程内的有界 LRU/TTL 存储，作为 Redis 不可用时的回退
+
+    - 字符串键和哈希表共用一个 OrderedDict，按 LRU 顺序淘汰，总条目数不超过 max_items
+    - get/set 等操作均为 O(1)；每条读路径都会检查过期时间
+    - 过期时间另存一个最小堆，后台任务定期弹出已过期的项，无需全量扫描
+    """
+
+    def __init__(self, max_items: int = 1000, sweep_interval: float = DEFAULT_SWEEP_INTERVAL):
+        self.max_items = max_items
+        self.sweep_interval = sweep_interval
+        self._data: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._sweeper: Optional[asyncio.Task] = None
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return self._get_entry(key) is not None
+
+    # ---------- 内部工具 ----------
+
+    def _get_entry(self, key: str) -> Optional[_Entry]:
+        """取出未过期的项并刷新 LRU 顺序，过期项顺带删除"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            del self._data[key]
+            self.stats["expired"] += 1
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _put_entry(self, key: str, entry: _Entry) -> None:
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        if entry.expires_at is not None:
+            heapq.heappush(self._expiry_heap, (entry.expires_at, key))
+        while len(self._data) > self.max_items:
+            self._data.popitem(last=False)
+            self.stats["evictions"] += 1
+        self._ensure_sweeper()
+
+    @staticmethod
+    def _expires_at(ttl: Optional[float]) -> Optional[float]:
+        return time.monotonic() + ttl if ttl else None
+
+    # ---------- 字符串操作 ----------
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._get_entry(key)
+        if entry is None or isinstance(entry.value, dict):
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return entry.value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """写入字符串值，ttl 为秒数，None 表示不过期"""
+        self._put_entry(key, _Entry(value, self._expires_at(ttl)))
+
+    def delete(self, key: str) -> bool:
+        return self._data.pop(key, None) is not None
+
+    def exists(self, key: str) -> bool:
+        return self._get_entry(key) is not None
+
+    # ---------- 哈希表操作 ----------
+
+    def _get_hash(self, name: str) -> Optional[Dict[str, str]]:
+        entry = self._get_entry(name)
+        if entry is None or not isinstance(entry.value, dict):
+            return None
+        return entry.value
+
+    def hset(self, name: str, field: str, value: str) -> int:
+        """写入哈希字段，返回新建字段数 (0 或 1)"""
+        fields = self._get_hash(name)
+        if fields is None:
+            self._put_entry(name, _Entry({field: value}, None))
+            return 1
+        is_new = 0 if field in fields else 1
+        fields[field] = value
+        return is_new
+
+    def hupdate(self, name: str, mapping: Dict[str, str], ttl: Optional[float] = None) -> int:
+        """批量写入哈希字段，返回新建字段数"""
+        fields = self._get_hash(name)
+        if fields is None:
+            self._put_entry(name, _Entry(dict(mapping), self._expires_at(ttl)))
+            return len(mapping)
+        added = sum(1 for field in mapping if field not in fields)
+        fields.update(mapping)
+        return added
+
+    def hget(self, name: str, field: str) -> Optional[str]:
+        fields = self._get_hash(name)
+        value = fields.get(field) if fields is not None else None
+        self.stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    def hgetall(self, name: str) -> Dict[str, str]:
+        fields = self._get_hash(name)
+        if fields is None:
+            self.stats["misses"] += 1
+            return {}
+        self.stats["hits"] += 1
+        return dict(fields)
+
+    def hdel(self, name: str, *fields: str) -> int:
+        current = self._get_hash(name)
+        if current is None:
+            return 0
+        deleted = 0
+        for field in fields:
+            if current.pop(field, None) is not None:
+                deleted += 1
+        if not current:
+            # 与 Redis 一致：字段删空后哈希表本身也不存在
+            del self._data[name]
+        return deleted
+
+    def hexists(self, name: str, field: str) -> bool:
+        fields = self._get_hash(name)
+        return fields is not None and field in fields
+
+    def hlen(self, name: str) -> int:
+        fields = self._get_hash(name)
+        return len(fields) if fields is not None else 0
+
+    # ---------- 过期清扫 ----------
+
+    def sweep_expired(self, max_items: int = DEFAULT_SWEEP_BATCH) -> int:
+        """弹出已过期的堆顶项并删除，返回删除数量"""
+        now = time.monotonic()
+        removed = 0
+        processed = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now and processed < max_items:
+            expires_at, key = heapq.heappop(self._expiry_heap)
+            processed += 1
+            entry = self._data.get(key)
+            # 键可能已被覆盖（过期时间变化）或删除，仅删除仍匹配的项
+            if entry is not None and entry.expires_at == expires_at:
+                del self._data[key]
+                removed += 1
+        self.stats["expired"] += removed
+        # 覆盖写入会在堆中留下失效记录，过多时重建堆
+        if len(self._expiry_heap) > 2 * max(len(self._data), 64):
+            self._expiry_heap = [
+                (entry.expires_at, key) for key, entry in self._data.items()
+                if entry.expires_at is not None
+            ]
+            heapq.heapify(self._expiry_heap)
+        return removed
+
+    def _ensure_sweeper(self) -> None:
+        """在事件循环中懒启动后台清扫任务"""
+        if self._sweeper is not None and not self._sweeper.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._sweeper = loop.create_task(self._sweep_loop())
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                removed = self.sweep_expired()
+                if removed:
+                    logger.debug(f"[MemoryStore] 清理过期项 {removed} 个，剩余 {len(self._data)} 个")
+            except Exception as e:
+                logger.error(f"[MemoryStore] 过期清扫失败: {e}")
+
+    def stop_sweeper(self) -> None:
+        if self._sweeper is not None and not self._sweeper.done():
+            self._sweeper.cancel()
+        self._sweeper = None
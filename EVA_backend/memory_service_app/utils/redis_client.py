@@ -3,12 +3,15 @@
 import os
 import json
 import asyncio
-from typing import Optional, Any, Dict, Tuple
+import time
+from collections import deque
+from typing import Optional, Any, Dict, List, Tuple
 import redis.asyncio as redis
 from redis.asyncio.retry import Retry
 from redis.backoff import ExponentialBackoff
 from redis.exceptions import ConnectionError, TimeoutError, RedisError
 from logs.logs import logger
+from memory_service_app.utils.memory_store import MemoryStore
 from memory_service_app.utils.system_notify import send_system_notification_to_frontend
 
 # Redis配置
@@ -22,8 +25,15 @@ REDIS_CONFIG = {
     },
     "fallback": {
         "enabled": True,
-        "memory_ttl": 3600,  # 本地内存缓存过期时间(秒)
-        "max_items": 1000,   # 本地缓存最大条目数
+        "memory_ttl": 3600,  # 从 Redis 读取后镜像到本地的条目过期时间(秒)
+        "max_items": 1000,   # 本地缓存最大条目数（字符串键与哈希表合计）
+        "sweep_interval": 30,  # 后台过期清扫间隔(秒)
+    },
+    "recovery": {
+        "initial_delay": 1.0,    # 首次健康检查等待(秒)
+        "max_delay": 60.0,       # 健康检查最大间隔(秒)
+        "journal_size": 10000,   # 回退期间写操作日志最大条数
+        "replay_batch": 500,     # 重放时每个 pipeline 的命令数
     }
 }
 
@@ -42,11 +52,18 @@ class RedisClient:
             REDIS_CONFIG["connection"]["default_url"]
         )
         
-        # 内存缓存，在Redis不可用时使用
-        self._memory_cache = {}
+        # 内存缓存（字符串键与哈希表），在Redis不可用时使用
+        self._memory_store = MemoryStore(
+            max_items=REDIS_CONFIG["fallback"]["max_items"],
+            sweep_interval=REDIS_CONFIG["fallback"]["sweep_interval"]
+        )
         self._use_memory_fallback = False
-        self._cache_stats = {"hits": 0, "misses": 0, "items": 0}
-        self._hash_cache = {}  # 哈希表缓存
+        # 回退期间的写操作日志，Redis 恢复后按顺序重放
+        self._journal: deque = deque(maxlen=REDIS_CONFIG["recovery"]["journal_size"])
+        self._journal_dropped = 0
+        self._recovery_task: Optional[asyncio.Task] = None
+        # Redis 往返次数（单条命令或一次 pipeline 执行计为一次）
+        self._round_trips = 0
         logger.info(f"[RedisClient] 初始化，URL: {self._url}")
         
     async def get_client(self) -> redis.Redis:
@@ -95,7 +112,7 @@ class RedisClient:
                                     level="success"
                                 )
                             else:
-                                self._use_memory_fallback = True
+                                self._enter_fallback()
                                 logger.warning("⚠️ 本地Redis连接也失败，将使用内存缓存")
                                 await send_system_notification_to_frontend(
                                     message="【系统告警】本地 Redis 连接失败，系统将使用内存缓存，记忆功能不保证持久。",
@@ -103,7 +120,7 @@ class RedisClient:
                                 )
                         except Exception as e:
                             logger.warning(f"⚠️ 本地Redis连接初始化失败: {e}")
-                            self._use_memory_fallback = True
+                            self._enter_fallback()
                             await send_system_notification_to_frontend(
                                 message=f"【系统告警】本地 Redis 连接失败：{e}，系统将使用内存缓存。",
                                 level="error"
@@ -111,7 +128,7 @@ class RedisClient:
                 
             except Exception as e:
                 logger.warning(f"⚠️ Redis 客户端初始化失败，将使用内存缓存: {e}")
-                self._use_memory_fallback = True
+                self._enter_fallback()
                 await send_system_notification_to_frontend(
                     message=f"【系统告警】Redis 客户端初始化失败：{e}，系统将使用内存缓存。",
                     level="error"
@@ -119,6 +136,103 @@ class RedisClient:
                 
         return self._client
     
+    def _enter_fallback(self):
+        """切换到内存回退模式，并启动后台健康检查以便 Redis 恢复后自动切回"""
+        self._use_memory_fallback = True
+        if self._recovery_task is not None and not self._recovery_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._recovery_task = loop.create_task(self._recovery_loop())
+
+    def _journal_write(self, op: Tuple):
+        """记录回退期间的写操作"""
+        if len(self._journal) == self._journal.maxlen:
+            self._journal_dropped += 1
+            if self._journal_dropped % 1000 == 1:
+                logger.warning(f"⚠️ Redis 回退写日志已满，最早的写操作将被丢弃（累计丢弃 {self._journal_dropped} 条）")
+        self._journal.append(op)
+
+    async def _recovery_loop(self):
+        """指数退避地检查 Redis 是否恢复，恢复后重放写日志并切回 Redis"""
+        delay = REDIS_CONFIG["recovery"]["initial_delay"]
+        max_delay = REDIS_CONFIG["recovery"]["max_delay"]
+        while self._use_memory_fallback:
+            await asyncio.sleep(delay)
+            try:
+                if await self._try_reconnect():
+                    await self._replay_journal()
+                    self._use_memory_fallback = False
+                    logger.info("✅ Redis 已恢复，退出内存回退模式")
+                    await send_system_notification_to_frontend(
+                        message="【系统恢复】Redis 已恢复，记忆功能恢复正常。",
+                        level="success"
+                    )
+                    return
+            except Exception as e:
+                logger.warning(f"⚠️ Redis 恢复失败: {e}")
+            delay = min(delay * 2, max_delay)
+            logger.debug(f"Redis 仍不可用，{delay} 秒后重试")
+
+    async def _try_reconnect(self) -> bool:
+        """尝试建立（或复用）连接并 PING"""
+        try:
+            if self._client is None:
+                self._pool = redis.ConnectionPool.from_url(
+                    self._url,
+                    decode_responses=True,
+                    retry=self._retry,
+                    retry_on_error=[ConnectionError, TimeoutError]
+                )
+                self._client = redis.Redis.from_pool(self._pool)
+            await self._client.ping()
+            return True
+        except Exception as e:
+            logger.debug(f"Redis 健康检查失败: {e}")
+            return False
+
+    async def _replay_journal(self):
+        """用 pipeline 批量重放回退期间的写操作
+
+        重放过程中产生的新写操作同样进入日志，循环直到日志清空；
+        之后在同一事件循环步内切回 Redis，不会漏掉写操作。
+        """
+        batch_size = REDIS_CONFIG["recovery"]["replay_batch"]
+        replayed = 0
+        while self._journal:
+            batch = [self._journal.popleft() for _ in range(min(batch_size, len(self._journal)))]
+            pipe = self._client.pipeline(transaction=False)
+            now = time.time()
+            for op in batch:
+                kind = op[0]
+                if kind == "set":
+                    _, key, value, deadline = op
+                    if deadline is None:
+                        pipe.set(key, value)
+                    elif deadline > now:
+                        pipe.set(key, value, ex=max(1, int(deadline - now)))
+                elif kind == "hset":
+                    _, name, field, value = op
+                    pipe.hset(name, field, value)
+                elif kind == "incrby":
+                    pipe.incrby(op[1], op[2])
+                elif kind == "del":
+                    pipe.delete(op[1])
+                elif kind == "hdel":
+                    pipe.hdel(op[1], *op[2])
+            try:
+                await pipe.execute()
+            except Exception:
+                # 重放失败时将本批放回队首，保持顺序，等待下次恢复
+                self._journal.extendleft(reversed(batch))
+                raise
+            replayed += len(batch)
+        if replayed:
+            logger.info(f"✅ 已重放回退期间的写操作 {replayed} 条（丢弃 {self._journal_dropped} 条）")
+        self._journal_dropped = 0
+
     async def _test_connection(self) -> bool:
         """测试 Redis 连接"""
         try:
@@ -129,67 +243,41 @@ class RedisClient:
             return False
         except Exception as e:
             logger.warning(f"⚠️ Redis 连接测试失败: {e}")
-            self._use_memory_fallback = True
+            self._enter_fallback()
             return False
         
     async def close(self):
         """关闭 Redis 连接"""
+        self._memory_store.stop_sweeper()
+        if self._recovery_task is not None and not self._recovery_task.done():
+            self._recovery_task.cancel()
         if self._client:
             await self._client.aclose()
         if self._pool:
             await self._pool.aclose()
             
-    def _clean_memory_cache_if_needed(self):
-        """清理内存缓存"""
-        # 如果缓存项超过限制，移除最旧的项
-        if len(self._memory_cache) > REDIS_CONFIG["fallback"]["max_items"]:
-            # 按时间戳排序，移除最旧的20%
-            items_to_remove = int(REDIS_CONFIG["fallback"]["max_items"] * 0.2)
-            sorted_items = sorted(
-                self._memory_cache.items(), 
-                key=lambda x: x[1].get("timestamp", 0)
-            )
-            
-            for i in range(items_to_remove):
-                if i < len(sorted_items):
-                    key = sorted_items[i][0]
-                    del self._memory_cache[key]
-                    
-            logger.info(f"已清理内存缓存中的 {items_to_remove} 项")
-            
     async def get(self, key: str) -> Optional[str]:
         """获取键值"""
         # 如果使用内存缓存，直接从内存获取
         if self._use_memory_fallback:
-            cache_item = self._memory_cache.get(key)
-            if cache_item:
-                value = cache_item.get("value")
-                self._cache_stats["hits"] += 1
-                logger.debug(f"Memory GET {key}: Hit")
-                return value
-            
-            self._cache_stats["misses"] += 1
-            logger.debug(f"Memory GET {key}: Miss")
-            return None
+            return await self._get_from_memory(key)
             
         try:
             client = await self.get_client()
             if self._use_memory_fallback:
                 return await self._get_from_memory(key)
                 
+            self._round_trips += 1
             value = await client.get(key)
             if value:
-                # 同步到内存缓存
-                self._memory_cache[key] = {
-                    "value": value,
-                    "timestamp": asyncio.get_event_loop().time()
-                }
+                # 同步到内存缓存（不知道 Redis 侧剩余 TTL，使用默认镜像过期时间）
+                self._memory_store.set(key, value, ttl=REDIS_CONFIG["fallback"]["memory_ttl"])
                 logger.debug(f"Redis GET {key}: {value[:100]}...")
             return value
         except Exception as e:
             # Redis 操作失败，尝试从内存缓存获取
             logger.warning(f"Redis GET 失败 {key}: {e}，尝试从内存缓存获取")
-            self._use_memory_fallback = True
+            self._enter_fallback()
             await send_system_notification_to_frontend(
                 message=f"【系统告警】Redis GET 操作失败：{e}，系统将使用内存缓存。",
                 level="error"
@@ -197,17 +285,10 @@ class RedisClient:
             return await self._get_from_memory(key)
     
     async def _get_from_memory(self, key: str) -> Optional[str]:
-        """从内存缓存获取值"""
-        cache_item = self._memory_cache.get(key)
-        if cache_item:
-            value = cache_item.get("value")
-            self._cache_stats["hits"] += 1
-            logger.debug(f"Memory GET {key}: Hit")
-            return value
-            
-        self._cache_stats["misses"] += 1
-        logger.debug(f"Memory GET {key}: Miss")
-        return None
+        """从内存缓存获取值（已过期的项视为不存在）"""
+        value = self._memory_store.get(key)
+        logger.debug(f"Memory GET {key}: {'Hit' if value is not None else 'Miss'}")
+        return value
             
     async def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
         """设置键值
@@ -220,16 +301,18 @@ class RedisClient:
         # 标准化值
         string_value = self._normalize_value(value)
         
-        # 如果使用内存缓存，直接写入内存
+        # 如果使用内存缓存，直接写入内存并记录写日志
         if self._use_memory_fallback:
-            success = await self._set_to_memory(key, string_value, ex)
-            return success
-            
+            self._journal_write(("set", key, string_value, time.time() + ex if ex else None))
+            return await self._set_to_memory(key, string_value, ex)
+
         try:
             client = await self.get_client()
             if self._use_memory_fallback:
+                self._journal_write(("set", key, string_value, time.time() + ex if ex else None))
                 return await self._set_to_memory(key, string_value, ex)
                 
+            self._round_trips += 1
             result = await client.set(key, string_value, ex=ex)
             
             # 同时写入内存缓存，提高性能并作为备份
@@ -239,11 +322,12 @@ class RedisClient:
         except Exception as e:
             # Redis 操作失败，写入内存缓存
             logger.warning(f"Redis SET 失败 {key}: {e}，尝试写入内存缓存")
-            self._use_memory_fallback = True
+            self._enter_fallback()
             await send_system_notification_to_frontend(
                 message=f"【系统告警】Redis SET 操作失败：{e}，系统将使用内存缓存。",
                 level="error"
             )
+            self._journal_write(("set", key, string_value, time.time() + ex if ex else None))
             return await self._set_to_memory(key, string_value, ex)
             
     async def _set_to_memory(self, key: str, value: str, ex: Optional[int] = None) -> bool:
@@ -252,19 +336,11 @@ class RedisClient:
         Args:
             key: 键名
             value: 字符串值
-            ex: 过期时间（秒）
+            ex: 过期时间（秒），None 表示不过期（与 Redis 语义一致）
         """
         try:
-            timestamp = asyncio.get_event_loop().time()
-            self._memory_cache[key] = {
-                "value": value,
-                "timestamp": timestamp,
-                "expires": timestamp + (ex or REDIS_CONFIG["fallback"]["memory_ttl"])
-            }
-            
-            # 清理缓存如需要
-            self._clean_memory_cache_if_needed()
-            self._cache_stats["items"] = len(self._memory_cache)
+            # 超出容量时按 LRU 淘汰，由 MemoryStore 保证 O(1)
+            self._memory_store.set(key, value, ttl=ex)
             logger.debug(f"Memory SET {key}: {value[:100]}...")
             return True
         except Exception as e:
@@ -290,40 +366,41 @@ class RedisClient:
     async def delete(self, key: str) -> bool:
         """删除键值"""
         # 从内存缓存删除
-        if key in self._memory_cache:
-            del self._memory_cache[key]
-            
+        self._memory_store.delete(key)
+
         if self._use_memory_fallback:
+            self._journal_write(("del", key))
             logger.debug(f"Memory DEL {key}")
             return True
-            
+
         try:
             client = await self.get_client()
+            if self._use_memory_fallback:
+                self._journal_write(("del", key))
+                return True
+            self._round_trips += 1
             await client.delete(key)
             logger.debug(f"Redis DEL {key}")
             return True
         except Exception as e:
-            logger.error(f"Redis DEL 失败 {key}: {e}")
-            return False
+            logger.warning(f"Redis DEL 失败 {key}: {e}，已记录待 Redis 恢复后重放")
+            self._enter_fallback()
+            self._journal_write(("del", key))
+            return True
             
     async def exists(self, key: str) -> bool:
         """检查键是否存在"""
-        # 检查内存缓存
-        if key in self._memory_cache:
-            # 检查是否过期
-            cache_item = self._memory_cache[key]
-            current_time = asyncio.get_event_loop().time()
-            if "expires" in cache_item and cache_item["expires"] < current_time:
-                # 已过期，删除并返回False
-                del self._memory_cache[key]
-                return False
+        # 检查内存缓存（过期项会被顺带删除）
+        if self._memory_store.exists(key):
             return True
-            
+
+
         if self._use_memory_fallback:
             return False
             
         try:
             client = await self.get_client()
+            self._round_trips += 1
             return await client.exists(key)
         except Exception as e:
             logger.error(f"Redis EXISTS 失败 {key}: {e}")
@@ -339,6 +416,7 @@ class RedisClient:
             client = await self.get_client()
             if not isinstance(message, str):
                 message = json.dumps(message, ensure_ascii=False)
+            self._round_trips += 1
             await client.publish(channel, message)
             logger.debug(f"Redis PUBLISH {channel}: {message[:100]}...")
             return True
@@ -350,75 +428,68 @@ class RedisClient:
         """获取缓存统计信息"""
         stats = {
             "memory_mode": self._use_memory_fallback,
-            "cache_stats": self._cache_stats,
+            "journal_size": len(self._journal),
+            "journal_dropped": self._journal_dropped,
+            "round_trips": self._round_trips,
+            "cache_stats": {**self._memory_store.stats, "items": len(self._memory_store)},
             "url": self._url
         }
         return stats
 
     # 哈希表操作
-    async def hset(self, name: str, key: str, value: Any) -> int:
+    async def hset(self, name: str, key: Optional[str] = None, value: Any = None,
+                   mapping: Optional[Dict[str, Any]] = None) -> int:
         """设置哈希表字段值
-        
+
         Args:
             name: 哈希表名
             key: 字段名
             value: 值
-            
+            mapping: 批量写入的字段字典，与 key/value 可同时使用
+
         Returns:
             int: 新建字段数
         """
         # 标准化值
-        string_value = self._normalize_value(value)
-        
+        fields = {}
+        if key is not None:
+            fields[key] = self._normalize_value(value)
+        if mapping:
+            fields.update({k: self._normalize_value(v) for k, v in mapping.items()})
+        if not fields:
+            return 0
+
         # 内存回退模式
         if self._use_memory_fallback:
-            return await self._hset_to_memory(name, key, string_value)
-            
+            return self._hset_fields_to_memory(name, fields, journal=True)
+
         try:
             client = await self.get_client()
             if self._use_memory_fallback:
-                return await self._hset_to_memory(name, key, string_value)
-                
-            result = await client.hset(name, key, string_value)
-            
+                return self._hset_fields_to_memory(name, fields, journal=True)
+
+            self._round_trips += 1
+            result = await client.hset(name, mapping=fields)
+
             # 同步到内存缓存
-            await self._hset_to_memory(name, key, string_value)
-            
-            logger.debug(f"Redis HSET {name}:{key}")
+            self._memory_store.hupdate(name, fields)
+
+            logger.debug(f"Redis HSET {name}: {list(fields)}")
             return result
         except Exception as e:
-            logger.warning(f"Redis HSET 失败 {name}:{key}: {e}")
-            self._use_memory_fallback = True
-            return await self._hset_to_memory(name, key, string_value)
-    
-    async def _hset_to_memory(self, name: str, key: str, value: str) -> int:
-        """写入内存哈希表缓存
-        
-        Args:
-            name: 哈希表名
-            key: 字段名
-            value: 值
-            
-        Returns:
-            int: 新建字段数 (0 or 1)
-        """
-        try:
-            # 初始化哈希表
-            if name not in self._hash_cache:
-                self._hash_cache[name] = {}
-                is_new = 1
-            else:
-                is_new = 0 if key in self._hash_cache[name] else 1
-                
-            # 写入值
-            self._hash_cache[name][key] = value
-            logger.debug(f"Memory HSET {name}:{key}")
-            
-            return is_new
-        except Exception as e:
-            logger.error(f"内存哈希表写入失败 {name}:{key}: {e}")
-            return 0
-    
+            logger.warning(f"Redis HSET 失败 {name}: {e}")
+            self._enter_fallback()
+            return self._hset_fields_to_memory(name, fields, journal=True)
+
+    def _hset_fields_to_memory(self, name: str, fields: Dict[str, str], journal: bool = False) -> int:
+        """批量写入内存哈希表，回退模式下同时记录写日志"""
+        if journal:
+            for field, value in fields.items():
+                self._journal_write(("hset", name, field, value))
+        added = self._memory_store.hupdate(name, fields)
+        logger.debug(f"Memory HSET {name}: {list(fields)}")
+        return added
+
     async def hget(self, name: str, key: str) -> Optional[str]:
         """获取哈希表字段值
         
@@ -438,19 +509,19 @@ class RedisClient:
             if self._use_memory_fallback:
                 return await self._hget_from_memory(name, key)
                 
+            self._round_trips += 1
             value = await client.hget(name, key)
             
             # 同步到内存缓存
             if value is not None:
-                if name not in self._hash_cache:
-                    self._hash_cache[name] = {}
-                self._hash_cache[name][key] = value
-                
+                self._memory_store.hset(name, key, value)
+
+
             logger.debug(f"Redis HGET {name}:{key}")
             return value
         except Exception as e:
             logger.warning(f"Redis HGET 失败 {name}:{key}: {e}")
-            self._use_memory_fallback = True
+            self._enter_fallback()
             return await self._hget_from_memory(name, key)
     
     async def _hget_from_memory(self, name: str, key: str) -> Optional[str]:
@@ -464,17 +535,8 @@ class RedisClient:
             str: 字段值 (如果存在)
         """
         try:
-            if name not in self._hash_cache:
-                return None
-                
-            value = self._hash_cache[name].get(key)
-            if value is not None:
-                logger.debug(f"Memory HGET {name}:{key}: Hit")
-                self._cache_stats["hits"] += 1
-            else:
-                logger.debug(f"Memory HGET {name}:{key}: Miss")
-                self._cache_stats["misses"] += 1
-                
+            value = self._memory_store.hget(name, key)
+            logger.debug(f"Memory HGET {name}:{key}: {'Hit' if value is not None else 'Miss'}")
             return value
         except Exception as e:
             logger.error(f"内存哈希表读取失败 {name}:{key}: {e}")
@@ -498,19 +560,19 @@ class RedisClient:
             if self._use_memory_fallback:
                 return await self._hgetall_from_memory(name)
                 
+            self._round_trips += 1
             result = await client.hgetall(name)
             
             # 同步到内存缓存
             if result:
-                if name not in self._hash_cache:
-                    self._hash_cache[name] = {}
-                self._hash_cache[name].update(result)
-                
+                self._memory_store.hupdate(name, result)
+
+
             logger.debug(f"Redis HGETALL {name}: {len(result)} 项")
             return result
         except Exception as e:
             logger.warning(f"Redis HGETALL 失败 {name}: {e}")
-            self._use_memory_fallback = True
+            self._enter_fallback()
             return await self._hgetall_from_memory(name)
     
     async def _hgetall_from_memory(self, name: str) -> Dict[str, str]:
@@ -523,13 +585,8 @@ class RedisClient:
             Dict[str, str]: 字段名和值组成的字典
         """
         try:
-            if name not in self._hash_cache:
-                return {}
-                
-            result = self._hash_cache[name].copy()
+            result = self._memory_store.hgetall(name)
             logger.debug(f"Memory HGETALL {name}: {len(result)} 项")
-            self._cache_stats["hits"] += 1
-            
             return result
         except Exception as e:
             logger.error(f"内存哈希表读取失败 {name}: {e}")
@@ -546,28 +603,28 @@ class RedisClient:
             int: 删除的字段数量
         """
         # 从内存缓存删除
-        deleted = 0
-        if name in self._hash_cache:
-            for key in keys:
-                if key in self._hash_cache[name]:
-                    del self._hash_cache[name][key]
-                    deleted += 1
-            
+        deleted = self._memory_store.hdel(name, *keys)
+
+
         if self._use_memory_fallback:
+            self._journal_write(("hdel", name, keys))
             logger.debug(f"Memory HDEL {name}: {deleted} 项")
             return deleted
-            
+
         try:
             client = await self.get_client()
             if self._use_memory_fallback:
+                self._journal_write(("hdel", name, keys))
                 return deleted
                 
+            self._round_trips += 1
             result = await client.hdel(name, *keys)
             logger.debug(f"Redis HDEL {name}: {result} 项")
             return result
         except Exception as e:
             logger.warning(f"Redis HDEL 失败 {name}: {e}")
-            self._use_memory_fallback = True
+            self._enter_fallback()
+            self._journal_write(("hdel", name, keys))
             return deleted
     
     async def hexists(self, name: str, key: str) -> bool:
@@ -589,12 +646,13 @@ class RedisClient:
             if self._use_memory_fallback:
                 return await self._hexists_in_memory(name, key)
                 
+            self._round_trips += 1
             result = await client.hexists(name, key)
             logger.debug(f"Redis HEXISTS {name}:{key}: {result}")
             return result
         except Exception as e:
             logger.warning(f"Redis HEXISTS 失败 {name}:{key}: {e}")
-            self._use_memory_fallback = True
+            self._enter_fallback()
             return await self._hexists_in_memory(name, key)
     
     async def _hexists_in_memory(self, name: str, key: str) -> bool:
@@ -608,10 +666,7 @@ class RedisClient:
             bool: 是否存在
         """
         try:
-            if name not in self._hash_cache:
-                return False
-                
-            result = key in self._hash_cache[name]
+            result = self._memory_store.hexists(name, key)
             logger.debug(f"Memory HEXISTS {name}:{key}: {result}")
             return result
         except Exception as e:
@@ -636,12 +691,13 @@ class RedisClient:
             if self._use_memory_fallback:
                 return await self._hlen_from_memory(name)
                 
+            self._round_trips += 1
             result = await client.hlen(name)
             logger.debug(f"Redis HLEN {name}: {result}")
             return result
         except Exception as e:
             logger.warning(f"Redis HLEN 失败 {name}: {e}")
-            self._use_memory_fallback = True
+            self._enter_fallback()
             return await self._hlen_from_memory(name)
     
     async def _hlen_from_memory(self, name: str) -> int:
@@ -654,16 +710,341 @@ class RedisClient:
             int: 字段数量
         """
         try:
-            if name not in self._hash_cache:
-                return 0
-                
-            result = len(self._hash_cache[name])
+            result = self._memory_store.hlen(name)
             logger.debug(f"Memory HLEN {name}: {result}")
             return result
         except Exception as e:
             logger.error(f"内存哈希表计数失败 {name}: {e}")
             return 0
 
+    # 批量操作
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """批量获取键值，一次往返
+
+        Args:
+            keys: 键名列表
+
+        Returns:
+            List[Optional[str]]: 与 keys 顺序一致的值列表
+        """
+        if not keys:
+            return []
+        if self._use_memory_fallback:
+            return [self._memory_store.get(key) for key in keys]
+
+        try:
+            client = await self.get_client()
+            if self._use_memory_fallback:
+                return [self._memory_store.get(key) for key in keys]
+
+            self._round_trips += 1
+            values = await client.mget(keys)
+            for key, value in zip(keys, values):
+                if value:
+                    self._memory_store.set(key, value, ttl=REDIS_CONFIG["fallback"]["memory_ttl"])
+            logger.debug(f"Redis MGET {len(keys)} 个键")
+            return values
+        except Exception as e:
+            logger.warning(f"Redis MGET 失败: {e}，尝试从内存缓存获取")
+            self._enter_fallback()
+            return [self._memory_store.get(key) for key in keys]
+
+    async def mset(self, mapping: Dict[str, Any], ex: Optional[int] = None) -> bool:
+        """批量设置键值，一次往返
+
+        Args:
+            mapping: 键值字典（值会自动转换为 JSON 字符串）
+            ex: 过期时间（秒），对所有键生效
+        """
+        if not mapping:
+            return True
+        if ex is not None:
+            # MSET 不支持过期时间，改用 pipeline 中的多个 SET
+            async with self.pipeline() as pipe:
+                for key, value in mapping.items():
+                    pipe.set(key, value, ex=ex)
+            return all(pipe.results)
+
+        values = {key: self._normalize_value(value) for key, value in mapping.items()}
+        if self._use_memory_fallback:
+            return self._mset_to_memory(values, journal=True)
+
+        try:
+            client = await self.get_client()
+            if self._use_memory_fallback:
+                return self._mset_to_memory(values, journal=True)
+
+            self._round_trips += 1
+            result = await client.mset(values)
+            self._mset_to_memory(values)
+            logger.debug(f"Redis MSET {len(values)} 个键")
+            return bool(result)
+        except Exception as e:
+            logger.warning(f"Redis MSET 失败: {e}，尝试写入内存缓存")
+            self._enter_fallback()
+            return self._mset_to_memory(values, journal=True)
+
+    def _mset_to_memory(self, values: Dict[str, str], journal: bool = False) -> bool:
+        for key, value in values.items():
+            if journal:
+                self._journal_write(("set", key, value, None))
+            self._memory_store.set(key, value)
+        return True
+
+    async def hmget(self, name: str, keys: List[str]) -> List[Optional[str]]:
+        """批量获取哈希表字段值，一次往返"""
+        if not keys:
+            return []
+        if self._use_memory_fallback:
+            return [self._memory_store.hget(name, key) for key in keys]
+
+        try:
+            client = await self.get_client()
+            if self._use_memory_fallback:
+                return [self._memory_store.hget(name, key) for key in keys]
+
+            self._round_trips += 1
+            values = await client.hmget(name, keys)
+            found = {key: value for key, value in zip(keys, values) if value is not None}
+            if found:
+                self._memory_store.hupdate(name, found)
+            logger.debug(f"Redis HMGET {name}: {len(keys)} 个字段")
+            return values
+        except Exception as e:
+            logger.warning(f"Redis HMGET 失败 {name}: {e}")
+            self._enter_fallback()
+            return [self._memory_store.hget(name, key) for key in keys]
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        """原子自增，返回自增后的值
+
+        内存回退模式下在本地计数，并以增量（而非最终值）记入重放日志，
+        Redis 恢复后与其他进程的自增合并而不会互相覆盖。
+        """
+        if self._use_memory_fallback:
+            return self._incr_in_memory(key, amount, journal=True)
+
+        try:
+            client = await self.get_client()
+            if self._use_memory_fallback:
+                return self._incr_in_memory(key, amount, journal=True)
+
+            self._round_trips += 1
+            value = await client.incrby(key, amount)
+            self._memory_store.set(key, str(value), ttl=REDIS_CONFIG["fallback"]["memory_ttl"])
+            logger.debug(f"Redis INCRBY {key}: {value}")
+            return value
+        except Exception as e:
+            logger.warning(f"Redis INCRBY 失败 {key}: {e}，尝试在内存缓存中计数")
+            self._enter_fallback()
+            return self._incr_in_memory(key, amount, journal=True)
+
+    def _incr_in_memory(self, key: str, amount: int, journal: bool = False) -> int:
+        if journal:
+            self._journal_write(("incrby", key, amount))
+        try:
+            value = int(self._memory_store.get(key) or 0) + amount
+        except ValueError:
+            value = amount
+        self._memory_store.set(key, str(value))
+        return value
+
+    def pipeline(self) -> "RedisPipeline":
+        """创建批量命令管道
+
+        用法::
+
+            async with redis_client.pipeline() as pipe:
+                pipe.set("a", "1", ex=60)
+                pipe.get("b")
+            a_ok, b_value = pipe.results
+        """
+        return RedisPipeline(self)
+
+
+class RedisPipeline:
+    """批量命令管道：退出 async with 时一次往返执行所有排队的命令
+
+    回退语义与单条命令一致：内存模式下逐条在内存中执行（写操作进入重放日志），
+    连接失败或超时时切换到内存模式并在内存中执行整批命令；
+    单条命令出错（如 WRONGTYPE）时其余命令已在 Redis 中生效，直接抛出该错误，
+    results 中对应位置为异常对象。
+    """
+
+    # 支持的命令
+    READ_COMMANDS = ("get", "mget", "hget", "hgetall", "hmget", "exists")
+    WRITE_COMMANDS = ("set", "mset", "delete", "hset", "hdel", "incr")
+
+    def __init__(self, client: "RedisClient"):
+        self._client = client
+        self._commands: List[Tuple[str, tuple, dict]] = []
+        self.results: List[Any] = []
+
+    def _queue(self, command: str, *args, **kwargs) -> "RedisPipeline":
+        self._commands.append((command, args, kwargs))
+        return self
+
+    def get(self, key: str):
+        return self._queue("get", key)
+
+    def mget(self, keys: List[str]):
+        return self._queue("mget", list(keys))
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None):
+        return self._queue("set", key, self._client._normalize_value(value), ex=ex)
+
+    def mset(self, mapping: Dict[str, Any]):
+        return self._queue("mset", {k: self._client._normalize_value(v) for k, v in mapping.items()})
+
+    def delete(self, key: str):
+        return self._queue("delete", key)
+
+    def exists(self, key: str):
+        return self._queue("exists", key)
+
+    def hget(self, name: str, key: str):
+        return self._queue("hget", name, key)
+
+    def hgetall(self, name: str):
+        return self._queue("hgetall", name)
+
+    def hmget(self, name: str, keys: List[str]):
+        return self._queue("hmget", name, list(keys))
+
+    def hset(self, name: str, key: Optional[str] = None, value: Any = None,
+             mapping: Optional[Dict[str, Any]] = None):
+        fields = {}
+        if key is not None:
+            fields[key] = self._client._normalize_value(value)
+        if mapping:
+            fields.update({k: self._client._normalize_value(v) for k, v in mapping.items()})
+        return self._queue("hset", name, fields)
+
+    def hdel(self, name: str, *keys):
+        return self._queue("hdel", name, *keys)
+
+    def incr(self, key: str, amount: int = 1):
+        return self._queue("incr", key, amount)
+
+    async def __aenter__(self) -> "RedisPipeline":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.execute()
+        return False
+
+    async def execute(self) -> List[Any]:
+        """执行排队的命令，结果按顺序保存在 results 中并返回"""
+        commands, self._commands = self._commands, []
+        if not commands:
+            self.results = []
+            return self.results
+
+        client = self._client
+        if not client._use_memory_fallback:
+            results = None
+            try:
+                redis_conn = await client.get_client()
+                if not client._use_memory_fallback:
+                    pipe = redis_conn.pipeline(transaction=False)
+                    for command, args, kwargs in commands:
+                        if command == "hset":
+                            pipe.hset(args[0], mapping=args[1])
+                        elif command == "incr":
+                            pipe.incrby(args[0], args[1])
+                        else:
+                            getattr(pipe, command)(*args, **kwargs)
+                    client._round_trips += 1
+                    # 非事务管道中单条命令出错（如 WRONGTYPE）时其余命令已生效，
+                    # 不能整批改在内存中重做；出错的命令以异常对象作为结果
+                    results = list(await pipe.execute(raise_on_error=False))
+                    for (command, args, kwargs), result in zip(commands, results):
+                        if not isinstance(result, Exception):
+                            self._mirror(command, args, kwargs, result)
+                    logger.debug(f"Redis PIPELINE {len(commands)} 条命令")
+            except (ConnectionError, TimeoutError, OSError) as e:
+                logger.warning(f"Redis PIPELINE 失败: {e}，尝试在内存缓存中执行")
+                client._enter_fallback()
+            if results is not None:
+                self.results = results
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.warning(f"Redis PIPELINE 命令失败: {result}")
+                        raise result
+                return self.results
+
+        self.results = [self._execute_in_memory(command, args, kwargs) for command, args, kwargs in commands]
+        return self.results
+
+    def _mirror(self, command: str, args: tuple, kwargs: dict, result: Any) -> None:
+        """Redis 执行成功后同步内存缓存，与单条命令的行为一致"""
+        store = self._client._memory_store
+        mirror_ttl = REDIS_CONFIG["fallback"]["memory_ttl"]
+        if command == "set":
+            store.set(args[0], args[1], ttl=kwargs.get("ex"))
+        elif command == "mset":
+            for key, value in args[0].items():
+                store.set(key, value)
+        elif command == "delete":
+            store.delete(args[0])
+        elif command == "hset":
+            store.hupdate(args[0], args[1])
+        elif command == "hdel":
+            store.hdel(args[0], *args[1:])
+        elif command == "incr":
+            store.set(args[0], str(result), ttl=mirror_ttl)
+        elif command == "get" and result:
+            store.set(args[0], result, ttl=mirror_ttl)
+        elif command == "mget":
+            for key, value in zip(args[0], result):
+                if value:
+                    store.set(key, value, ttl=mirror_ttl)
+        elif command == "hget" and result is not None:
+            store.hset(args[0], args[1], result)
+        elif command == "hgetall" and result:
+            store.hupdate(args[0], result)
+        elif command == "hmget":
+            found = {key: value for key, value in zip(args[1], result) if value is not None}
+            if found:
+                store.hupdate(args[0], found)
+
+    def _execute_in_memory(self, command: str, args: tuple, kwargs: dict) -> Any:
+        """内存模式下执行单条命令，写操作记录重放日志"""
+        client = self._client
+        store = client._memory_store
+        if command == "get":
+            return store.get(args[0])
+        if command == "mget":
+            return [store.get(key) for key in args[0]]
+        if command == "exists":
+            return store.exists(args[0])
+        if command == "hget":
+            return store.hget(args[0], args[1])
+        if command == "hgetall":
+            return store.hgetall(args[0])
+        if command == "hmget":
+            return [store.hget(args[0], key) for key in args[1]]
+        if command == "set":
+            ex = kwargs.get("ex")
+            client._journal_write(("set", args[0], args[1], time.time() + ex if ex else None))
+            store.set(args[0], args[1], ttl=ex)
+            return True
+        if command == "mset":
+            return client._mset_to_memory(args[0], journal=True)
+        if command == "delete":
+            client._journal_write(("del", args[0]))
+            return int(store.delete(args[0]))
+        if command == "hset":
+            return client._hset_fields_to_memory(args[0], args[1], journal=True)
+        if command == "hdel":
+            client._journal_write(("hdel", args[0], args[1:]))
+            return store.hdel(args[0], *args[1:])
+        if command == "incr":
+            return client._incr_in_memory(args[0], args[1], journal=True)
+        raise ValueError(f"不支持的管道命令: {command}")
+
+
 # 全局 Redis 客户端实例
 redis_client = RedisClient()
 
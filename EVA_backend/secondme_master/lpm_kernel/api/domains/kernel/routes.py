@@ -11,6 +11,7 @@ from lpm_kernel.L1.l1_generator import L1Generator
 from lpm_kernel.L1.serializers import NotesStorage, NoteSerializer
 from lpm_kernel.L1.utils import save_true_topics
 from lpm_kernel.api.common.responses import APIResponse
+from lpm_kernel.common.llm import LLMClient
 from lpm_kernel.common.repository.database_session import DatabaseSession
 from lpm_kernel.kernel.chunk_service import ChunkService
 from lpm_kernel.kernel.l1.l1_manager import (
@@ -20,6 +21,7 @@ from lpm_kernel.kernel.l1.l1_manager import (
     extract_notes_from_documents,
     document_service,
 )
+from lpm_kernel.kernel.l1.shade_index import shade_index_manager
 from lpm_kernel.kernel.note_service import NoteService
 from lpm_kernel.models.l1 import (
     L1Version,
@@ -160,6 +162,12 @@ def store_l1_data(session, l1_data: L1GenerationResult) -> int:
         session.commit()
         logger.info(f"Successfully stored L1 data version {new_version_number}")
 
+        # 8. Precompute shade embeddings for L1 retrieval
+        try:
+            shade_index_manager.rebuild_from_latest(LLMClient(), new_version_number)
+        except Exception as e:
+            logger.error(f"Error building shade index for version {new_version_number}: {str(e)}")
+
         return new_version_number
 
     except Exception as e:
@@ -2,6 +2,7 @@
 Chat service for handling different types of chat interactions
 """
 import logging
+import random
 from typing import Optional, List, Dict, Any, Union, Iterator, Type
 import uuid
 from typing import Tuple
@@ -12,6 +13,7 @@ import os
 from lpm_kernel.api.services.user_llm_config_service import UserLLMConfigService
 from lpm_kernel.api.domains.kernel2.dto.chat_dto import ChatRequest
 from lpm_kernel.api.services.local_llm_service import local_llm_service
+from lpm_kernel.api.services.provider_client_pool import provider_client_pool, DEFAULT_PROVIDER_TIMEOUT
 from lpm_kernel.api.domains.kernel2.services.message_builder import MultiTurnMessageBuilder
 from lpm_kernel.api.domains.kernel2.services.prompt_builder import (
     SystemPromptStrategy,
@@ -25,6 +27,15 @@ logger = logging.getLogger(__name__)
 logger.info(f"[调试] 当前 LLM_PROVIDER 设置为: {os.getenv('LLM_PROVIDER')}")
 logger.info(f"[调试] 当前 OPENAI_MODEL 设置为: {os.getenv('OPENAI_MODEL')}")
 
+# Fraction of requests whose full messages are logged when DEBUG logging is enabled
+CHAT_DEBUG_SAMPLE_RATE = float(os.getenv("CHAT_DEBUG_SAMPLE_RATE", "0.01"))
+
+
+def _sample_debug() -> bool:
+    """Whether to log full prompts/responses for this request"""
+    return logger.isEnabledFor(logging.DEBUG) and random.random() < CHAT_DEBUG_SAMPLE_RATE
+
+
 class ChatService:
     """Chat service for handling different types of chat interactions"""
     
@@ -32,6 +43,27 @@ class ChatService:
         """Initialize chat service"""
         # Base strategy chain, must contain at least one base strategy
         self.default_strategy_chain = [BasePromptStrategy, RoleBasedStrategy]
+        self.user_llm_config_service = UserLLMConfigService()
+
+    def get_provider_client(self, timeout: float = DEFAULT_PROVIDER_TIMEOUT):
+        """
+        Get the pooled client of the configured LLM provider
+
+        LLM_PROVIDER=local (default) uses the local LLM server; any other value
+        uses the chat endpoint and key from the user LLM configuration.
+
+        Returns:
+            Tuple of (OpenAI client, default model name)
+        """
+        provider = (os.getenv("LLM_PROVIDER") or "local").lower()
+        if provider == "local":
+            return local_llm_service.client, "models/lpm"
+
+        user_llm_config = self.user_llm_config_service.get_available_llm()
+        if not user_llm_config or not user_llm_config.chat_endpoint:
+            raise ValueError(f"LLM provider '{provider}' requires a chat endpoint in the user LLM configuration")
+        client = provider_client_pool.get(user_llm_config.chat_endpoint, user_llm_config.chat_api_key, timeout)
+        return client, os.getenv("OPENAI_MODEL") or user_llm_config.chat_model_name or "models/lpm"
     
     def _get_strategy_chain(
         self,
@@ -92,9 +124,10 @@ class ChatService:
         
         # Log debug information
         logger.info("Using strategy chain: %s", [s.__name__ for s in final_strategy_chain])
-        logger.info("Final messages for LLM:")
-        for msg in messages:
-            logger.info(f"Role: {msg['role']}, Content: {msg['content']}")
+        if _sample_debug():
+            logger.debug("Final messages for LLM:")
+            for msg in messages:
+                logger.debug(f"Role: {msg['role']}, Content: {msg['content']}")
             
         return messages
     
@@ -300,25 +333,28 @@ class ChatService:
         Returns:
             Either an iterator for streaming responses or a single response dictionary
         """
-        logger.info(f"Chat request: {request}")
         # Build messages
         message_builder = MultiTurnMessageBuilder(request, strategy_chain=strategy_chain)
         messages = message_builder.build_messages(context)
-        
-        # Log debug information
-        # logger.info("Using strategy chain: %s", [s.__name__ for s in strategy_chain] if strategy_chain else "default")
-        logger.info("Final messages for LLM:")
-        for msg in messages:
-            logger.info(f"Role: {msg['role']}, Content: {msg['content']}")
 
-        # Use provided client or default local_llm_service.client
-        # 替换为动态根据用户配置选择 LLM 客户端
-        self.user_llm_config_service = UserLLMConfigService()
-        provider_client = self.user_llm_config_service.get_provider_client()
-        current_client = client if client is not None else provider_client
+        # Full prompts are large; only a sample of requests logs them, at debug level
+        debug_sampled = _sample_debug()
+        logger.info(
+            f"Chat request: {len(messages)} messages, "
+            f"{sum(len(str(msg.get('content') or '')) for msg in messages)} chars, stream={stream}"
+        )
+        if debug_sampled:
+            logger.debug(f"Chat request: {request}")
+            logger.debug("Final messages for LLM:")
+            for msg in messages:
+                logger.debug(f"Role: {msg['role']}, Content: {msg['content']}")
 
-        self.user_llm_config_service = UserLLMConfigService()
-        self.user_llm_config = self.user_llm_config_service.get_available_llm()
+        # Use provided client or the pooled client of the configured provider
+        # 替换为动态根据用户配置选择 LLM 客户端
+        if client is not None:
+            current_client, default_model = client, "models/lpm"
+        else:
+            current_client, default_model = self.get_provider_client()
         
         # Prepare API call parameters
         api_params = {
@@ -330,7 +366,7 @@ class ChatService:
             "tool_choice": None,  # Optional: If function calling or similar features are needed
             "max_tokens": request.max_tokens,
             "stream": stream,
-            "model": request.model or "models/lpm",
+            "model": request.model or default_model,
             "metadata": request.metadata
         }
         
@@ -342,14 +378,14 @@ class ChatService:
         if model_params:
             api_params.update(model_params)
 
-        logger.info(f"Current client base URL: {current_client.base_url}")
+        logger.debug(f"Current client base URL: {current_client.base_url}")
         # logger.info(f"Using model parameters: {api_params}")
         
         # Call LLM API
         try:
             response = current_client.chat.completions.create(**api_params)
-            if not stream:
-                logger.info(f"Response: {response.json() if hasattr(response, 'json') else response}")
+            if not stream and debug_sampled:
+                logger.debug(f"Response: {response.json() if hasattr(response, 'json') else response}")
             return response
             
         except Exception as e:
@@ -2,33 +2,67 @@
 service about knowledge retrieve
 """
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Dict, Any, Optional
+from lpm_kernel.file_data.document_repository import DocumentRepository
 from lpm_kernel.file_data.embedding_service import EmbeddingService, ChunkDTO
-from lpm_kernel.kernel.l1.l1_manager import get_latest_global_bio
+from lpm_kernel.file_data.keyword_index import ChunkKeywordIndex, get_chunk_keyword_index
+from lpm_kernel.kernel.l1.shade_index import shade_index_manager
 
 logger = logging.getLogger(__name__)
 
+# reciprocal-rank fusion constant, score = sum(1 / (RRF_K + rank))
+RRF_K = 60
+# each ranking contributes this many times max_chunks candidates to the fusion
+CANDIDATE_MULTIPLIER = 4
+# a keyword hit must contain at least this share of the query's non-stopword terms
+KEYWORD_MIN_TERM_SHARE = float(os.getenv("L0_KEYWORD_MIN_TERM_SHARE", "0.25"))
+# vector search runs here while keyword search runs on the calling thread
+_retrieval_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="l0-retrieval")
+
 
 class L0KnowledgeRetriever:
-    """L0 knowledge retriever"""
+    """L0 knowledge retriever
+
+    In hybrid mode (L0_RETRIEVAL_MODE=hybrid, the default) BM25 keyword search
+    over the chunk keyword index and vector search run in parallel and their
+    rankings are fused with reciprocal-rank fusion. Vector hits still need to
+    reach similarity_threshold; keyword hits need to contain KEYWORD_MIN_TERM_SHARE
+    of the query's terms after stopwords are dropped, so exact names, dates and
+    keywords are found even when embeddings score them low, while a chunk that
+    only shares a common word with the query is not.
+    """
 
     def __init__(
         self,
         embedding_service: EmbeddingService,
         similarity_threshold: float = 0.7,
         max_chunks: int = 3,
+        keyword_index: Optional[ChunkKeywordIndex] = None,
+        mode: Optional[str] = None,
     ):
         """
         init L0 knowledge retriever
 
         Args:
             embedding_service: Embedding service instance
-            similarity_threshold: only return contents whose similarity bigger than this value
+            similarity_threshold: only return vector hits whose similarity bigger than this value
             max_chunks: the maximum number of return chunks
+            keyword_index: BM25 index over chunks, defaults to the process-wide index
+            mode: "hybrid" or "vector", defaults to L0_RETRIEVAL_MODE
         """
         self.embedding_service = embedding_service
         self.similarity_threshold = similarity_threshold
         self.max_chunks = max_chunks
+        self.mode = (mode or os.getenv("L0_RETRIEVAL_MODE", "hybrid")).lower()
+        self._keyword_index = keyword_index
+
+    @property
+    def keyword_index(self) -> ChunkKeywordIndex:
+        if self._keyword_index is None:
+            self._keyword_index = get_chunk_keyword_index()
+        return self._keyword_index
 
     def retrieve(self, query: str) -> str:
         """
@@ -41,32 +75,111 @@ class L0KnowledgeRetriever:
             str: structured knowledge content, or empty string if no relevant knowledge found
         """
         try:
-            # search related chunks
-            similar_chunks: List[
-                Tuple[ChunkDTO, float]
-            ] = self.embedding_service.search_similar_chunks(
-                query=query, limit=self.max_chunks
-            )
+            return self._format_chunks(self.search([query])[0])
 
-            # filter out low similarity chunks
-            if not similar_chunks:
-                return ""
+        except Exception as e:
+            logger.error(f"L0 knowledge retrieval failed: {str(e)}")
+            return ""
 
-            knowledge_parts = []
-            for chunk, similarity in similar_chunks:
-                if similarity >= self.similarity_threshold:
-                    knowledge_parts.append(chunk.content)
+    def retrieve_batch(self, queries: List[str]) -> List[str]:
+        """
+        retrieve L0 knowledge for several queries with one embedding call and one vector query
 
-            if not knowledge_parts:
-                return ""
+        Args:
+            queries: query contents
 
-            # merge multiple knowledge parts into one
-            return "\n\n".join(knowledge_parts)
+        Returns:
+            List[str]: structured knowledge content per query, empty string where nothing relevant was found
+        """
+        try:
+            return [self._format_chunks(contents) for contents in self.search(queries)]
 
         except Exception as e:
-            logger.error(f"L0 knowledge retrieval failed: {str(e)}")
+            logger.error(f"L0 batch knowledge retrieval failed: {str(e)}")
+            return ["" for _ in queries]
+
+    def search(self, queries: List[str]) -> List[List[str]]:
+        """
+        ranked chunk contents per query
+
+        Args:
+            queries: query contents
+
+        Returns:
+            List[List[str]]: at most max_chunks contents per query, best first
+        """
+        if self.mode != "hybrid":
+            batch = self.embedding_service.search_similar_chunks_batch(
+                queries=queries, limit=self.max_chunks
+            )
+            return [
+                [chunk.content for chunk, similarity in similar_chunks if similarity >= self.similarity_threshold]
+                for similar_chunks in batch
+            ]
+
+        candidates = self.max_chunks * CANDIDATE_MULTIPLIER
+        vector_future = _retrieval_executor.submit(
+            self.embedding_service.search_similar_chunks_batch, queries, candidates
+        )
+        try:
+            self.keyword_index.ensure_built(DocumentRepository().list_chunk_texts)
+            keyword_batch = [
+                self.keyword_index.search(query, candidates, min_term_share=KEYWORD_MIN_TERM_SHARE)
+                for query in queries
+            ]
+        except Exception as e:
+            logger.error(f"L0 keyword search failed, using vector results only: {str(e)}")
+            keyword_batch = [[] for _ in queries]
+        try:
+            vector_batch = vector_future.result()
+        except Exception as e:
+            logger.error(f"L0 vector search failed, using keyword results only: {str(e)}")
+            vector_batch = [[] for _ in queries]
+
+        return [
+            self._fuse(query, vector_hits, keyword_hits)
+            for query, vector_hits, keyword_hits in zip(queries, vector_batch, keyword_batch)
+        ]
+
+    def _fuse(
+        self,
+        query: str,
+        vector_hits: List[Tuple[ChunkDTO, float]],
+        keyword_hits: List[Tuple[int, float]],
+    ) -> List[str]:
+        """reciprocal-rank fusion of vector and BM25 rankings"""
+        scores: Dict[int, float] = {}
+        contents: Dict[int, str] = {}
+        vector_hits = [(chunk, similarity) for chunk, similarity in vector_hits if similarity >= self.similarity_threshold]
+        for rank, (chunk, _) in enumerate(vector_hits):
+            scores[chunk.id] = scores.get(chunk.id, 0.0) + 1.0 / (RRF_K + rank + 1)
+            contents[chunk.id] = chunk.content
+        for rank, (chunk_id, _) in enumerate(keyword_hits):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+        missing = [chunk_id for chunk_id in scores if chunk_id not in contents]
+        for chunk_id, (_, content) in self.keyword_index.get_contents(missing).items():
+            contents[chunk_id] = content
+
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        results = [contents[chunk_id] for chunk_id in ranked if chunk_id in contents][: self.max_chunks]
+        if not results:
+            logger.info(
+                f"L0 retrieval found no chunk with similarity >= {self.similarity_threshold} or enough keyword matches"
+            )
+        else:
+            logger.debug(
+                f"L0 retrieval fused {len(vector_hits)} vector and {len(keyword_hits)} keyword hits into {len(results)} chunks"
+            )
+        return results
+
+    def _format_chunks(self, contents: List[str]) -> str:
+        if not contents:
             return ""
 
+        # merge multiple knowledge parts into one
+        return "\n\n".join(contents)
+
 
 class L1KnowledgeRetriever:
     """L1 knowledge retriever"""
@@ -100,44 +213,31 @@ class L1KnowledgeRetriever:
             str: structured knowledge content, or empty string if no relevant knowledge found
         """
         try:
-            # get global bio shades
-            global_bio = get_latest_global_bio()
-            if not global_bio or not global_bio.shades:
+            # shade embeddings are precomputed when L1 is stored
+            index = shade_index_manager.get_index()
+            if index is None:
+                # L1 stored before the index existed: build it once
+                index = shade_index_manager.rebuild_from_latest(self.embedding_service.llm_client)
+            if index is None or not index.shades:
                 logger.info("Global Bio not found or Shades is empty")
                 return ""
 
             # get query embedding
-            query_embedding = self.embedding_service.get_embedding(query)
-            if not query_embedding:
+            query_embedding = self.embedding_service.llm_client.get_embedding([query])
+            if query_embedding is None or len(query_embedding) == 0:
                 logger.error("Failed to get embedding for query text")
                 return ""
+            query_embedding = query_embedding[0]
 
-            # get all shades' embeddings
-            shade_embeddings = []
-            for shade in global_bio.shades:
-                shade_text = (
-                    f"{shade.get('title', '')} - {shade.get('description', '')}"
-                )
-                embedding = self.embedding_service.get_embedding(shade_text)
-                if embedding:
-                    shade_embeddings.append((shade, embedding))
-
-            if not shade_embeddings:
-                logger.info("No available Shades embeddings found")
-                return ""
+            if index.dimension != len(query_embedding):
+                # embedding model changed since the index was built
+                logger.info(f"Shade index dimension {index.dimension} != {len(query_embedding)}, rebuilding")
+                index = shade_index_manager.rebuild_from_latest(self.embedding_service.llm_client, index.version)
+                if index is None or not index.shades:
+                    return ""
 
-            # calculate similarity and sort
-            similar_shades = []
-            for shade, embedding in shade_embeddings:
-                similarity = self.embedding_service.calculate_similarity(
-                    query_embedding, embedding
-                )
-                if similarity >= self.similarity_threshold:
-                    similar_shades.append((shade, similarity))
-
-            # sort according to similarity and limit the number of returned shades
-            similar_shades.sort(key=lambda x: x[1], reverse=True)
-            similar_shades = similar_shades[: self.max_shades]
+            # one matrix-vector product, top-k above the threshold, sorted by similarity
+            similar_shades = index.search(query_embedding, self.max_shades, self.similarity_threshold)
 
             if not similar_shades:
                 return ""
@@ -0,0 +1,52 @@
+"""
+L0 hybrid retrieval: keyword hits must match enough of the query
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from lpm_kernel.file_data.keyword_index import ChunkKeywordIndex
+
+# The module builds its default retrievers at import time; keep them off the vector store
+with mock.patch("lpm_kernel.file_data.embedding_service.EmbeddingService"):
+    from lpm_kernel.api.domains.kernel2.services import knowledge_service
+
+CHUNKS = [
+    (1, 1, "The quarterly revenue report shows the sales grew by 12 percent in the third quarter."),
+    (2, 2, "周末我们去公园散步，天气很好，还看到了很多花。"),
+    (3, 3, "Project Apollo budget was approved at 2.4 million for the next fiscal year."),
+    (4, 4, "张三的电话是13800138000，他住在上海。"),
+    (5, 5, "我们晚上吃火锅，张三点了很多牛肉。"),
+]
+
+
+class L0KnowledgeRetrieverTest(unittest.TestCase):
+    def setUp(self):
+        self.index = ChunkKeywordIndex(os.path.join(tempfile.mkdtemp(), "chunk_keyword_index.db"), tokenizer="bigram")
+        self.index.rebuild(CHUNKS)
+        # No vector hit reaches the similarity threshold, so results come from the keyword side only
+        embedding_service = mock.Mock()
+        embedding_service.search_similar_chunks_batch.side_effect = lambda queries, limit: [[] for _ in queries]
+        self.retriever = knowledge_service.L0KnowledgeRetriever(
+            embedding_service, similarity_threshold=0.7, max_chunks=3, keyword_index=self.index, mode="hybrid"
+        )
+        patcher = mock.patch.object(knowledge_service, "DocumentRepository")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unrelated_query_returns_nothing(self):
+        # Each query shares only a stopword ("the", "我们") with some chunk
+        queries = ["what is the weather like", "我们吃什么"]
+        self.assertEqual(self.retriever.search(queries), [[], []])
+        self.assertEqual(self.retriever.retrieve(queries[0]), "")
+
+    def test_single_shared_term_in_long_query_is_not_a_hit(self):
+        self.assertEqual(self.retriever.search(["你还记得张三的电话吗"]), [[CHUNKS[3][2]]])
+
+    def test_keyword_match_is_returned(self):
+        self.assertEqual(self.retriever.retrieve("What was the Apollo budget?"), CHUNKS[2][2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -360,14 +360,10 @@ class LoadService:
     def _clear_vector_database() -> None:
         """Clear ChromaDB vector database collections"""
         try:
-            import chromadb
-            import os
+            from lpm_kernel.common.repository.vector_store_factory import VectorStoreFactory
             
-            # Get ChromaDB path
-            chroma_path = os.getenv("CHROMA_PERSIST_DIRECTORY", "./data/chroma_db")
-            
-            # Create ChromaDB client
-            client = chromadb.PersistentClient(path=chroma_path)
+            # Create client for the configured vector store backend
+            client = VectorStoreFactory.create_client()
             
             # Get document-level collection and clear content
             try:
@@ -399,6 +395,11 @@ class LoadService:
             except Exception as e:
                 logger.error(f"Error clearing 'document_chunks' collection: {str(e)}")
             
+            # Keyword index mirrors the chunk collection
+            from lpm_kernel.file_data.keyword_index import get_chunk_keyword_index
+            get_chunk_keyword_index().clear()
+            logger.info("Cleared chunk keyword index")
+            
         except Exception as e:
             logger.error(f"Failed to clear ChromaDB collections: {str(e)}")
 
@@ -163,11 +163,9 @@ class TrainProcessService:
                         failed += 1
                         continue
 
-                    # Split into chunks and save
+                    # Split into chunks and save them in one transaction
                     chunks = chunker.split(doc.raw_content)
-                    for chunk in chunks:
-                        chunk.document_id = doc.id
-                        chunk_service.save_chunk(chunk)
+                    chunk_service.save_chunks_bulk(doc.id, chunks)
 
                     processed += 1
                     logger.info(
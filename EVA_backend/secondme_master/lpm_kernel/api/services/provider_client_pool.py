@@ -0,0 +1,83 @@
+"""
+Pool of reusable OpenAI-compatible provider clients
+"""
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROVIDER_TIMEOUT = float(os.getenv("CHAT_PROVIDER_TIMEOUT", "60"))
+MAX_POOLED_CLIENTS = int(os.getenv("CHAT_PROVIDER_POOL_SIZE", "8"))
+
+
+def _llm_config_version() -> int:
+    # Imported on use: the config service pulls in the ORM models and repositories
+    from lpm_kernel.api.services.user_llm_config_service import get_llm_config_version
+    return get_llm_config_version()
+
+
+class ProviderClientPool:
+    """Reuses OpenAI clients, and with them their HTTP connection pools
+
+    Clients are keyed by (base URL, API key hash, timeout) so that the key
+    itself is never held in the pool index. When the LLM configuration
+    version changes, the pooled clients are dropped and rebuilt on next use.
+    Dropped clients are not closed, since a streaming response may still be
+    reading from them; they are released once no longer referenced.
+    """
+
+    def __init__(self, max_size: int = MAX_POOLED_CLIENTS, version_source: Optional[Callable[[], int]] = None):
+        self.max_size = max_size
+        self._version_source = version_source or _llm_config_version
+        self._clients: "OrderedDict[Tuple[str, str, float], OpenAI]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._config_version: Optional[int] = None
+        self.stats = {"hits": 0, "created": 0, "evicted": 0, "invalidations": 0}
+
+    @staticmethod
+    def _key(base_url: str, api_key: Optional[str], timeout: float) -> Tuple[str, str, float]:
+        key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+        return (base_url.rstrip("/"), key_hash, float(timeout))
+
+    def get(self, base_url: str, api_key: Optional[str], timeout: float = DEFAULT_PROVIDER_TIMEOUT) -> OpenAI:
+        """Return the pooled client for the endpoint, creating it on first use"""
+        key = self._key(base_url, api_key, timeout)
+        with self._lock:
+            version = self._version_source()
+            if version != self._config_version:
+                if self._config_version is not None:
+                    self.stats["invalidations"] += 1
+                self._clients.clear()
+                self._config_version = version
+
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                self.stats["hits"] += 1
+                return client
+
+            client = OpenAI(base_url=base_url, api_key=api_key or "sk-no-key-required", timeout=timeout)
+            self._clients[key] = client
+            self.stats["created"] += 1
+            if len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+                self.stats["evicted"] += 1
+            logger.info(f"Created provider client for {key[0]} (pool size {len(self._clients)})")
+            return client
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats, size=len(self._clients))
+
+
+# Global provider client pool
+provider_client_pool = ProviderClientPool()
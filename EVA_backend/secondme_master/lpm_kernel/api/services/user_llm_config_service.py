@@ -1,4 +1,7 @@
-from typing import Optional
+import os
+import threading
+import time
+from typing import Dict, Optional
 from lpm_kernel.api.repositories.user_llm_config_repository import UserLLMConfigRepository
 from lpm_kernel.api.dto.user_llm_config_dto import (
     UserLLMConfigDTO,
@@ -6,6 +9,64 @@ from lpm_kernel.api.dto.user_llm_config_dto import (
 )
 from datetime import datetime
 
+# Seconds before a cached snapshot is re-read from the database, so processes
+# that share the database pick up changes made elsewhere; 0 disables expiry
+LLM_CONFIG_CACHE_TTL = float(os.getenv("LLM_CONFIG_CACHE_TTL", "30"))
+
+
+class _ConfigSnapshot:
+    """Process-wide cached copy of the default LLM configuration
+
+    update_config and delete_key bump the version, which makes the next
+    lookup in this process reload from the database. The TTL covers writes
+    made by other processes.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.version = 0
+        self._lock = threading.Lock()
+        self._config: Optional[UserLLMConfigDTO] = None
+        self._loaded_version = -1
+        self._loaded_at = 0.0
+        self.stats = {"lookups": 0, "db_reads": 0, "invalidations": 0}
+
+    def _is_fresh(self) -> bool:
+        if self._loaded_version != self.version:
+            return False
+        return self.ttl <= 0 or time.monotonic() - self._loaded_at < self.ttl
+
+    def get(self, load) -> Optional[UserLLMConfigDTO]:
+        self.stats["lookups"] += 1
+        if self._is_fresh():
+            return self._config
+        with self._lock:
+            if not self._is_fresh():
+                version = self.version
+                self._config = load()
+                self._loaded_version = version
+                self._loaded_at = time.monotonic()
+                self.stats["db_reads"] += 1
+            return self._config
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            self.stats["invalidations"] += 1
+
+
+_config_snapshot = _ConfigSnapshot(LLM_CONFIG_CACHE_TTL)
+
+
+def get_llm_config_version() -> int:
+    """Counter bumped whenever this process changes the LLM configuration"""
+    return _config_snapshot.version
+
+
+def get_llm_config_cache_stats() -> Dict[str, int]:
+    """Lookup counters of the cached LLM configuration"""
+    return dict(_config_snapshot.stats, version=_config_snapshot.version)
+
 
 class UserLLMConfigService:
     """User LLM Configuration Service"""
@@ -15,9 +76,15 @@ class UserLLMConfigService:
 
     def get_available_llm(self) -> Optional[UserLLMConfigDTO]:
         """Get available LLM configuration
-        Since we only have one default configuration now (ID=1), just return it
+        Since we only have one default configuration now (ID=1), just return it.
+        The configuration is served from a process-wide snapshot; callers must
+        not modify the returned object.
         """
-        return self.repository.get_default_config()
+        return _config_snapshot.get(self.repository.get_default_config)
+
+    def invalidate_cache(self) -> None:
+        """Drop the cached configuration so the next lookup reads the database"""
+        _config_snapshot.invalidate()
     
 
     def update_config(
@@ -41,7 +108,10 @@ class UserLLMConfigService:
         self._ensure_single_record()
         
         # Update or create the configuration
-        return self.repository.update(config_id, dto)
+        try:
+            return self.repository.update(config_id, dto)
+        finally:
+            _config_snapshot.invalidate()
 
     def delete_key(self, config_id: int = 1) -> Optional[UserLLMConfigDTO]:
         """Delete API key from the configuration
@@ -64,7 +134,10 @@ class UserLLMConfigService:
             return None
         
         # delete 
-        return self.repository.delete(config_id)
+        try:
+            return self.repository.delete(config_id)
+        finally:
+            _config_snapshot.invalidate()
         
     def _ensure_single_record(self):
         """Ensure that only one configuration record exists in the database"""
@@ -13,6 +13,7 @@ from .database.migration_manager import MigrationManager
 import os
 import atexit
 import subprocess
+import threading
 
 
 def create_app():
@@ -54,6 +55,9 @@ def create_app():
     # Register all routes
     init_routes(app)
 
+    # Load the embedding model in the background so the first query does not pay the load cost
+    threading.Thread(target=warm_up_embedding_model, name="embedding-warm-up", daemon=True).start()
+
     # Clean up database connection only when the application shuts down
     @app.teardown_appcontext
     def cleanup_db(exception):
@@ -62,6 +66,16 @@ def create_app():
     return app
 
 
+def warm_up_embedding_model():
+    try:
+        from .api.services.user_llm_config_service import UserLLMConfigService
+        from .common.strategy.strategy_huggingface import warm_up
+
+        warm_up(UserLLMConfigService().get_available_llm())
+    except Exception as e:
+        logger.warning(f"Embedding model warm-up skipped: {str(e)}")
+
+
 app = create_app()
 
 
@@ -0,0 +1,195 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from lpm_kernel.configs.logging import get_train_process_logger
+logger = get_train_process_logger()
+
+DEFAULT_CACHE_PATH = "data/sqlite/embedding_cache.db"
+DEFAULT_MEMORY_ITEMS = 10000
+# SQLite limits the number of bound parameters per statement
+LOOKUP_BATCH_SIZE = 500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache
+
+    Vectors are keyed by (model, dimension, sha256 of text) and stored as float32
+    blobs in SQLite, with an in-memory LRU in front. The cache remembers which
+    (model, dimension) is active; switching to a different one drops every
+    vector produced by the previous model.
+    """
+
+    def __init__(self, db_path: str, memory_items: int = DEFAULT_MEMORY_ITEMS):
+        self.db_path = db_path
+        self.memory_items = memory_items
+        self._memory: "OrderedDict[Tuple[str, int, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._active: Optional[Tuple[str, int]] = None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "invalidations": 0}
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                model TEXT NOT NULL,
+                dimension INTEGER NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model, dimension, text_hash)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        row = self._conn.execute(
+            "SELECT value FROM embedding_cache_meta WHERE key = 'active_model'"
+        ).fetchone()
+        if row:
+            model, _, dimension = row[0].rpartition("|")
+            self._active = (model, int(dimension))
+
+    def activate(self, model: str, dimension: int) -> None:
+        """Record the current (model, dimension); entries of any other model are removed"""
+        if self._active == (model, dimension):
+            return
+        with self._lock:
+            if self._active == (model, dimension):
+                return
+            if self._active is not None:
+                deleted = self._conn.execute(
+                    "DELETE FROM embedding_cache WHERE model != ? OR dimension != ?", (model, dimension)
+                ).rowcount
+                self._memory.clear()
+                self.stats["invalidations"] += 1
+                logger.info(
+                    f"Embedding model changed from {self._active[0]} ({self._active[1]}d) to "
+                    f"{model} ({dimension}d), dropped {deleted} cached embeddings"
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embedding_cache_meta (key, value) VALUES ('active_model', ?)",
+                (f"{model}|{dimension}",),
+            )
+            self._conn.commit()
+            self._active = (model, dimension)
+
+    def get_many(self, model: str, dimension: int, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up texts, returning a vector or None per text"""
+        keys = [(model, dimension, text_hash(text)) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(keys)
+        with self._lock:
+            missing: Dict[str, List[int]] = {}
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    results[i] = vector
+                    self.stats["memory_hits"] += 1
+                else:
+                    missing.setdefault(key[2], []).append(i)
+
+            hashes = list(missing)
+            for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+                batch = hashes[start:start + LOOKUP_BATCH_SIZE]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embedding_cache "
+                    f"WHERE model = ? AND dimension = ? AND text_hash IN ({','.join('?' * len(batch))})",
+                    (model, dimension, *batch),
+                ).fetchall()
+                for hash_value, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    self._remember((model, dimension, hash_value), vector)
+                    for i in missing[hash_value]:
+                        results[i] = vector
+                    self.stats["disk_hits"] += len(missing[hash_value])
+
+            self.stats["misses"] += sum(1 for vector in results if vector is None)
+        return results
+
+    def put_many(self, model: str, dimension: int, texts: Sequence[str], vectors) -> None:
+        rows = []
+        now = time.time()
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                vector = np.asarray(vector, dtype=np.float32)
+                key = (model, dimension, text_hash(text))
+                self._remember(key, vector)
+                rows.append((model, dimension, key[2], vector.tobytes(), now))
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (model, dimension, text_hash, vector, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.commit()
+                self.stats["writes"] += len(rows)
+            except sqlite3.Error as e:
+                # The in-memory LRU still holds the vectors; only persistence is lost
+                logger.warning(f"Failed to persist {len(rows)} embeddings to cache: {str(e)}")
+
+    def _remember(self, key: Tuple[str, int, str], vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get_stats(self) -> Dict:
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        return {
+            **self.stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_items": len(self._memory),
+            "active_model": self._active[0] if self._active else None,
+            "active_dimension": self._active[1] if self._active else None,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM embedding_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_failed = False
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Process-wide cache instance; None when disabled via EMBEDDING_CACHE_ENABLED=false"""
+    global _cache, _cache_failed
+    if _cache_failed or os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None and not _cache_failed:
+                try:
+                    _cache = EmbeddingCache(
+                        os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH),
+                        int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", str(DEFAULT_MEMORY_ITEMS))),
+                    )
+                except Exception as e:
+                    _cache_failed = True
+                    logger.error(f"Embedding cache disabled, failed to open: {str(e)}", exc_info=True)
+    return _cache
@@ -6,6 +6,7 @@ import numpy as np
 from lpm_kernel.configs.logging import get_train_process_logger
 logger = get_train_process_logger()
 import lpm_kernel.common.strategy.classification as classification
+from lpm_kernel.common.embedding_cache import get_embedding_cache
 from sentence_transformers import SentenceTransformer
 import json
 
@@ -45,6 +46,35 @@ class LLMClient:
         if isinstance(texts, str):
             texts = [texts]
 
+        user_llm_config = self.user_llm_config_service.get_available_llm()
+        if not user_llm_config:
+            raise EmbeddingError("No LLM configuration found")
+
+        cache = get_embedding_cache()
+        if cache is None or not texts:
+            return self._compute_embeddings(texts, user_llm_config)
+
+        # Consult the content-addressed cache first; only missing texts reach the strategy
+        from lpm_kernel.file_data.chroma_utils import detect_embedding_model_dimension
+        model_key = f"{user_llm_config.embedding_model_name}@{user_llm_config.embedding_endpoint}"
+        dimension = detect_embedding_model_dimension(user_llm_config.embedding_model_name or "")
+        cache.activate(model_key, dimension)
+        embeddings = cache.get_many(model_key, dimension, texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            computed = self._compute_embeddings(missing_texts, user_llm_config)
+            cache.put_many(model_key, dimension, missing_texts, computed)
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+        logger.info(
+            f"Embedding cache: {len(texts) - len(missing)}/{len(texts)} hits "
+            f"(hit rate {cache.get_stats()['hit_rate']:.2%})"
+        )
+        return np.stack([np.asarray(embedding, dtype=np.float32) for embedding in embeddings])
+
+    def _compute_embeddings(self, texts: List[str], user_llm_config) -> np.ndarray:
+        """Embed texts through the configured strategy, splitting and averaging long texts"""
         # Split long texts into chunks using configured max length
         chunked_texts = []
         text_chunk_counts = []  # Keep track of how many chunks each text was split into
@@ -60,10 +90,6 @@ class LLMClient:
                 chunked_texts.append(text)
                 text_chunk_counts.append(1)
 
-        user_llm_config = self.user_llm_config_service.get_available_llm()
-        if not user_llm_config:
-            raise EmbeddingError("No LLM configuration found")
-        
         try:
             # Send request to embedding endpoint
             embeddings_array = classification.strategy_classification(user_llm_config, chunked_texts)
@@ -106,6 +132,11 @@ class LLMClient:
             logger.error(error_msg, exc_info=True)
             raise EmbeddingError(error_msg, e)
 
+    def embedding_cache_stats(self) -> dict:
+        """Hit/miss counters of the embedding cache (empty when the cache is disabled)"""
+        cache = get_embedding_cache()
+        return cache.get_stats() if cache is not None else {}
+
     @property
     def chat_credentials(self):
         """Get LLM authentication information"""
@@ -1,12 +1,58 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from contextlib import contextmanager
 import logging
+from typing import Dict
 from lpm_kernel.configs.config import Config
 import os
 
 logger = logging.getLogger(__name__)
 
+# SQLite tuning profiles applied to every new connection.
+# WAL lets readers run alongside a writer; busy_timeout makes a blocked
+# connection wait for the lock instead of failing with "database is locked".
+SQLITE_PROFILES: Dict[str, Dict[str, str]] = {
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": "-65536",  # 64 MiB
+        "mmap_size": "268435456",  # 256 MiB
+        "temp_store": "MEMORY",
+        "busy_timeout": "30000",
+    },
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": "-16384",  # 16 MiB
+        "busy_timeout": "30000",
+    },
+    "none": {},
+}
+
+
+def sqlite_pragmas(db_config: Dict) -> Dict[str, str]:
+    """Pragmas of the configured profile with per-pragma overrides applied"""
+    profile = db_config.get("sqlite_profile", "performance")
+    if profile not in SQLITE_PROFILES:
+        logger.warning(f"Unknown SQLite profile '{profile}', using 'performance'")
+        profile = "performance"
+    pragmas = dict(SQLITE_PROFILES[profile])
+    pragmas.update(db_config.get("sqlite_pragmas") or {})
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine, pragmas: Dict[str, str]):
+    """Register a connect listener that tunes each pooled connection"""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
 
 class Base(DeclarativeBase):
     pass
@@ -35,11 +81,12 @@ class DatabaseSession:
                 db_dir = os.path.dirname(db_config['db_file'])
                 if not os.path.exists(db_dir):
                     os.makedirs(db_dir)
-                
+
                 # Build SQLite connection URL
                 db_url = f"sqlite:///{db_config['db_file']}"
+                pragmas = sqlite_pragmas(db_config)
 
-                cls._engine = create_engine(
+                engine = create_engine(
                     db_url,
                     echo=False,
                     pool_pre_ping=True,
@@ -47,8 +94,14 @@ class DatabaseSession:
                     pool_size=db_config['maxsize'],
                     max_overflow=20,
                 )
-                cls._session_factory = sessionmaker(bind=cls._engine)
-                logger.info("SQLite database engine and session factory initialized")
+                apply_sqlite_pragmas(engine, pragmas)
+
+                cls._engine = engine
+                cls._session_factory = sessionmaker(bind=engine)
+                logger.info(
+                    f"SQLite database engine and session factory initialized "
+                    f"(profile={db_config['sqlite_profile']}, pragmas={pragmas})"
+                )
             except Exception as e:
                 logger.error(f"Failed to initialize database: {str(e)}")
                 raise
@@ -0,0 +1,538 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from lpm_kernel.configs.logging import get_train_process_logger
+logger = get_train_process_logger()
+
+try:
+    import hnswlib
+except ImportError:  # optional dependency, flat search is used without it
+    hnswlib = None
+
+DEFAULT_LOCAL_VECTOR_DIRECTORY = "./data/local_vector_db"
+INITIAL_CAPACITY = 1024
+# "auto" uses hnswlib when installed, "flat" always scans the matrix, "hnsw" requires hnswlib
+DEFAULT_INDEX_MODE = os.getenv("LOCAL_VECTOR_INDEX", "auto").lower()
+HNSW_M = int(os.getenv("LOCAL_VECTOR_HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("LOCAL_VECTOR_HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("LOCAL_VECTOR_HNSW_EF_SEARCH", "64"))
+# Filtered queries matching at most this many rows are answered exactly by a flat scan
+FLAT_FILTER_LIMIT = int(os.getenv("LOCAL_VECTOR_FLAT_FILTER_LIMIT", "20000"))
+# Metadata fields with an expression index; chunks are filtered by document_id
+INDEXED_METADATA_FIELDS = ("document_id",)
+# SQLite limits the number of bound parameters per statement
+SQL_BATCH_SIZE = 500
+
+ALL_INCLUDES = ("documents", "metadatas", "embeddings", "distances")
+_OPERATORS = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+
+def _json_field(key: str) -> str:
+    path = '$."' + key.replace('"', '\\"') + '"'
+    return "json_extract(metadata, '" + path.replace("'", "''") + "')"
+
+
+def _where_to_sql(where: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """Translate a Chroma-style metadata filter into a SQL condition on items.metadata"""
+    clauses, params = [], []
+    for key, condition in where.items():
+        if key in ("$and", "$or"):
+            parts = [_where_to_sql(sub) for sub in condition]
+            joiner = " AND " if key == "$and" else " OR "
+            clauses.append("(" + joiner.join(part for part, _ in parts) + ")")
+            for _, part_params in parts:
+                params.extend(part_params)
+            continue
+        # The path is inlined (not bound) so SQLite can match expression indexes on it
+        field = _json_field(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, value in condition.items():
+            if op in _OPERATORS:
+                clauses.append(f"{field} {_OPERATORS[op]} ?")
+                params.append(value)
+            elif op in ("$in", "$nin"):
+                values = list(value)
+                negate = "NOT " if op == "$nin" else ""
+                clauses.append(f"{field} {negate}IN ({','.join('?' * len(values))})")
+                params.extend(values)
+            else:
+                raise ValueError(f"Unsupported where operator: {op}")
+    return " AND ".join(clauses) or "1", params
+
+
+class LocalVectorCollection:
+    """One collection of the local vector store
+
+    Vectors live in a memory-mapped float32 matrix (<name>.f32), one row per
+    item, L2-normalized so cosine distance is 1 - dot product. Ids, documents
+    and metadata live in SQLite; metadata filters are evaluated there with
+    json_extract. Deleted rows are zeroed and reused by later inserts.
+
+    With hnswlib installed an HNSW graph over the rows serves unfiltered and
+    broad filtered queries; it is saved on persist() and rebuilt from the
+    matrix if the saved copy is stale. Query results use Chroma's layout.
+    """
+
+    def __init__(self, client: "LocalVectorClient", name: str, metadata: Dict[str, Any]):
+        self._client = client
+        self._conn = client._conn
+        self.name = name
+        self.metadata = metadata
+        self._lock = threading.RLock()
+        self._matrix_path = os.path.join(client.path, f"{name}.f32")
+        self._index_path = os.path.join(client.path, f"{name}.hnsw")
+        self._matrix: Optional[np.memmap] = None
+        self._capacity = 0
+        self._index = None
+        self._index_dirty = False
+
+        self._id_to_row: Dict[str, int] = {}
+        rows = self._conn.execute(
+            "SELECT row, id FROM items WHERE collection = ?", (name,)
+        ).fetchall()
+        self._size = max((row for row, _ in rows), default=-1) + 1
+        self._row_to_id: List[Optional[str]] = [None] * self._size
+        for row, item_id in rows:
+            self._id_to_row[item_id] = row
+            self._row_to_id[row] = item_id
+        self._free = [row for row in range(self._size - 1, -1, -1) if self._row_to_id[row] is None]
+
+        if self.dimension:
+            self._open_matrix(max(self._size, INITIAL_CAPACITY))
+            self._open_index()
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return self.metadata.get("dimension")
+
+    def count(self) -> int:
+        return len(self._id_to_row)
+
+    # ---- storage ----
+
+    def _open_matrix(self, capacity: int) -> None:
+        if self._matrix is not None and capacity <= self._capacity:
+            return
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        itemsize = self.dimension * 4
+        existing = os.path.getsize(self._matrix_path) // itemsize if os.path.exists(self._matrix_path) else 0
+        capacity = max(capacity, existing)
+        if existing < capacity:
+            with open(self._matrix_path, "ab") as f:
+                f.truncate(capacity * itemsize)
+        self._matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+        self._capacity = capacity
+
+    def _use_hnsw(self) -> bool:
+        mode = self._client.index_mode
+        if mode == "hnsw" and hnswlib is None:
+            raise RuntimeError("LOCAL_VECTOR_INDEX=hnsw requires the hnswlib package")
+        return hnswlib is not None and mode in ("auto", "hnsw")
+
+    def _open_index(self) -> None:
+        if not self._use_hnsw():
+            return
+        self._index = hnswlib.Index(space="ip", dim=self.dimension)
+        synced = self.metadata.get("index_synced", False)
+        if synced and os.path.exists(self._index_path):
+            try:
+                self._index.load_index(self._index_path, max_elements=max(self._capacity, 1))
+                self._index.set_ef(HNSW_EF_SEARCH)
+                return
+            except Exception as e:
+                logger.warning(f"Failed to load HNSW index of '{self.name}', rebuilding: {str(e)}")
+                self._index = hnswlib.Index(space="ip", dim=self.dimension)
+        self._index.init_index(max_elements=max(self._capacity, 1), M=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION)
+        self._index.set_ef(HNSW_EF_SEARCH)
+        live = np.fromiter(self._id_to_row.values(), dtype=np.int64, count=len(self._id_to_row))
+        if len(live):
+            self._index.add_items(self._matrix[live], live)
+            logger.info(f"Rebuilt HNSW index of '{self.name}' with {len(live)} vectors")
+        self._mark_index_dirty()
+
+    def _mark_index_dirty(self) -> None:
+        if self._index is not None and not self._index_dirty:
+            self._index_dirty = True
+            self._set_metadata_value("index_synced", False)
+
+    def _set_metadata_value(self, key: str, value: Any) -> None:
+        self.metadata[key] = value
+        self._conn.execute(
+            "UPDATE collections SET metadata = ? WHERE name = ?", (json.dumps(self.metadata), self.name)
+        )
+        self._conn.commit()
+
+    def persist(self) -> None:
+        """Flush the matrix and save the HNSW index if it changed"""
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
+            if self._index is not None and self._index_dirty:
+                self._index.save_index(self._index_path)
+                self._index_dirty = False
+                self._set_metadata_value("index_synced", True)
+
+    def close(self) -> None:
+        with self._lock:
+            self.persist()
+            self._matrix = None
+            self._index = None
+
+    # ---- writes ----
+
+    def _prepare_vectors(self, embeddings) -> np.ndarray:
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2:
+            raise ValueError("Embeddings must be a 2-D array or a list of vectors")
+        if not self.dimension:
+            self._set_metadata_value("dimension", int(vectors.shape[1]))
+            self._open_matrix(INITIAL_CAPACITY)
+            self._open_index()
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match collection dimensionality {self.dimension}"
+            )
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _write(self, ids: List[str], embeddings, documents, metadatas, replace: bool) -> None:
+        if not ids:
+            return
+        if embeddings is None:
+            raise ValueError("The local vector store requires precomputed embeddings")
+        if len(set(ids)) != len(ids):
+            raise ValueError("Expected ids to be unique")
+        documents = documents if documents is not None else [None] * len(ids)
+        metadatas = metadatas if metadatas is not None else [None] * len(ids)
+
+        with self._lock:
+            vectors = self._prepare_vectors(embeddings)
+            if len(vectors) != len(ids):
+                raise ValueError(f"Got {len(vectors)} embeddings for {len(ids)} ids")
+
+            keep = []
+            for i, item_id in enumerate(ids):
+                if item_id in self._id_to_row and not replace:
+                    logger.warning(f"Skipping add of existing id {item_id} in '{self.name}'")
+                    continue
+                keep.append(i)
+            if not keep:
+                return
+
+            rows = []
+            for i in keep:
+                row = self._id_to_row.get(ids[i])
+                if row is None:
+                    row = self._free.pop() if self._free else self._size
+                    if row == self._size:
+                        self._size += 1
+                        self._row_to_id.append(None)
+                rows.append(row)
+            if self._size > self._capacity:
+                self._open_matrix(max(self._size, self._capacity * 2))
+                if self._index is not None:
+                    self._index.resize_index(self._capacity)
+
+            row_array = np.asarray(rows, dtype=np.int64)
+            kept_vectors = vectors[keep]
+            self._matrix[row_array] = kept_vectors
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO items (collection, id, row, document, metadata) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        self.name,
+                        ids[i],
+                        row,
+                        documents[i],
+                        json.dumps(metadatas[i], ensure_ascii=False) if metadatas[i] is not None else None,
+                    )
+                    for i, row in zip(keep, rows)
+                ],
+            )
+            self._conn.commit()
+            for i, row in zip(keep, rows):
+                self._id_to_row[ids[i]] = row
+                self._row_to_id[row] = ids[i]
+            if self._index is not None:
+                self._index.add_items(kept_vectors, row_array)
+                self._mark_index_dirty()
+
+    def add(self, ids: List[str], embeddings=None, documents: Optional[List[str]] = None,
+            metadatas: Optional[List[Dict]] = None) -> None:
+        self._write(list(ids), embeddings, documents, metadatas, replace=False)
+
+    def upsert(self, ids: List[str], embeddings=None, documents: Optional[List[str]] = None,
+               metadatas: Optional[List[Dict]] = None) -> None:
+        self._write(list(ids), embeddings, documents, metadatas, replace=True)
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            if ids is None and where is None:
+                raise ValueError("You must provide either ids or where to delete")
+            rows = self._select_rows(ids, where)
+            if not rows:
+                return
+            for start in range(0, len(rows), SQL_BATCH_SIZE):
+                batch = rows[start:start + SQL_BATCH_SIZE]
+                self._conn.execute(
+                    f"DELETE FROM items WHERE collection = ? AND row IN ({','.join('?' * len(batch))})",
+                    (self.name, *batch),
+                )
+            self._conn.commit()
+            self._matrix[np.asarray(rows, dtype=np.int64)] = 0.0
+            for row in rows:
+                del self._id_to_row[self._row_to_id[row]]
+                self._row_to_id[row] = None
+                self._free.append(row)
+                if self._index is not None:
+                    self._index.mark_deleted(row)
+            self._mark_index_dirty()
+
+    # ---- reads ----
+
+    def _select_rows(self, ids: Optional[Sequence[str]], where: Optional[Dict[str, Any]]) -> List[int]:
+        """Rows matching ids and/or where, in ids order when ids are given; each row at most once"""
+        if ids is not None:
+            rows = [self._id_to_row[i] for i in dict.fromkeys(ids) if i in self._id_to_row]
+            if where:
+                allowed = set(self._select_rows(None, where))
+                rows = [row for row in rows if row in allowed]
+            return rows
+        if not where:
+            return sorted(self._id_to_row.values())
+        condition, params = _where_to_sql(where)
+        return sorted(
+            row for (row,) in self._conn.execute(
+                f"SELECT row FROM items WHERE collection = ? AND {condition}",
+                (self.name, *params),
+            )
+        )
+
+    def _load_payload(self, rows: Sequence[int], include: Sequence[str]) -> Dict[int, Tuple[Optional[str], Optional[Dict]]]:
+        if not rows or not ({"documents", "metadatas"} & set(include)):
+            return {}
+        payload = {}
+        unique_rows = list(set(rows))
+        for start in range(0, len(unique_rows), SQL_BATCH_SIZE):
+            batch = unique_rows[start:start + SQL_BATCH_SIZE]
+            for row, document, metadata in self._conn.execute(
+                f"SELECT row, document, metadata FROM items WHERE collection = ? AND row IN ({','.join('?' * len(batch))})",
+                (self.name, *batch),
+            ):
+                payload[row] = (document, json.loads(metadata) if metadata else None)
+        return payload
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            limit: Optional[int] = None, offset: Optional[int] = None,
+            include: Sequence[str] = ("metadatas", "documents")) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._select_rows(ids, where)
+            rows = rows[offset or 0:]
+            if limit is not None:
+                rows = rows[:limit]
+            payload = self._load_payload(rows, include)
+            return {
+                "ids": [self._row_to_id[row] for row in rows],
+                "embeddings": [self._matrix[row].tolist() for row in rows] if "embeddings" in include else None,
+                "documents": [payload[row][0] for row in rows] if "documents" in include else None,
+                "metadatas": [payload[row][1] for row in rows] if "metadatas" in include else None,
+            }
+
+    def _search(self, queries: np.ndarray, k: int, where: Optional[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k (rows, similarities) per query; rows are -1 where fewer than k match"""
+        candidates = None
+        if where:
+            candidates = np.asarray(self._select_rows(None, where), dtype=np.int64)
+            k = min(k, len(candidates))
+        else:
+            k = min(k, len(self._id_to_row))
+        if k == 0:
+            return np.empty((len(queries), 0), dtype=np.int64), np.empty((len(queries), 0), dtype=np.float32)
+
+        if self._index is not None and (candidates is None or len(candidates) > FLAT_FILTER_LIMIT):
+            self._index.set_ef(max(HNSW_EF_SEARCH, k))
+            try:
+                if candidates is None:
+                    labels, distances = self._index.knn_query(queries, k=k)
+                else:
+                    allowed = set(candidates.tolist())
+                    labels, distances = self._index.knn_query(queries, k=k, filter=lambda label: label in allowed)
+                return labels.astype(np.int64), 1.0 - distances
+            except RuntimeError as e:
+                # hnswlib raises when the graph walk finds fewer than k elements
+                logger.warning(f"HNSW query on '{self.name}' failed, using flat scan: {str(e)}")
+
+        if candidates is None:
+            candidates = np.fromiter(self._id_to_row.values(), dtype=np.int64, count=len(self._id_to_row))
+            candidates.sort()
+            # Scanning the contiguous prefix is cheaper than gathering rows when few are free
+            if len(candidates) == self._size:
+                scores = queries @ self._matrix[:self._size].T
+                candidates = None
+            else:
+                scores = queries @ self._matrix[candidates].T
+        else:
+            scores = queries @ self._matrix[candidates].T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        rows = top if candidates is None else candidates[top]
+        return rows, top_scores
+
+    def query(self, query_embeddings, n_results: int = 10, where: Optional[Dict[str, Any]] = None,
+              include: Sequence[str] = ("metadatas", "documents", "distances")) -> Dict[str, Any]:
+        with self._lock:
+            queries = np.asarray(query_embeddings, dtype=np.float32)
+            if queries.ndim == 1:
+                queries = queries.reshape(1, -1)
+            result: Dict[str, Any] = {key: [] if key in include else None for key in ALL_INCLUDES}
+            result["ids"] = []
+            if not self.dimension:
+                for _ in range(len(queries)):
+                    result["ids"].append([])
+                    for key in include:
+                        result[key].append([])
+                return result
+            if queries.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Query dimension {queries.shape[1]} does not match collection dimensionality {self.dimension}"
+                )
+            norms = np.linalg.norm(queries, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            rows, similarities = self._search(queries / norms, n_results, where)
+
+            payload = self._load_payload(rows.ravel().tolist(), include)
+            for query_rows, query_similarities in zip(rows, similarities):
+                hits = [(int(row), float(sim)) for row, sim in zip(query_rows, query_similarities) if row >= 0]
+                result["ids"].append([self._row_to_id[row] for row, _ in hits])
+                if "distances" in include:
+                    result["distances"].append([1.0 - sim for _, sim in hits])
+                if "documents" in include:
+                    result["documents"].append([payload[row][0] for row, _ in hits])
+                if "metadatas" in include:
+                    result["metadatas"].append([payload[row][1] for row, _ in hits])
+                if "embeddings" in include:
+                    result["embeddings"].append([self._matrix[row].tolist() for row, _ in hits])
+            return result
+
+
+class LocalVectorClient:
+    """In-process replacement for chromadb.PersistentClient
+
+    Exposes the subset of the Chroma client/collection API used by this
+    project (get/create/delete collection; add, upsert, get, query, delete),
+    including ValueError for a missing collection, so callers can switch
+    backends without code changes.
+    """
+
+    def __init__(self, path: str = DEFAULT_LOCAL_VECTOR_DIRECTORY, index_mode: str = DEFAULT_INDEX_MODE):
+        self.path = path
+        self.index_mode = index_mode
+        os.makedirs(path, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(path, "vectors.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS collections (name TEXT PRIMARY KEY, metadata TEXT NOT NULL)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                collection TEXT NOT NULL,
+                id TEXT NOT NULL,
+                row INTEGER NOT NULL,
+                document TEXT,
+                metadata TEXT,
+                PRIMARY KEY (collection, id)
+            )
+            """
+        )
+        self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_items_row ON items (collection, row)")
+        for field in INDEXED_METADATA_FIELDS:
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_items_meta_{field} ON items (collection, {_json_field(field)})"
+            )
+        self._conn.commit()
+        self._collections: Dict[str, LocalVectorCollection] = {}
+        self._lock = threading.Lock()
+        atexit.register(self.persist)
+
+    def get_collection(self, name: str) -> LocalVectorCollection:
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is not None:
+                return collection
+            row = self._conn.execute("SELECT metadata FROM collections WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                raise ValueError(f"Collection {name} does not exist.")
+            collection = LocalVectorCollection(self, name, json.loads(row[0]))
+            self._collections[name] = collection
+            return collection
+
+    def create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None) -> LocalVectorCollection:
+        metadata = dict(metadata or {})
+        space = metadata.get("hnsw:space", "cosine")
+        if space != "cosine":
+            raise ValueError(f"The local vector store only supports cosine space, got {space}")
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM collections WHERE name = ?", (name,)).fetchone()
+            if exists:
+                raise ValueError(f"Collection {name} already exists.")
+            self._conn.execute(
+                "INSERT INTO collections (name, metadata) VALUES (?, ?)", (name, json.dumps(metadata))
+            )
+            self._conn.commit()
+        return self.get_collection(name)
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None) -> LocalVectorCollection:
+        try:
+            return self.get_collection(name)
+        except ValueError:
+            return self.create_collection(name, metadata)
+
+    def delete_collection(self, name: str) -> None:
+        self.get_collection(name)
+        with self._lock:
+            collection = self._collections.pop(name)
+            collection.close()
+            self._conn.execute("DELETE FROM items WHERE collection = ?", (name,))
+            self._conn.execute("DELETE FROM collections WHERE name = ?", (name,))
+            self._conn.commit()
+            for path in (collection._matrix_path, collection._index_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def list_collections(self) -> List[str]:
+        return [name for (name,) in self._conn.execute("SELECT name FROM collections ORDER BY name")]
+
+    def persist(self) -> None:
+        for collection in list(self._collections.values()):
+            try:
+                collection.persist()
+            except Exception as e:
+                logger.error(f"Failed to persist local vector collection '{collection.name}': {str(e)}")
+
+
+_clients: Dict[str, LocalVectorClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_local_vector_client(path: str) -> LocalVectorClient:
+    """One client per directory; the matrix and HNSW files must not be shared between instances"""
+    path = os.path.abspath(path)
+    with _clients_lock:
+        client = _clients.get(path)
+        if client is None:
+            client = LocalVectorClient(path)
+            _clients[path] = client
+        return client
@@ -0,0 +1,32 @@
+"""
+Local vector store: deletes keep the id map, free list and index consistent
+"""
+import tempfile
+import unittest
+
+from lpm_kernel.common.repository.local_vector_store import LocalVectorClient
+
+
+class LocalVectorCollectionDeleteTest(unittest.TestCase):
+    def setUp(self):
+        self.client = LocalVectorClient(tempfile.mkdtemp())
+        self.collection = self.client.create_collection("chunks", metadata={"hnsw:space": "cosine", "dimension": 2})
+        self.collection.add(ids=["5", "6"], embeddings=[[1.0, 0.0], [0.0, 1.0]], documents=["five", "six"])
+
+    def test_delete_with_duplicate_ids(self):
+        self.collection.delete(ids=["5", "5"])
+
+        self.assertEqual(self.collection.count(), 1)
+        self.assertEqual(self.collection.get(ids=["5", "6"])["ids"], ["6"])
+        # the freed row is reused exactly once
+        self.collection.add(ids=["7", "8"], embeddings=[[1.0, 0.0], [0.5, 0.5]], documents=["seven", "eight"])
+        self.assertEqual(sorted(self.collection.get()["ids"]), ["6", "7", "8"])
+        result = self.collection.query(query_embeddings=[[1.0, 0.0]], n_results=1)
+        self.assertEqual(result["ids"], [["7"]])
+
+    def test_get_with_duplicate_ids_returns_each_once(self):
+        self.assertEqual(self.collection.get(ids=["6", "6", "5"])["ids"], ["6", "5"])
+
+
+if __name__ == "__main__":
+    unittest.main()
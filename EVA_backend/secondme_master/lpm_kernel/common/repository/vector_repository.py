@@ -1,7 +1,4 @@
-import chromadb
-from chromadb.config import Settings
-from chromadb.errors import IDAlreadyExistsError
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 
@@ -20,12 +17,34 @@ class BaseVectorRepository(ABC):
         pass
 
     @abstractmethod
-    def search(self, query_vector: List[float], limit: int = 5) -> List[VectorDocument]:
+    def upsert(self, documents: List[VectorDocument]) -> None:
+        pass
+
+    @abstractmethod
+    def search(
+        self, query_vector: List[float], limit: int = 5, where: Optional[Dict[str, Any]] = None
+    ) -> List[VectorDocument]:
+        pass
+
+    @abstractmethod
+    def search_batch(
+        self, query_vectors: List[List[float]], limit: int = 5, where: Optional[Dict[str, Any]] = None
+    ) -> List[List[VectorDocument]]:
+        pass
+
+    @abstractmethod
+    def get_by_ids(self, ids: List[str]) -> List[VectorDocument]:
+        pass
+
+    @abstractmethod
+    def delete(self, ids: List[str]) -> None:
         pass
 
 
 class ChromaRepository(BaseVectorRepository):
     def __init__(self, collection_name: str, persist_directory: str = "./chroma_db"):
+        import chromadb
+
         self.client = chromadb.PersistentClient(path=persist_directory)
 
         # Check if collection exists, create it if it doesn't
@@ -58,27 +77,55 @@ class ChromaRepository(BaseVectorRepository):
             # Let ChromaDB handle embedding generation
             self.collection.add(ids=ids, documents=texts, metadatas=metadatas)
 
-    def search(self, query_vector: List[float], limit: int = 5) -> List[VectorDocument]:
+    def upsert(self, documents: List[VectorDocument]) -> None:
+        """
+        Add documents, replacing those whose ids already exist
+        """
+        if not documents:
+            return
+
+        self.collection.upsert(
+            ids=[doc.id for doc in documents],
+            documents=[doc.text for doc in documents],
+            metadatas=[doc.metadata for doc in documents],
+            embeddings=[doc.embedding for doc in documents],
+        )
+
+    def search(
+        self, query_vector: List[float], limit: int = 5, where: Optional[Dict[str, Any]] = None
+    ) -> List[VectorDocument]:
         """
         Search similar documents using a query vector
         """
+        return self.search_batch([query_vector], limit, where)[0]
+
+    def search_batch(
+        self, query_vectors: List[List[float]], limit: int = 5, where: Optional[Dict[str, Any]] = None
+    ) -> List[List[VectorDocument]]:
+        """
+        Search similar documents for several query vectors in one call
+        """
         results = self.collection.query(
-            query_embeddings=[query_vector],
+            query_embeddings=query_vectors,
             n_results=limit,
+            where=where,
             include=["documents", "metadatas", "distances"],
         )
 
-        documents = []
-        for i in range(len(results["ids"][0])):
-            doc = VectorDocument(
-                id=results["ids"][0][i],
-                text=results["documents"][0][i],
-                metadata=results["metadatas"][0][i],
-                embedding=None,  # ChromaDB doesn't return embeddings in search results
-            )
-            documents.append(doc)
-
-        return documents
+        batch = []
+        for q in range(len(results["ids"])):
+            documents = []
+            for i in range(len(results["ids"][q])):
+                doc = VectorDocument(
+                    id=results["ids"][q][i],
+                    text=results["documents"][q][i],
+                    metadata=results["metadatas"][q][i],
+                    embedding=None,  # ChromaDB doesn't return embeddings in search results
+                )
+                documents.append(doc)
+            batch.append(documents)
+
+        return batch
 
     def get_by_ids(self, ids: List[str]) -> List[VectorDocument]:
         """
@@ -103,3 +150,21 @@ class ChromaRepository(BaseVectorRepository):
         Delete documents by their IDs
         """
         self.collection.delete(ids=ids)
+
+
+class LocalVectorRepository(ChromaRepository):
+    """
+    In-process vector store (memory-mapped matrix + SQLite, optional HNSW)
+
+    Same operations as ChromaRepository, backed by LocalVectorClient to avoid
+    Chroma's startup cost on single-user deployments. Embeddings must be
+    provided by the caller.
+    """
+
+    def __init__(self, collection_name: str, persist_directory: str):
+        from .local_vector_store import get_local_vector_client
+
+        self.client = get_local_vector_client(persist_directory)
+        self.collection = self.client.get_or_create_collection(
+            name=collection_name, metadata={"hnsw:space": "cosine"}
+        )
@@ -1,9 +1,21 @@
 # lpm_kernel/common/repository/vector_store_factory.py
 
+import os
 from typing import Optional
-from .vector_repository import ChromaRepository, BaseVectorRepository
+from .vector_repository import ChromaRepository, LocalVectorRepository, BaseVectorRepository
+from .local_vector_store import get_local_vector_client
 from lpm_kernel.configs.config import Config
 
+# "chroma" (default) or "local" (in-process memory-mapped store, see local_vector_store)
+VECTOR_STORE_BACKENDS = ("chroma", "local")
+
+
+def get_vector_store_backend() -> str:
+    backend = os.getenv("VECTOR_STORE_BACKEND", "chroma").lower()
+    if backend not in VECTOR_STORE_BACKENDS:
+        raise ValueError(f"Unknown VECTOR_STORE_BACKEND: {backend}")
+    return backend
+
 
 class VectorStoreFactory:
     _instance: Optional[BaseVectorRepository] = None
@@ -12,8 +24,29 @@ class VectorStoreFactory:
     def get_instance(cls) -> BaseVectorRepository:
         if cls._instance is None:
             config = Config.from_env()
-            cls._instance = ChromaRepository(
-                collection_name=config.CHROMA_COLLECTION_NAME,
-                persist_directory=config.CHROMA_PERSIST_DIRECTORY,
-            )
+            if get_vector_store_backend() == "local":
+                cls._instance = LocalVectorRepository(
+                    collection_name=config.CHROMA_COLLECTION_NAME,
+                    persist_directory=config.LOCAL_VECTOR_STORE_DIRECTORY,
+                )
+            else:
+                cls._instance = ChromaRepository(
+                    collection_name=config.CHROMA_COLLECTION_NAME,
+                    persist_directory=config.CHROMA_PERSIST_DIRECTORY,
+                )
         return cls._instance
+
+    @staticmethod
+    def create_client():
+        """Collection-level client for the configured backend
+
+        Returns a chromadb.PersistentClient or a LocalVectorClient; both expose
+        get_collection/create_collection/delete_collection with the same semantics.
+        The directory comes from Config, the same one get_instance uses.
+        """
+        config = Config.from_env()
+        if get_vector_store_backend() == "local":
+            return get_local_vector_client(config.LOCAL_VECTOR_STORE_DIRECTORY)
+        import chromadb
+
+        return chromadb.PersistentClient(path=config.CHROMA_PERSIST_DIRECTORY)
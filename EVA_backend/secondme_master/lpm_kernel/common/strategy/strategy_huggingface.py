@@ -2,20 +2,124 @@ from sentence_transformers import SentenceTransformer
 from lpm_kernel.api.dto.user_llm_config_dto import (
     UserLLMConfigDTO,
 )
-from typing import Optional
+from lpm_kernel.configs.logging import get_train_process_logger
+from typing import Dict, Optional, Tuple
 import os
+import threading
+import time
 os.environ["HF_ENDPOINT"] = "https://hf-mirror.com"
+logger = get_train_process_logger()
 
-def huggingface_strategy(user_llm_config: Optional[UserLLMConfigDTO], chunked_texts):
+# Encoding options, overridable through environment variables
+DEFAULT_BATCH_SIZE = int(os.getenv("HF_EMBEDDING_BATCH_SIZE", "32"))
+DEFAULT_NORMALIZE = os.getenv("HF_EMBEDDING_NORMALIZE", "false").lower() in ("1", "true", "yes")
+# "torch" (default), "onnx" (requires sentence-transformers[onnx]) or "int8" (dynamic quantization on CPU)
+DEFAULT_BACKEND = os.getenv("HF_EMBEDDING_BACKEND", "torch").lower()
+SUPPORTED_BACKENDS = ("torch", "onnx", "int8")
+
+
+class SentenceTransformerRegistry:
+    """Process-wide cache of loaded SentenceTransformer models
+
+    Models are keyed by (model name, backend) and stay resident once loaded.
+    Loading takes a per-key lock, so concurrent callers wait for a single load
+    of the same model while other models can load in parallel.
+    """
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, str], SentenceTransformer] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    def get(self, model_name: str, backend: str = DEFAULT_BACKEND) -> SentenceTransformer:
+        key = (model_name, backend)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            model = self._models.get(key)
+            if model is None:
+                start = time.perf_counter()
+                model = self._load(model_name, backend)
+                self._models[key] = model
+                logger.info(
+                    f"Loaded embedding model {model_name} (backend={backend}) "
+                    f"in {time.perf_counter() - start:.2f}s"
+                )
+        return model
+
+    def _load(self, model_name: str, backend: str) -> SentenceTransformer:
+        if backend not in SUPPORTED_BACKENDS:
+            logger.warning(f"Unknown embedding backend {backend}, falling back to torch")
+            backend = "torch"
+
+        if backend == "onnx":
+            try:
+                return SentenceTransformer(model_name, backend="onnx")
+            except Exception as e:
+                logger.warning(f"ONNX backend unavailable for {model_name}, falling back to torch: {str(e)}")
+            return SentenceTransformer(model_name)
+
+        if backend == "int8":
+            model = SentenceTransformer(model_name, device="cpu")
+            try:
+                import torch
+                return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            except Exception as e:
+                logger.warning(f"int8 quantization failed for {model_name}, using fp32 weights: {str(e)}")
+                return model
+
+        return SentenceTransformer(model_name)
+
+    def is_loaded(self, model_name: str, backend: str = DEFAULT_BACKEND) -> bool:
+        return (model_name, backend) in self._models
+
+    def clear(self):
+        """Drop all cached models (mainly for tests and benchmarks)"""
+        with self._lock:
+            self._models.clear()
+            self._key_locks.clear()
+
+
+model_registry = SentenceTransformerRegistry()
+
+
+def resolve_model_name(user_llm_config: Optional[UserLLMConfigDTO]) -> str:
     parts = user_llm_config.embedding_endpoint.strip("/").split("/")
     if len(parts) >= 2:
-        model_name = "/".join(parts[-2:])
-    else:
-        raise ValueError("Endpoint error")
+        return "/".join(parts[-2:])
+    raise ValueError("Endpoint error")
+
+
+def huggingface_strategy(user_llm_config: Optional[UserLLMConfigDTO], chunked_texts,
+                         batch_size: int = DEFAULT_BATCH_SIZE, normalize: bool = DEFAULT_NORMALIZE):
+    model_name = resolve_model_name(user_llm_config)
 
     try:
-        model = SentenceTransformer(model_name)
-        embeddings = model.encode(chunked_texts)
+        model = model_registry.get(model_name)
+        embeddings = model.encode(
+            chunked_texts,
+            batch_size=batch_size,
+            normalize_embeddings=normalize,
+        )
         return embeddings
     except Exception as e:
-        raise Exception(f"Failed to get embeddings: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Failed to get embeddings: {str(e)}")
+
+
+def warm_up(user_llm_config: Optional[UserLLMConfigDTO]) -> bool:
+    """Load the configured model and run one encode so the first query pays no load cost
+
+    Returns False when the configuration does not use a Hugging Face model.
+    """
+    if not user_llm_config or not user_llm_config.embedding_endpoint \
+            or "sentence-transformers" not in user_llm_config.embedding_endpoint:
+        return False
+    model_name = resolve_model_name(user_llm_config)
+    start = time.perf_counter()
+    model_registry.get(model_name).encode(["warm up"], batch_size=1)
+    logger.info(f"Embedding model {model_name} warmed up in {time.perf_counter() - start:.2f}s")
+    return True
@@ -1,4 +1,10 @@
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from lpm_kernel.api.dto.user_llm_config_dto import (
     UserLLMConfigDTO,
@@ -6,30 +12,192 @@ from lpm_kernel.api.dto.user_llm_config_dto import (
 from lpm_kernel.configs.logging import get_train_process_logger
 logger = get_train_process_logger()
 import requests
+from requests.adapters import HTTPAdapter
 
-def openai_strategy(user_llm_config: Optional[UserLLMConfigDTO], chunked_texts):
-    try:
-        headers = {
-            "Authorization": f"Bearer {user_llm_config.embedding_api_key}",
+# Batch limits, overridable through environment variables
+DEFAULT_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "32000"))
+DEFAULT_BATCH_MAX_ITEMS = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", "256"))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+DEFAULT_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "3"))
+DEFAULT_REQUEST_TIMEOUT = float(os.getenv("EMBEDDING_REQUEST_TIMEOUT", "60"))
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 10.0
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with cl100k_base; fall back to one token per character if unavailable"""
+    global _tokenizer
+    if _tokenizer is None:
+        with _tokenizer_lock:
+            if _tokenizer is None:
+                try:
+                    import tiktoken
+                    _tokenizer = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    logger.warning(f"tiktoken unavailable, estimating tokens by length: {str(e)}")
+                    _tokenizer = False
+    if _tokenizer is False:
+        return len(text)
+    return len(_tokenizer.encode(text, disallowed_special=()))
+
+
+def make_batches(texts: List[str], max_tokens: int, max_items: int) -> List[Tuple[int, int]]:
+    """Split texts into consecutive [start, end) batches within the token and item budgets
+
+    A single text larger than the token budget gets a batch of its own.
+    """
+    batches = []
+    start = 0
+    tokens = 0
+    for i, text in enumerate(texts):
+        text_tokens = count_tokens(text)
+        if i > start and (tokens + text_tokens > max_tokens or i - start >= max_items):
+            batches.append((start, i))
+            start = i
+            tokens = 0
+        tokens += text_tokens
+    if start < len(texts):
+        batches.append((start, len(texts)))
+    return batches
+
+
+class OpenAIEmbeddingClient:
+    """Client for OpenAI-compatible /embeddings endpoints
+
+    Input is split into token-budgeted batches which are sent concurrently over
+    a pooled requests.Session with bounded parallelism. Each batch is retried
+    with exponential backoff, and results are written in order into one
+    preallocated float32 array.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        api_key: str,
+        model_name: str,
+        max_tokens: int = DEFAULT_BATCH_MAX_TOKENS,
+        max_items: int = DEFAULT_BATCH_MAX_ITEMS,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    ):
+        self.url = f"{endpoint}/embeddings"
+        self.model_name = model_name
+        self.max_tokens = max_tokens
+        self.max_items = max_items
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
-        }
+        })
 
-        data = {"input": chunked_texts, "model": user_llm_config.embedding_model_name}
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
 
-        logger.info(f"Getting embedding for {data}, total chunks: {len(chunked_texts)}")
+        batches = make_batches(texts, self.max_tokens, self.max_items)
+        logger.info(f"Getting embeddings for {len(texts)} chunks in {len(batches)} batches")
 
-        response = requests.post(
-            f"{user_llm_config.embedding_endpoint}/embeddings", headers=headers, json=data
-        )
-        response.raise_for_status()
-        result = response.json()
+        result: Optional[np.ndarray] = None
+        result_lock = threading.Lock()
 
-        # Extract embedding vectors
-        embeddings = [item["embedding"] for item in result["data"]]
-        embeddings_array = np.array(embeddings)
+        def run_batch(batch: Tuple[int, int]):
+            nonlocal result
+            start, end = batch
+            vectors = self._request_with_retry(texts[start:end])
+            with result_lock:
+                if result is None:
+                    result = np.empty((len(texts), len(vectors[0])), dtype=np.float32)
+            result[start:end] = vectors
 
-        return embeddings_array
+        if len(batches) == 1:
+            run_batch(batches[0])
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                # list() re-raises the first batch failure after all batches finish
+                list(executor.map(run_batch, batches))
+        return result
+
+    def _request_with_retry(self, batch_texts: List[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(
+                    self.url,
+                    json={"input": batch_texts, "model": self.model_name},
+                    timeout=self.timeout,
+                )
+                if response.status_code in RETRYABLE_STATUS_CODES and attempt < self.max_retries:
+                    delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                    logger.warning(
+                        f"Embedding batch got HTTP {response.status_code}, "
+                        f"retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})"
+                    )
+                else:
+                    response.raise_for_status()
+                    data = sorted(response.json()["data"], key=lambda item: item.get("index", 0))
+                    if len(data) != len(batch_texts):
+                        raise ValueError(f"Expected {len(batch_texts)} embeddings, got {len(data)}")
+                    return [item["embedding"] for item in data]
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(
+                    f"Embedding batch failed: {str(e)}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})"
+                )
+            time.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), RETRY_MAX_DELAY)
+            except ValueError:
+                pass
+        delay = min(RETRY_BASE_DELAY * (2 ** attempt), RETRY_MAX_DELAY)
+        return delay * random.uniform(0.5, 1.0)
+
+    def close(self):
+        self.session.close()
+
+
+_clients: Dict[Tuple[str, str, str], OpenAIEmbeddingClient] = {}
+_clients_lock = threading.Lock()
 
-    except requests.exceptions.RequestException as e:
-        raise Exception(f"Failed to get embeddings: {str(e)}", exc_info=True)
 
+def get_embedding_client(user_llm_config: UserLLMConfigDTO) -> OpenAIEmbeddingClient:
+    """Reuse one client (and its connection pool) per endpoint, key and model"""
+    key = (
+        user_llm_config.embedding_endpoint,
+        hashlib.sha256((user_llm_config.embedding_api_key or "").encode()).hexdigest(),
+        user_llm_config.embedding_model_name,
+    )
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = OpenAIEmbeddingClient(
+                user_llm_config.embedding_endpoint,
+                user_llm_config.embedding_api_key,
+                user_llm_config.embedding_model_name,
+            )
+            _clients[key] = client
+        return client
+
+
+def openai_strategy(user_llm_config: Optional[UserLLMConfigDTO], chunked_texts):
+    try:
+        return get_embedding_client(user_llm_config).embed(chunked_texts)
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"Failed to get embeddings: {str(e)}") from e
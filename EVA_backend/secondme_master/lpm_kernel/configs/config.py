@@ -1,5 +1,5 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict
 from dotenv import load_dotenv
@@ -12,12 +12,17 @@ class DatabaseConfig:
     db_file: str
     pool_size: int = 5
     pool_recycle: int = 3600
+    # SQLite tuning profile (performance, safe or none) and per-pragma overrides
+    sqlite_profile: str = "performance"
+    sqlite_pragmas: Dict = field(default_factory=dict)
 
     def to_dict(self) -> Dict:
         return {
             "db_file": self.db_file,
             "maxsize": self.pool_size,
             "pool_recycle": self.pool_recycle,
+            "sqlite_profile": self.sqlite_profile,
+            "sqlite_pragmas": self.sqlite_pragmas,
         }
 
 
@@ -71,6 +76,12 @@ class Config:
                 db_file=os.getenv("DB_FILE", "data/sqlite/lpm.db"),
                 pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
                 pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "3600")),
+                sqlite_profile=os.getenv("DB_SQLITE_PROFILE", "performance").lower(),
+                sqlite_pragmas={
+                    pragma: os.getenv(f"DB_SQLITE_{pragma.upper()}")
+                    for pragma in ("synchronous", "cache_size", "mmap_size", "busy_timeout")
+                    if os.getenv(f"DB_SQLITE_{pragma.upper()}")
+                },
             ),
         )
 
@@ -89,6 +100,10 @@ class Config:
         instance.CHROMA_COLLECTION_NAME = os.getenv(
             "CHROMA_COLLECTION_NAME", "documents"
         )
+        instance.VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "chroma")
+        instance.LOCAL_VECTOR_STORE_DIRECTORY = os.getenv(
+            "LOCAL_VECTOR_STORE_DIRECTORY", os.path.join(base_dir, "data/local_vector_db")
+        )
 
         # Service URLs
         local_app_port = os.getenv("LOCAL_APP_PORT")
@@ -1,6 +1,4 @@
 from typing import Optional, Dict, Any, List, Tuple
-import os
-import chromadb
 import logging
 from lpm_kernel.configs.logging import get_train_process_logger
 
@@ -72,8 +70,9 @@ def reinitialize_chroma_collections(dimension: int = 1536) -> bool:
         True if successful, False otherwise
     """
     try:
-        chroma_path = os.getenv("CHROMA_PERSIST_DIRECTORY", "./data/chroma_db")
-        client = chromadb.PersistentClient(path=chroma_path)
+        from lpm_kernel.common.repository.vector_store_factory import VectorStoreFactory
+
+        client = VectorStoreFactory.create_client()
         
         # Delete and recreate document collection
         try:
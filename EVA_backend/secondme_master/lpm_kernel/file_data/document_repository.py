@@ -1,11 +1,12 @@
-from typing import List, Optional, Dict
-from sqlalchemy import select
+from typing import Any, List, Optional, Dict, Sequence, Tuple
+from sqlalchemy import delete, insert, select
 from lpm_kernel.common.repository.base_repository import BaseRepository
 from lpm_kernel.file_data.document import Document
 from lpm_kernel.file_data.process_status import ProcessStatus
 from lpm_kernel.file_data.document_dto import DocumentDTO
 from lpm_kernel.file_data.models import ChunkModel, DocumentModel
 from .dto.chunk_dto import ChunkDTO
+from .keyword_index import get_chunk_keyword_index
 import logging
 
 logger = logging.getLogger(__name__)
@@ -60,13 +61,117 @@ class DocumentRepository(BaseRepository[Document]):
                 for chunk in chunks
             ]
 
+    def find_chunks_by_documents(self, document_ids: Sequence[int]) -> Dict[int, List[ChunkDTO]]:
+        """search the chunks of many documents with one query, grouped by document id"""
+        chunks_by_document: Dict[int, List[ChunkDTO]] = {document_id: [] for document_id in document_ids}
+        if not chunks_by_document:
+            return chunks_by_document
+        with self._db.session() as session:
+            chunks = (
+                session.query(ChunkModel)
+                .filter(ChunkModel.document_id.in_(list(chunks_by_document)))
+                .order_by(ChunkModel.document_id, ChunkModel.id)
+                .all()
+            )
+            for chunk in chunks:
+                chunks_by_document[chunk.document_id].append(chunk.to_dto())
+        return chunks_by_document
+
     def save_chunk(self, chunk: ChunkModel) -> ChunkModel:
         """save chunk"""
         with self._db.session() as session:
             session.add(chunk)
             session.flush()  # get auto-gen ID
             session.refresh(chunk)
-            return chunk
+            indexed = (chunk.id, chunk.document_id, chunk.content)
+        self._index_chunks([indexed])
+        return chunk
+
+    def save_chunks_bulk(
+        self, document_id: int, chunks: Sequence[Dict[str, Any]], replace: bool = False
+    ) -> List[int]:
+        """insert many chunks of one document in a single transaction
+
+        Args:
+            document_id: document the chunks belong to
+            chunks: dicts with content and optional tags/topic
+            replace: delete the document's existing chunks in the same transaction
+
+        Returns:
+            generated chunk ids, in the order of chunks
+        """
+        rows = [
+            {
+                "document_id": document_id,
+                "content": chunk["content"],
+                "tags": chunk.get("tags"),
+                "topic": chunk.get("topic"),
+                "has_embedding": False,
+            }
+            for chunk in chunks
+        ]
+        with self._db.session() as session:
+            if replace:
+                session.execute(delete(ChunkModel).where(ChunkModel.document_id == document_id))
+            chunk_ids = []
+            if rows:
+                chunk_ids = list(
+                    session.execute(
+                        insert(ChunkModel).returning(ChunkModel.id, sort_by_parameter_order=True), rows
+                    ).scalars()
+                )
+        logger.debug(f"Saved {len(chunk_ids)} chunks for document {document_id} (replace={replace})")
+
+        if replace:
+            self._unindex_document(document_id)
+        self._index_chunks(
+            [(chunk_id, document_id, row["content"]) for chunk_id, row in zip(chunk_ids, rows)]
+        )
+        return chunk_ids
+
+    def delete_chunks_by_document(self, document_id: int) -> List[int]:
+        """delete all chunks of a document in one statement, returning their ids"""
+        with self._db.session() as session:
+            chunk_ids = list(
+                session.execute(
+                    delete(ChunkModel).where(ChunkModel.document_id == document_id).returning(ChunkModel.id)
+                ).scalars()
+            )
+        self._unindex_document(document_id)
+        logger.debug(f"Deleted {len(chunk_ids)} chunks of document {document_id}")
+        return chunk_ids
+
+    def find_chunk_ids(self, document_id: int) -> List[int]:
+        """ids of the chunks of a document"""
+        with self._db.session() as session:
+            return list(
+                session.execute(select(ChunkModel.id).where(ChunkModel.document_id == document_id)).scalars()
+            )
+
+    def list_chunk_texts(self) -> List[Tuple[int, int, str]]:
+        """(chunk_id, document_id, content) of all chunks, for building the keyword index"""
+        with self._db.session() as session:
+            return [
+                (chunk_id, document_id, content)
+                for chunk_id, document_id, content in session.query(
+                    ChunkModel.id, ChunkModel.document_id, ChunkModel.content
+                )
+            ]
+
+    @staticmethod
+    def _index_chunks(chunks: List[Tuple[int, int, str]]) -> None:
+        """keep the keyword index in step with saved chunks; a failure only affects keyword search"""
+        try:
+            get_chunk_keyword_index().add_chunks(chunks)
+        except Exception as e:
+            logger.error(f"Error updating keyword index for {len(chunks)} chunks: {str(e)}")
+
+    @staticmethod
+    def _unindex_document(document_id: int) -> None:
+        try:
+            get_chunk_keyword_index().delete_document(document_id)
+        except Exception as e:
+            logger.error(f"Error removing document {document_id} from keyword index: {str(e)}")
 
     def find_one(self, document_id: int) -> Optional[DocumentDTO]:
         """search doc by id"""
@@ -91,6 +196,24 @@ class DocumentRepository(BaseRepository[Document]):
             logger.error(f"Error updating chunk embedding status: {str(e)}")
             raise
 
+    def update_chunks_embedding_status(self, chunk_ids: List[int], has_embedding: bool) -> int:
+        """update embedding status of many chunks in one UPDATE statement"""
+        if not chunk_ids:
+            return 0
+        try:
+            with self._db.session() as session:
+                updated = (
+                    session.query(ChunkModel)
+                    .filter(ChunkModel.id.in_(chunk_ids))
+                    .update({ChunkModel.has_embedding: has_embedding}, synchronize_session=False)
+                )
+                session.commit()
+                logger.debug(f"Updated embedding status for {updated} chunks")
+                return updated
+        except Exception as e:
+            logger.error(f"Error updating chunks embedding status: {str(e)}")
+            raise
+
     def find_unembedding(self) -> List[DocumentDTO]:
         """search unembedding documents according to embedding_status"""
         with self._db.session() as session:
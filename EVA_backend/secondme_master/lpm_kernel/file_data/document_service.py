@@ -14,6 +14,7 @@ from .document import Document
 from .document_repository import DocumentRepository
 from .dto.chunk_dto import ChunkDTO
 from .embedding_service import EmbeddingService
+from .keyword_index import get_chunk_keyword_index
 from .process_factory import ProcessorFactory
 from .process_status import ProcessStatus
 
@@ -193,6 +194,76 @@ class DocumentService:
         except Exception as e:
             logger.error(f"Error updating document analyze status: {str(e)}")
 
+    def generate_document_chunk_embeddings(self, document_id: int) -> List[ChunkDTO]:
+        """
+        generate embeddings for all chunks of a document
+        Args:
+            document_id (int): doc ID
+        Returns:
+            List[ChunkDTO]: processed chunks
+        """
+        chunks = self._repository.find_chunks(document_id)
+        if not chunks:
+            logger.info(f"No chunks found for document {document_id}")
+            return []
+
+        pending_ids = {c.id for c in chunks if not c.has_embedding}
+        processed_chunks = self.embedding_service.generate_chunk_embeddings(chunks)
+
+        # persist the new status with one UPDATE instead of one write per chunk
+        embedded_ids = [c.id for c in processed_chunks if c.id in pending_ids and c.has_embedding]
+        self._repository.update_chunks_embedding_status(embedded_ids, True)
+        logger.info(
+            f"Generated embeddings for {len(embedded_ids)}/{len(pending_ids)} chunks of document {document_id}"
+        )
+        return processed_chunks
+
+    def get_chunks_by_documents(self, document_ids: List[int]) -> Dict[int, List[ChunkDTO]]:
+        """
+        get the chunks of many documents with one query
+        Args:
+            document_ids (List[int]): doc IDs
+        Returns:
+            Dict[int, List[ChunkDTO]]: doc ID -> chunks, ordered by chunk ID
+        """
+        return self._repository.find_chunks_by_documents(document_ids)
+
+    def get_document_embeddings(self, document_ids: List[int]) -> Dict[int, List[float]]:
+        """doc ID -> document embedding, one vector store read"""
+        return self.embedding_service.get_document_embeddings(document_ids)
+
+    def get_chunk_embeddings(self, chunk_ids: List[int]) -> Dict[int, List[float]]:
+        """chunk ID -> chunk embedding, one vector store read"""
+        return self.embedding_service.get_chunk_embeddings(chunk_ids)
+
+    def save_chunks_bulk(self, document_id: int, chunks: List[Dict], replace: bool = False) -> List[int]:
+        """
+        save many chunks of a document in one transaction
+        Args:
+            document_id (int): doc ID
+            chunks (List[Dict]): chunks with content and optional tags/topic
+            replace (bool): replace the document's existing chunks (and their embeddings)
+        Returns:
+            List[int]: generated chunk ids, in input order
+        """
+        old_chunk_ids = self._repository.find_chunk_ids(document_id) if replace else []
+        chunk_ids = self._repository.save_chunks_bulk(document_id, chunks, replace=replace)
+        self.embedding_service.delete_chunk_embeddings(old_chunk_ids)
+        return chunk_ids
+
+    def delete_chunks_by_document(self, document_id: int) -> int:
+        """
+        delete all chunks of a document, with their embeddings and keyword index entries
+        Args:
+            document_id (int): doc ID
+        Returns:
+            int: number of deleted chunks
+        """
+        chunk_ids = self._repository.delete_chunks_by_document(document_id)
+        self.embedding_service.delete_chunk_embeddings(chunk_ids)
+        logger.info(f"Deleted {len(chunk_ids)} chunks of document {document_id}")
+        return len(chunk_ids)
+
     def check_all_documents_embeding_status(self) -> bool:
         """
         Check if there are any documents that need embedding
@@ -297,13 +368,19 @@ class DocumentService:
                     session.commit()
                     logger.info(f"Deleted document record from database, ID: {document_id}")
             
+            # remove the chunks from the keyword index
+            try:
+                get_chunk_keyword_index().delete_document(document_id)
+            except Exception as e:
+                logger.error(f"Error deleting chunks from keyword index: {str(e)}")
+
             # 8. delete physical file
             if os.path.exists(file_path):
                 os.remove(file_path)
                 logger.info(f"Deleted physical file: {file_path}")
-            
+
             return True
-            
+
         except Exception as e:
             logger.error(f"Error deleting file: {str(e)}", exc_info=True)
             raise 
\ No newline at end of file
@@ -1,23 +1,28 @@
 from typing import List, Tuple
-import chromadb
-from chromadb.utils import embedding_functions
 import os
 from .dto.chunk_dto import ChunkDTO
-from lpm_kernel.common.llm import LLMClient
 from lpm_kernel.file_data.document_dto import DocumentDTO
 from typing import List, Dict, Optional
 from lpm_kernel.configs.logging import get_train_process_logger
 logger = get_train_process_logger()
 
+# Chroma turns get(ids=...) into a SQLite IN (...) with one bound variable per id
+ID_BATCH_SIZE = int(os.getenv("VECTOR_STORE_ID_BATCH_SIZE", "5000"))
+
 
 class EmbeddingService:
     def __init__(self):
         from lpm_kernel.file_data.chroma_utils import detect_embedding_model_dimension
         from lpm_kernel.api.services.user_llm_config_service import UserLLMConfigService
+        from lpm_kernel.common.llm import LLMClient
         
-        chroma_path = os.getenv("CHROMA_PERSIST_DIRECTORY", "./data/chroma_db")
-        self.client = chromadb.PersistentClient(path=chroma_path)
+        from lpm_kernel.common.repository.vector_store_factory import VectorStoreFactory
+
+        # chromadb.PersistentClient or the in-process LocalVectorClient (VECTOR_STORE_BACKEND=local)
+        self.client = VectorStoreFactory.create_client()
         self.llm_client = LLMClient()
+        # "batch": one id-only read-back after each add; "off": trust the add (production)
+        self.verify_mode = os.getenv("EMBEDDING_VERIFY_MODE", "batch").lower()
         
         # Get embedding model dimension from user config
         try:
@@ -137,10 +142,7 @@ class EmbeddingService:
                 logger.info(f"Successfully stored embedding for document {document.id}")
 
                 # verify embedding storage
-                result = self.document_collection.get(
-                    ids=[str(document.id)], include=["embeddings"]
-                )
-                if not result or not result["embeddings"]:
+                if str(document.id) not in self._verify_stored(self.document_collection, [str(document.id)]):
                     logger.error(
                         f"Failed to verify embedding storage for document {document.id}"
                     )
@@ -209,18 +211,18 @@ class EmbeddingService:
                 logger.info("Successfully added embeddings to ChromaDB")
 
                 # verify embeddings storage
+                stored_ids = self._verify_stored(
+                    self.chunk_collection, [str(c.id) for c in unprocessed_chunks]
+                )
+                missing = []
                 for chunk in unprocessed_chunks:
-                    result = self.chunk_collection.get(
-                        ids=[str(chunk.id)], include=["embeddings"]
-                    )
-                    if result and result["embeddings"]:
-                        chunk.has_embedding = True
-                        logger.info(f"Verified embedding for chunk {chunk.id}")
-                    else:
-                        logger.warning(
-                            f"Failed to verify embedding for chunk {chunk.id}"
-                        )
-                        chunk.has_embedding = False
+                    chunk.has_embedding = str(chunk.id) in stored_ids
+                    if not chunk.has_embedding:
+                        missing.append(chunk.id)
+                if missing:
+                    logger.warning(f"Failed to verify embedding for chunks {missing}")
+                else:
+                    logger.info(f"Verified embeddings for {len(unprocessed_chunks)} chunks")
 
             except Exception as e:
                 logger.error(f"Error storing embeddings in ChromaDB: {str(e)}", exc_info=True)
@@ -234,6 +236,17 @@ class EmbeddingService:
             logger.error(f"Error processing chunk embeddings: {str(e)}", exc_info=True)
             raise
 
+    def _verify_stored(self, collection, ids: List[str]) -> set:
+        """Return the subset of ids present in the collection
+
+        Uses a single get without payload (include=[]), so only ids come back.
+        With EMBEDDING_VERIFY_MODE=off the add is trusted and all ids are returned.
+        """
+        if self.verify_mode == "off":
+            return set(ids)
+        result = collection.get(ids=ids, include=[])
+        return set(result["ids"]) if result and result.get("ids") else set()
+
     def get_chunk_embedding_by_chunk_id(self, chunk_id: int) -> Optional[List[float]]:
         """Get the corresponding embedding vector by chunk_id
 
@@ -302,6 +315,64 @@ class EmbeddingService:
             )
             raise
 
+    def get_document_embeddings(self, document_ids: List[int]) -> Dict[int, List[float]]:
+        """Get the embeddings of many documents with one collection read per ID_BATCH_SIZE ids
+
+        Args:
+            document_ids (List[int]): document IDs
+
+        Returns:
+            Dict[int, List[float]]: document_id -> embedding, documents without one are left out
+        """
+        return self._get_embeddings(self.document_collection, document_ids)
+
+    def get_chunk_embeddings(self, chunk_ids: List[int]) -> Dict[int, List[float]]:
+        """Get the embeddings of many chunks with one collection read per ID_BATCH_SIZE ids
+
+        Args:
+            chunk_ids (List[int]): chunk IDs
+
+        Returns:
+            Dict[int, List[float]]: chunk_id -> embedding, chunks without one are left out
+        """
+        return self._get_embeddings(self.chunk_collection, chunk_ids)
+
+    def delete_chunk_embeddings(self, chunk_ids: List[int]) -> None:
+        """Delete the embeddings of many chunks with one collection call per ID_BATCH_SIZE ids
+
+        Failures are logged rather than raised: the chunk rows are already gone,
+        and a leftover embedding is only wasted space.
+
+        Args:
+            chunk_ids (List[int]): chunk IDs
+        """
+        for start in range(0, len(chunk_ids), ID_BATCH_SIZE):
+            batch = chunk_ids[start:start + ID_BATCH_SIZE]
+            try:
+                self.chunk_collection.delete(ids=[str(chunk_id) for chunk_id in batch])
+            except Exception as e:
+                logger.error(f"Error deleting {len(batch)} chunk embeddings: {str(e)}")
+
+    @staticmethod
+    def _get_embeddings(collection, ids: List[int]) -> Dict[int, List[float]]:
+        embeddings: Dict[int, List[float]] = {}
+        for start in range(0, len(ids), ID_BATCH_SIZE):
+            batch = ids[start:start + ID_BATCH_SIZE]
+            try:
+                result = collection.get(ids=[str(i) for i in batch], include=["embeddings"])
+            except Exception as e:
+                logger.error(f"Error getting {len(batch)} embeddings: {str(e)}")
+                raise
+            if not result or result.get("embeddings") is None:
+                continue
+            # results are not guaranteed to follow the requested order
+            embeddings.update(
+                (int(item_id), embedding)
+                for item_id, embedding in zip(result["ids"], result["embeddings"])
+                if embedding is not None
+            )
+        return embeddings
+
     def _handle_dimension_mismatch(self):
         """
         Handle dimension mismatch between current embedding model and ChromaDB collections
@@ -342,80 +413,97 @@ class EmbeddingService:
             raise RuntimeError(f"Failed to handle dimension mismatch in ChromaDB collections: {str(e)}")
     
     def search_similar_chunks(
-        self, query: str, limit: int = 5
+        self, query: str, limit: int = 5, where: Optional[Dict] = None
     ) -> List[Tuple[ChunkDTO, float]]:
         """Search similar chunks, return list of ChunkDTO objects and their similarity scores
 
         Args:
             query (str): query text
             limit (int, optional): return result limit. Defaults to 5.
+            where (Dict, optional): metadata filter, e.g. {"document_id": "3"}
 
         Returns:
             List[Tuple[ChunkDTO, float]]: return list of (ChunkDTO, similarity score), sorted by similarity score in descending order
 
+        Raises:
+            ValueError: when query parameters are invalid
+            Exception: other errors
+        """
+        return self.search_similar_chunks_batch([query], limit, where)[0]
+
+    def search_similar_chunks_batch(
+        self, queries: List[str], limit: int = 5, where: Optional[Dict] = None
+    ) -> List[List[Tuple[ChunkDTO, float]]]:
+        """Search similar chunks for several queries with one embedding call and one ChromaDB query
+
+        Args:
+            queries (List[str]): query texts
+            limit (int, optional): return result limit per query. Defaults to 5.
+            where (Dict, optional): metadata filter applied to every query
+
+        Returns:
+            List[List[Tuple[ChunkDTO, float]]]: one list of (ChunkDTO, similarity score) per query,
+                in the order of queries, each sorted by similarity score in descending order
+
         Raises:
             ValueError: when query parameters are invalid
             Exception: other errors
         """
         try:
-            if not query or not query.strip():
+            if not queries:
+                return []
+
+            if any(not query or not query.strip() for query in queries):
                 raise ValueError("Query string cannot be empty")
 
             if limit < 1:
                 raise ValueError("Limit must be positive")
 
-            # calculate query text embedding
-            query_embedding = self.llm_client.get_embedding([query])
-            if query_embedding is None or len(query_embedding) == 0:
+            # calculate embeddings of all queries in one call
+            query_embeddings = self.llm_client.get_embedding(queries)
+            if query_embeddings is None or len(query_embeddings) != len(queries):
                 raise Exception("Failed to generate embedding for query")
 
             # query ChromaDB
             results = self.chunk_collection.query(
-                query_embeddings=[query_embedding[0].tolist()],
+                query_embeddings=[embedding.tolist() for embedding in query_embeddings],
                 n_results=limit,
+                where=where,
                 include=["documents", "metadatas", "distances"],
             )
 
             if not results or not results["ids"]:
-                return []
-
-            # convert results to ChunkDTO objects
-            similar_chunks = []
-            for i in range(len(results["ids"])):
-                chunk_id = results["ids"][0][i]  # ChromaDB returns nested lists
-                document_id = results["metadatas"][0][i]["document_id"]
-                content = results["documents"][0][i]
-                topic = results["metadatas"][0][i].get("topic", "")
-                tags = (
-                    results["metadatas"][0][i].get("tags", "").split(",")
-                    if results["metadatas"][0][i].get("tags")
-                    else []
-                )
-
-                # calculate similarity score (ChromaDB returns distances, need to convert to similarity)
-                similarity_score = (
-                    1 - results["distances"][0][i]
-                )  # assume using Euclidean distance or cosine distance
-
-                chunk = ChunkDTO(
-                    id=int(chunk_id),
-                    document_id=int(document_id),
-                    content=content,
-                    topic=topic,
-                    tags=tags,
-                    has_embedding=True,
-                )
+                return [[] for _ in queries]
+
+            # convert results to ChunkDTO objects, ChromaDB returns one nested list per query
+            batch_results = []
+            for q in range(len(queries)):
+                similar_chunks = []
+                for i in range(len(results["ids"][q])):
+                    metadata = results["metadatas"][q][i] or {}
+                    tags = metadata.get("tags", "")
+
+                    chunk = ChunkDTO(
+                        id=int(results["ids"][q][i]),
+                        document_id=int(metadata["document_id"]),
+                        content=results["documents"][q][i],
+                        topic=metadata.get("topic", ""),
+                        tags=tags.split(",") if tags else [],
+                        has_embedding=True,
+                    )
 
-                similar_chunks.append((chunk, similarity_score))
+                    # collections use cosine space, so similarity = 1 - distance
+                    similar_chunks.append((chunk, 1 - results["distances"][q][i]))
 
-            # sort by similarity score in descending order
-            similar_chunks.sort(key=lambda x: x[1], reverse=True)
+                # sort by similarity score in descending order
+                similar_chunks.sort(key=lambda x: x[1], reverse=True)
+                batch_results.append(similar_chunks)
 
-            return similar_chunks
+            return batch_results
 
         except ValueError as ve:
             logger.error(f"Invalid input parameters: {str(ve)}")
             raise
         except Exception as e:
             logger.error(f"Error searching similar chunks: {str(e)}")
-            raise
\ No newline at end of file
+            raise
@@ -0,0 +1,288 @@
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from lpm_kernel.configs.logging import get_train_process_logger
+logger = get_train_process_logger()
+
+DEFAULT_INDEX_PATH = "data/sqlite/chunk_keyword_index.db"
+# "auto" uses jieba when installed and character bigrams otherwise
+DEFAULT_TOKENIZER = os.getenv("KEYWORD_TOKENIZER", "auto").lower()
+BM25_K1 = 1.2
+BM25_B = 0.75
+# SQLite limits the number of bound parameters per statement
+SQL_BATCH_SIZE = 500
+
+# Function words dropped from queries: they match nearly every chunk and carry
+# no topic. Chunks are still indexed with them, so the list can change without a rebuild.
+STOPWORDS = frozenset(
+    """
+    a about above after again all also am an and any are as at be because been before
+    being between both but by can could did do does doing down during each few for from
+    further had has have having he her here hers him his how i if in into is it its
+    itself just like me more most my no nor not now of off on once only or other our
+    ours out over own same she should so some such than that the their theirs them then
+    there these they this those through to too under until up very was we were what
+    when where which while who whom why will with would you your yours
+    我们 你们 他们 她们 它们 咱们 自己 什么 怎么 怎样 为什么 哪里 哪儿 哪个 那个 这个
+    这些 那些 这样 那样 这里 那里 还是 或者 而且 但是 因为 所以 如果 就是 不是 没有
+    可以 一个 一下 一些 有点 的话 吗 呢 吧 啊 呀 的 了 着 过 是 在 和 与 也 都 就
+    我 你 他 她 它
+    """.split()
+)
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:[._\-:/][a-z0-9]+)*")
+_CJK_RE = re.compile(r"[㐀-䶿一-鿿豈-﫿]+")
+_TOKEN_RE = re.compile(_CJK_RE.pattern + "|" + _WORD_RE.pattern)
+
+
+def _bigram_tokenize(text: str) -> List[str]:
+    """Words/numbers as whole tokens, CJK runs as overlapping character bigrams"""
+    tokens = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        token = match.group()
+        if _CJK_RE.fullmatch(token):
+            if len(token) == 1:
+                tokens.append(token)
+            else:
+                tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def _jieba_tokenize(text: str) -> List[str]:
+    import jieba
+
+    tokens = []
+    for word in jieba.lcut_for_search(text.lower()):
+        word = word.strip()
+        if word and _TOKEN_RE.search(word):
+            tokens.append(word)
+    return tokens
+
+
+def get_tokenizer(name: str = DEFAULT_TOKENIZER) -> Tuple[str, Callable[[str], List[str]]]:
+    """Resolve the configured tokenizer to (name, function)"""
+    if name in ("auto", "jieba"):
+        try:
+            import jieba  # noqa: F401
+
+            return "jieba", _jieba_tokenize
+        except ImportError:
+            if name == "jieba":
+                logger.warning("jieba is not installed, using character bigram tokenizer")
+    return "bigram", _bigram_tokenize
+
+
+class ChunkKeywordIndex:
+    """On-disk BM25 inverted index over document chunks
+
+    Postings (term -> chunk, term frequency) and chunk lengths are kept in
+    SQLite and updated incrementally as chunks are saved or deleted. The
+    tokenizer name is stored with the index; a different tokenizer makes the
+    index stale, and it is rebuilt by ensure_built().
+    """
+
+    def __init__(self, db_path: str, tokenizer: str = DEFAULT_TOKENIZER):
+        self.db_path = db_path
+        self.tokenizer_name, self.tokenize = get_tokenizer(tokenizer)
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._built = False
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                chunk_id INTEGER PRIMARY KEY,
+                document_id INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                content TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                chunk_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, chunk_id)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_postings_chunk ON postings (chunk_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_document ON chunks (document_id)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+
+        stored_tokenizer = self._get_meta("tokenizer")
+        if stored_tokenizer is not None and stored_tokenizer != self.tokenizer_name:
+            logger.info(
+                f"Keyword index tokenizer changed from {stored_tokenizer} to {self.tokenizer_name}, index will be rebuilt"
+            )
+            self._reset()
+        self._set_meta("tokenizer", self.tokenizer_name)
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+        self._conn.commit()
+
+    def _reset(self) -> None:
+        self._conn.execute("DELETE FROM postings")
+        self._conn.execute("DELETE FROM chunks")
+        self._conn.execute("DELETE FROM meta")
+        self._conn.commit()
+
+    @property
+    def is_built(self) -> bool:
+        return self._get_meta("built") == "1"
+
+    def _delete_ids(self, chunk_ids: Sequence[int]) -> None:
+        for start in range(0, len(chunk_ids), SQL_BATCH_SIZE):
+            batch = list(chunk_ids[start:start + SQL_BATCH_SIZE])
+            placeholders = ",".join("?" * len(batch))
+            self._conn.execute(f"DELETE FROM postings WHERE chunk_id IN ({placeholders})", batch)
+            self._conn.execute(f"DELETE FROM chunks WHERE chunk_id IN ({placeholders})", batch)
+
+    def add_chunks(self, chunks: Iterable[Tuple[int, int, str]]) -> int:
+        """Index (chunk_id, document_id, content) tuples, replacing chunks already indexed"""
+        chunk_rows, posting_rows = [], []
+        for chunk_id, document_id, content in chunks:
+            tokens = self.tokenize(content or "")
+            chunk_rows.append((chunk_id, document_id, len(tokens), content or ""))
+            posting_rows.extend((term, chunk_id, tf) for term, tf in Counter(tokens).items())
+        if not chunk_rows:
+            return 0
+        with self._lock:
+            self._delete_ids([row[0] for row in chunk_rows])
+            self._conn.executemany(
+                "INSERT INTO chunks (chunk_id, document_id, length, content) VALUES (?, ?, ?, ?)", chunk_rows
+            )
+            self._conn.executemany("INSERT INTO postings (term, chunk_id, tf) VALUES (?, ?, ?)", posting_rows)
+            self._conn.commit()
+        return len(chunk_rows)
+
+    def delete_chunks(self, chunk_ids: Sequence[int]) -> None:
+        with self._lock:
+            self._delete_ids(list(chunk_ids))
+            self._conn.commit()
+
+    def delete_document(self, document_id: int) -> None:
+        with self._lock:
+            chunk_ids = [
+                row[0] for row in self._conn.execute(
+                    "SELECT chunk_id FROM chunks WHERE document_id = ?", (document_id,)
+                )
+            ]
+            self._delete_ids(chunk_ids)
+            self._conn.commit()
+        logger.debug(f"Removed {len(chunk_ids)} chunks of document {document_id} from keyword index")
+
+    def clear(self) -> None:
+        """Drop all entries; the next ensure_built() rebuilds from the stored chunks"""
+        with self._lock:
+            self._reset()
+            self._set_meta("tokenizer", self.tokenizer_name)
+            self._built = False
+
+    def rebuild(self, chunks: Iterable[Tuple[int, int, str]]) -> int:
+        """Replace the whole index with the given chunks"""
+        self.clear()
+        count = self.add_chunks(chunks)
+        self._set_meta("built", "1")
+        logger.info(f"Built keyword index over {count} chunks ({self.tokenizer_name} tokenizer)")
+        return count
+
+    def ensure_built(self, load_chunks: Callable[[], Iterable[Tuple[int, int, str]]]) -> None:
+        """Build the index from all stored chunks once; later updates are incremental"""
+        if self._built:
+            return
+        with self._build_lock:
+            if not self._built and not self.is_built:
+                self.rebuild(load_chunks())
+            self._built = True
+
+    def search(self, query: str, limit: int = 10, min_term_share: float = 0.0) -> List[Tuple[int, float]]:
+        """BM25 top chunks for query as (chunk_id, score), best first
+
+        Stopwords are dropped from the query. With min_term_share, a chunk is
+        only a hit when it contains at least that share of the remaining query
+        terms, so sharing a single word with a long query is not enough.
+        """
+        terms = [term for term in dict.fromkeys(self.tokenize(query)) if term not in STOPWORDS]
+        if not terms or limit < 1:
+            return []
+        with self._lock:
+            total, total_length = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM chunks").fetchone()
+            if not total:
+                return []
+            avg_length = total_length / total
+
+            placeholders = ",".join("?" * len(terms))
+            postings = self._conn.execute(
+                f"SELECT p.term, p.chunk_id, p.tf, c.length FROM postings p "
+                f"JOIN chunks c ON c.chunk_id = p.chunk_id WHERE p.term IN ({placeholders})",
+                terms,
+            ).fetchall()
+
+        document_frequency = Counter(term for term, _, _, _ in postings)
+        scores: Dict[int, float] = {}
+        matched_terms: Counter = Counter()
+        for term, chunk_id, tf, length in postings:
+            df = document_frequency[term]
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            norm = tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length))
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * norm
+            matched_terms[chunk_id] += 1
+
+        if min_term_share > 0:
+            scores = {
+                chunk_id: score for chunk_id, score in scores.items()
+                if matched_terms[chunk_id] >= min_term_share * len(terms)
+            }
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def get_contents(self, chunk_ids: Sequence[int]) -> Dict[int, Tuple[int, str]]:
+        """chunk_id -> (document_id, content) for indexed chunks"""
+        result = {}
+        with self._lock:
+            for start in range(0, len(chunk_ids), SQL_BATCH_SIZE):
+                batch = list(chunk_ids[start:start + SQL_BATCH_SIZE])
+                for chunk_id, document_id, content in self._conn.execute(
+                    f"SELECT chunk_id, document_id, content FROM chunks WHERE chunk_id IN ({','.join('?' * len(batch))})",
+                    batch,
+                ):
+                    result[chunk_id] = (document_id, content)
+        return result
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+
+_index: Optional[ChunkKeywordIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_chunk_keyword_index() -> ChunkKeywordIndex:
+    """Process-wide keyword index at CHUNK_KEYWORD_INDEX_PATH"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ChunkKeywordIndex(os.getenv("CHUNK_KEYWORD_INDEX_PATH", DEFAULT_INDEX_PATH))
+    return _index
@@ -1,9 +1,11 @@
 # file_data/service.py
 import logging
+from typing import List, Optional
 
 from lpm_kernel.L1.bio import Chunk
 from lpm_kernel.common.repository.database_session import DatabaseSession
 from lpm_kernel.file_data.document_repository import DocumentRepository
+from lpm_kernel.file_data.embedding_service import EmbeddingService
 from lpm_kernel.file_data.models import ChunkModel
 from lpm_kernel.models.l1 import (
     L1Version,
@@ -16,6 +18,14 @@ logger = logging.getLogger(__name__)
 class ChunkService:
     def __init__(self):
         self._repository = DocumentRepository()
+        self._embedding_service: Optional[EmbeddingService] = None
+
+    @property
+    def embedding_service(self) -> EmbeddingService:
+        # Created on first use: it opens the vector store, which most callers never need
+        if self._embedding_service is None:
+            self._embedding_service = EmbeddingService()
+        return self._embedding_service
 
     def query_topics_data(self) -> dict[str, dict]:
         topics_data = {}
@@ -76,6 +86,52 @@ class ChunkService:
             logger.error(f"Error saving chunk: {str(e)}")
             raise
 
+    def save_chunks_bulk(self, document_id: int, chunks: List[Chunk], replace: bool = False) -> List[int]:
+        """
+        Save all chunks of a document in one transaction
+        Args:
+            document_id (int): Document the chunks belong to
+            chunks (List[Chunk]): Chunks to save; their document_id and id are set
+            replace (bool): Delete the document's existing chunks (and their embeddings)
+                in the same transaction
+        Returns:
+            List[int]: Generated chunk ids, in input order
+        Raises:
+            Exception: Error when saving fails
+        """
+        try:
+            old_chunk_ids = self._repository.find_chunk_ids(document_id) if replace else []
+            chunk_ids = self._repository.save_chunks_bulk(
+                document_id,
+                [{"content": chunk.content, "tags": chunk.tags, "topic": chunk.topic} for chunk in chunks],
+                replace=replace,
+            )
+            for chunk, chunk_id in zip(chunks, chunk_ids):
+                chunk.document_id = document_id
+                chunk.id = chunk_id
+            self.embedding_service.delete_chunk_embeddings(old_chunk_ids)
+            logger.debug(f"Saved {len(chunk_ids)} chunks for document {document_id}")
+            return chunk_ids
+        except Exception as e:
+            logger.error(f"Error saving chunks for document {document_id}: {str(e)}")
+            raise
+
+    def delete_chunks_by_document(self, document_id: int) -> int:
+        """
+        Delete all chunks of a document in one transaction, with their embeddings
+        Args:
+            document_id (int): Document whose chunks are deleted
+        Returns:
+            int: Number of deleted chunks
+        """
+        try:
+            chunk_ids = self._repository.delete_chunks_by_document(document_id)
+            self.embedding_service.delete_chunk_embeddings(chunk_ids)
+            return len(chunk_ids)
+        except Exception as e:
+            logger.error(f"Error deleting chunks of document {document_id}: {str(e)}")
+            raise
+
 
 # Usage elsewhere:
 # from lpm_kernel.kernel import chunk_service
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 
@@ -20,6 +20,22 @@ from lpm_kernel.configs.logging import get_train_process_logger
 logger = get_train_process_logger()
 
 
+def load_note_sources(document_ids: List[int]) -> Tuple[Dict[int, list], Dict[int, list], Dict[int, list]]:
+    """Load everything needed to build notes for a set of documents
+
+    One SQL query for all chunks and one vector store read per collection,
+    instead of separate lookups for every document and chunk.
+
+    Returns:
+        tuple: (document_embeddings, chunks_by_document, chunk_embeddings)
+    """
+    document_embeddings = document_service.get_document_embeddings(document_ids)
+    chunks_by_document = document_service.get_chunks_by_documents(document_ids)
+    chunk_ids = [chunk.id for chunks in chunks_by_document.values() for chunk in chunks]
+    chunk_embeddings = document_service.get_chunk_embeddings(chunk_ids)
+    return document_embeddings, chunks_by_document, chunk_embeddings
+
+
 def extract_notes_from_documents(documents) -> tuple[List[Note], list]:
     """Extract Note objects and memory list from documents
 
@@ -34,21 +50,23 @@ def extract_notes_from_documents(documents) -> tuple[List[Note], list]:
     notes_list = []
     memory_list = []
 
+    document_embeddings, chunks_by_document, chunk_embeddings = load_note_sources(
+        [doc.get("id") for doc in documents]
+    )
+
     for doc in documents:
         doc_id = doc.get("id")
-        doc_embedding = document_service.get_document_embedding(doc_id)
-        chunks = document_service.get_document_chunks(doc_id)
-        all_chunk_embeddings = document_service.get_chunk_embeddings_by_document_id(
-            doc_id
-        )
+        doc_embedding = document_embeddings.get(doc_id)
+        chunks = chunks_by_document.get(doc_id)
+        embedded_chunks = [chunk for chunk in chunks or [] if chunk.id in chunk_embeddings]
 
-        if not doc_embedding:
+        if doc_embedding is None:
             logger.warning(f"Document {doc_id} missing document embedding")
             continue
         if not chunks:
             logger.warning(f"Document {doc_id} missing chunks")
             continue
-        if not all_chunk_embeddings:
+        if not embedded_chunks:
             logger.warning(f"Document {doc_id} missing chunk embeddings")
             continue
 
@@ -78,14 +96,11 @@ def extract_notes_from_documents(documents) -> tuple[List[Note], list]:
                     id=f"{chunk.id}",
                     document_id=doc_id,
                     content=chunk.content,
-                    embedding=np.array(all_chunk_embeddings.get(chunk.id))
-                    if all_chunk_embeddings.get(chunk.id)
-                    else None,
+                    embedding=np.array(chunk_embeddings[chunk.id]),
                     tags=chunk.tags if hasattr(chunk, "tags") else None,
                     topic=chunk.topic if hasattr(chunk, "topic") else None,
                 )
-                for chunk in chunks
-                if all_chunk_embeddings.get(chunk.id)
+                for chunk in embedded_chunks
             ],
             title=insight_data.get("title", ""),
             summary=summary_data.get("summary", ""),
@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from lpm_kernel.configs.logging import get_train_process_logger
+logger = get_train_process_logger()
+
+DEFAULT_INDEX_DIR = "./data/l1_shade_index"
+LATEST_POINTER = "latest.json"
+# Minimum interval between checks of the latest-version pointer
+DEFAULT_CHECK_INTERVAL = 5.0
+
+
+def shade_text(shade: Dict[str, Any]) -> str:
+    """Text embedded for a shade; must match between index build and retrieval"""
+    return f"{shade.get('title', '')} - {shade.get('description', '')}"
+
+
+class ShadeIndex:
+    """Row-normalized shade embedding matrix of one L1 version"""
+
+    def __init__(self, version: int, shades: List[Dict[str, Any]], matrix: np.ndarray):
+        self.version = version
+        self.shades = shades
+        self.matrix = matrix
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1] if self.matrix.ndim == 2 else 0
+
+    @staticmethod
+    def normalize(matrix: np.ndarray) -> np.ndarray:
+        matrix = np.asarray(matrix, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def search(self, query_embedding, top_k: int, threshold: float) -> List[Tuple[Dict[str, Any], float]]:
+        """Cosine top-k: one matrix-vector product plus argpartition"""
+        if not self.shades or top_k < 1:
+            return []
+        query = self.normalize(np.asarray(query_embedding, dtype=np.float32).reshape(-1))
+        scores = self.matrix @ query
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.shades[i], float(scores[i])) for i in top if scores[i] >= threshold]
+
+
+class ShadeIndexManager:
+    """Builds, persists and serves the shade index of the latest L1 version
+
+    Each version is stored as v<version>.npy (matrix) plus v<version>.json (shades)
+    and latest.json points at the newest one. Readers reload when the pointer
+    changes, so an index built by another process is picked up automatically.
+    """
+
+    def __init__(self, index_dir: Optional[str] = None, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.index_dir = index_dir or os.getenv("L1_SHADE_INDEX_DIR", DEFAULT_INDEX_DIR)
+        self.check_interval = check_interval
+        self._index: Optional[ShadeIndex] = None
+        self._pointer_mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+
+    def _write_atomic(self, name: str, write) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, self._path(name))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def build(self, version: int, shades: List[Dict[str, Any]], llm_client) -> ShadeIndex:
+        """Embed all shades in one call and persist the index for this version"""
+        os.makedirs(self.index_dir, exist_ok=True)
+        start = time.perf_counter()
+        if shades:
+            embeddings = llm_client.get_embedding([shade_text(shade) for shade in shades])
+            matrix = ShadeIndex.normalize(embeddings)
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        index = ShadeIndex(version, shades, matrix)
+
+        self._write_atomic(f"v{version}.npy", lambda f: np.save(f, matrix))
+        self._write_atomic(
+            f"v{version}.json",
+            lambda f: f.write(json.dumps(shades, ensure_ascii=False, default=str).encode("utf-8")),
+        )
+        self._write_atomic(LATEST_POINTER, lambda f: f.write(json.dumps({"version": version}).encode("utf-8")))
+
+        with self._lock:
+            self._index = index
+            self._pointer_mtime = os.path.getmtime(self._path(LATEST_POINTER))
+        logger.info(
+            f"Built L1 shade index v{version}: {len(shades)} shades in {time.perf_counter() - start:.2f}s"
+        )
+        return index
+
+    def _load(self) -> Optional[ShadeIndex]:
+        with open(self._path(LATEST_POINTER), "r", encoding="utf-8") as f:
+            version = json.load(f)["version"]
+        with open(self._path(f"v{version}.npy"), "rb") as f:
+            matrix = np.load(f)
+        with open(self._path(f"v{version}.json"), "r", encoding="utf-8") as f:
+            shades = json.load(f)
+        return ShadeIndex(version, shades, matrix)
+
+    def get_index(self) -> Optional[ShadeIndex]:
+        """Current index, reloaded when the latest-version pointer changes"""
+        now = time.monotonic()
+        if self._index is not None and now - self._last_check < self.check_interval:
+            return self._index
+        self._last_check = now
+        try:
+            mtime = os.path.getmtime(self._path(LATEST_POINTER))
+        except OSError:
+            return self._index
+        if mtime != self._pointer_mtime:
+            with self._lock:
+                if mtime != self._pointer_mtime:
+                    try:
+                        self._index = self._load()
+                        self._pointer_mtime = mtime
+                        logger.info(f"Loaded L1 shade index v{self._index.version}")
+                    except Exception as e:
+                        logger.error(f"Failed to load L1 shade index: {str(e)}", exc_info=True)
+        return self._index
+
+    def rebuild_from_latest(self, llm_client, version: Optional[int] = None) -> Optional[ShadeIndex]:
+        """Build the index from the latest stored global bio"""
+        from lpm_kernel.kernel.l1.l1_manager import get_latest_global_bio
+
+        global_bio = get_latest_global_bio()
+        if not global_bio:
+            return None
+        if version is None:
+            version = getattr(global_bio, "version", None) or int(time.time())
+        return self.build(version, list(global_bio.shades or []), llm_client)
+
+
+shade_index_manager = ShadeIndexManager()
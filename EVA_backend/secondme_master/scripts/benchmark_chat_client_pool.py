@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Chat Provider Client Pool Benchmark
+
+Measures per-request client overhead against a local stub OpenAI-compatible
+server: a new OpenAI client (and connection pool) per request, the way
+ChatService.chat used to work, versus the shared ProviderClientPool.
+
+The stub answers every chat completion immediately, so the difference in
+latency is the cost of client construction and connection setup.
+
+Usage:
+    python scripts/benchmark_chat_client_pool.py --requests 200
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmark_utils import skip_package_init
+
+skip_package_init()
+
+from openai import OpenAI
+from lpm_kernel.api.services.provider_client_pool import ProviderClientPool
+
+COMPLETION = json.dumps({
+    "id": "chatcmpl-stub",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "stub",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}).encode("utf-8")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one write; separate small writes stall on delayed ACKs
+    wbufsize = 1 << 16
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(COMPLETION)))
+        self.end_headers()
+        self.wfile.write(COMPLETION)
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run(name, get_client, n_requests):
+    latencies = []
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        client = get_client()
+        client.chat.completions.create(model="stub", messages=[{"role": "user", "content": "hi"}])
+        latencies.append(time.perf_counter() - start)
+    print(
+        f"{name:<7} mean={statistics.mean(latencies) * 1000:7.2f}ms "
+        f"p50={percentile(latencies, 0.5) * 1000:7.2f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:7.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-request overhead of fresh vs pooled OpenAI clients")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    # A fixed config version: the benchmark has no database to read it from
+    pool = ProviderClientPool(version_source=lambda: 0)
+
+    # Warm up imports and the server before timing
+    run("warmup", lambda: pool.get(base_url, "sk-stub", 30), 5)
+    run("fresh", lambda: OpenAI(base_url=base_url, api_key="sk-stub", timeout=30), args.requests)
+    run("pooled", lambda: pool.get(base_url, "sk-stub", 30), args.requests)
+    server.shutdown()
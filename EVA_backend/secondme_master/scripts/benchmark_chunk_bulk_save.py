@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Chunk Bulk Save Benchmark
+
+Compares saving the chunks of one document one at a time
+(DocumentRepository.save_chunk, one transaction per chunk) against
+DocumentRepository.save_chunks_bulk (one transaction), and re-chunking with
+replace=True against deleting and saving chunk by chunk. These are the
+database and keyword index writes behind ChunkService and DocumentService;
+the chunk embedding cleanup they add needs a vector store and is not timed.
+Runs on a scratch SQLite database and keyword index.
+
+Usage:
+    python scripts/benchmark_chunk_bulk_save.py --sizes 100,1000,10000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+# Scratch database and keyword index; set before the application config is loaded
+scratch_dir = tempfile.mkdtemp()
+os.environ["DB_FILE"] = os.path.join(scratch_dir, "lpm.db")
+os.environ["CHUNK_KEYWORD_INDEX_PATH"] = os.path.join(scratch_dir, "chunk_keyword_index.db")
+
+from benchmark_utils import load_scratch_config, skip_package_init
+
+skip_package_init()
+load_scratch_config(scratch_dir)
+
+from sqlalchemy import text
+from lpm_kernel.common.repository.database_session import DatabaseSession
+from lpm_kernel.file_data.document_repository import DocumentRepository
+from lpm_kernel.file_data.models import ChunkModel
+
+CHUNK_TEXT = "The quick brown fox jumps over the lazy dog. " * 20
+
+
+def create_schema():
+    with DatabaseSession.session() as session:
+        session.execute(text("CREATE TABLE IF NOT EXISTS document (id INTEGER PRIMARY KEY AUTOINCREMENT, name VARCHAR(255))"))
+        session.execute(text(
+            "CREATE TABLE IF NOT EXISTS chunk (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "document_id INTEGER NOT NULL REFERENCES document(id), content TEXT NOT NULL, "
+            "has_embedding BOOLEAN DEFAULT 0, tags JSON, topic VARCHAR(255), create_time DATETIME)"
+        ))
+        session.execute(text("CREATE INDEX IF NOT EXISTS idx_chunk_document_id ON chunk (document_id)"))
+
+
+def new_document(name):
+    with DatabaseSession.session() as session:
+        return session.execute(
+            text("INSERT INTO document (name) VALUES (:name) RETURNING id"), {"name": name}
+        ).scalar()
+
+
+def make_chunks(n):
+    return [{"content": f"{i} {CHUNK_TEXT}"} for i in range(n)]
+
+
+def save_one_by_one(repository, document_id, chunks):
+    for chunk in chunks:
+        repository.save_chunk(ChunkModel(document_id=document_id, content=chunk["content"]))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run(n):
+    repository = DocumentRepository()
+    chunks = make_chunks(n)
+
+    doc_id = new_document(f"single-{n}")
+    single = timed(lambda: save_one_by_one(repository, doc_id, chunks))
+
+    doc_id = new_document(f"bulk-{n}")
+    bulk = timed(lambda: repository.save_chunks_bulk(doc_id, chunks))
+
+    def rechunk_single():
+        repository.delete_chunks_by_document(doc_id)
+        save_one_by_one(repository, doc_id, chunks)
+
+    rechunk_old = timed(rechunk_single)
+    rechunk_bulk = timed(lambda: repository.save_chunks_bulk(doc_id, chunks, replace=True))
+
+    print(
+        f"chunks={n:<6} per-chunk={single:8.3f}s bulk={bulk:7.3f}s ({single / bulk:5.1f}x)  "
+        f"re-chunk per-chunk={rechunk_old:8.3f}s bulk replace={rechunk_bulk:7.3f}s ({rechunk_old / rechunk_bulk:5.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-chunk vs bulk chunk persistence")
+    parser.add_argument("--sizes", default="100,1000,10000")
+    args = parser.parse_args()
+    create_schema()
+    for size in args.sizes.split(","):
+        run(int(size))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Embedding Model Cache Benchmark
+
+Compares per-query embedding latency when the SentenceTransformer model is
+constructed on every call (the old huggingface_strategy behavior) against the
+process-wide model registry.
+
+Usage:
+    python scripts/benchmark_embedding_model_cache.py \
+        --model sentence-transformers/all-MiniLM-L6-v2 --queries 20 --backend torch
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sentence_transformers import SentenceTransformer
+from lpm_kernel.common.strategy.strategy_huggingface import model_registry
+
+QUERIES = [
+    "What did I write about the trip to Hangzhou?",
+    "Summarize my notes on machine learning",
+    "When is my sister's birthday?",
+    "Which books did I plan to read this year?",
+    "What were the action items from last week's meeting?",
+]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def report(name, latencies):
+    print(
+        f"{name:<6} n={len(latencies):<4} "
+        f"mean={statistics.mean(latencies) * 1000:9.1f}ms "
+        f"p50={percentile(latencies, 0.5) * 1000:9.1f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:9.1f}ms"
+    )
+
+
+def run(model_name: str, queries: int, backend: str):
+    cold = []
+    for i in range(queries):
+        start = time.perf_counter()
+        SentenceTransformer(model_name).encode([QUERIES[i % len(QUERIES)]])
+        cold.append(time.perf_counter() - start)
+
+    model_registry.clear()
+    # The first registry call loads the model; it is reported separately
+    start = time.perf_counter()
+    model_registry.get(model_name, backend).encode([QUERIES[0]])
+    first = time.perf_counter() - start
+
+    warm = []
+    for i in range(queries):
+        start = time.perf_counter()
+        model_registry.get(model_name, backend).encode([QUERIES[i % len(QUERIES)]])
+        warm.append(time.perf_counter() - start)
+
+    print(f"model={model_name} backend={backend}")
+    report("cold", cold)
+    print(f"first  registry load + encode = {first * 1000:.1f}ms")
+    report("warm", warm)
+    print(f"speedup (mean) = {statistics.mean(cold) / statistics.mean(warm):.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold vs warm embedding latency")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--backend", default="torch", choices=["torch", "onnx", "int8"])
+    args = parser.parse_args()
+    run(args.model, args.queries, args.backend)
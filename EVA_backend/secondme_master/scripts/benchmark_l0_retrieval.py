@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+L0 Retrieval Benchmark
+
+Measures recall@k and latency of vector-only, keyword-only (BM25) and hybrid
+(RRF) L0 retrieval over the chunks of the uploaded documents. Queries are
+sampled from the chunks themselves: each query is a random span of one chunk
+and counts as a hit when that chunk is among the top k results.
+
+Run from the project root with the application's .env (database, embedding
+model and vector store) available.
+
+Usage:
+    python scripts/benchmark_l0_retrieval.py --queries 200 --top-k 3 --threshold 0.7
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from benchmark_utils import skip_package_init
+
+skip_package_init()
+
+from lpm_kernel.api.domains.kernel2.services.knowledge_service import KEYWORD_MIN_TERM_SHARE, L0KnowledgeRetriever
+from lpm_kernel.file_data.document_repository import DocumentRepository
+from lpm_kernel.file_data.embedding_service import EmbeddingService
+from lpm_kernel.file_data.keyword_index import get_chunk_keyword_index
+
+# Query span length in tokens (characters for CJK text, words otherwise)
+SPAN_CHARS = 12
+SPAN_WORDS = 6
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def sample_span(content: str, rng: random.Random) -> str:
+    words = content.split()
+    if len(words) > SPAN_WORDS * 2:
+        start = rng.randrange(len(words) - SPAN_WORDS)
+        return " ".join(words[start:start + SPAN_WORDS])
+    text = "".join(content.split())
+    if len(text) <= SPAN_CHARS:
+        return text
+    start = rng.randrange(len(text) - SPAN_CHARS)
+    return text[start:start + SPAN_CHARS]
+
+
+def report(name, hits, latencies):
+    print(
+        f"{name:<8} recall={hits / len(latencies):6.3f} "
+        f"mean={statistics.mean(latencies) * 1000:8.1f}ms "
+        f"p50={percentile(latencies, 0.5) * 1000:8.1f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:8.1f}ms"
+    )
+
+
+def run(n_queries: int, top_k: int, threshold: float, seed: int):
+    chunks = [chunk for chunk in DocumentRepository().list_chunk_texts() if chunk[2] and chunk[2].strip()]
+    if not chunks:
+        print("No chunks found, upload and process documents first")
+        return
+    rng = random.Random(seed)
+    samples = [rng.choice(chunks) for _ in range(n_queries)]
+    queries = [(sample_span(content, rng), content) for _, _, content in samples]
+
+    keyword_index = get_chunk_keyword_index()
+    keyword_index.ensure_built(DocumentRepository().list_chunk_texts)
+    embedding_service = EmbeddingService()
+    retrievers = {
+        "vector": L0KnowledgeRetriever(embedding_service, threshold, top_k, keyword_index, mode="vector"),
+        "hybrid": L0KnowledgeRetriever(embedding_service, threshold, top_k, keyword_index, mode="hybrid"),
+    }
+    print(f"chunks={len(chunks)} queries={n_queries} top_k={top_k} threshold={threshold} "
+          f"tokenizer={keyword_index.tokenizer_name}")
+
+    for name, retriever in retrievers.items():
+        hits, latencies = 0, []
+        for query, target in queries:
+            start = time.perf_counter()
+            results = retriever.search([query])[0]
+            latencies.append(time.perf_counter() - start)
+            hits += target in results
+        report(name, hits, latencies)
+
+    hits, latencies = 0, []
+    for query, target in queries:
+        start = time.perf_counter()
+        ranked = keyword_index.search(query, top_k, min_term_share=KEYWORD_MIN_TERM_SHARE)
+        contents = keyword_index.get_contents([chunk_id for chunk_id, _ in ranked])
+        latencies.append(time.perf_counter() - start)
+        hits += any(content == target for _, content in contents.values())
+    report("keyword", hits, latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall and latency of vector, keyword and hybrid L0 retrieval")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.queries, args.top_k, args.threshold, args.seed)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+"""
+L1 Note Loading Benchmark
+
+Counts database and vector store round-trips, and times them, when loading
+the inputs of extract_notes_from_documents for N documents:
+
+  per-doc  the old pattern: per document a document-embedding get, a chunk
+           query and one chunk-embedding get per chunk
+  batched  load_note_sources: one chunk query and one get per collection,
+           through the repository and embedding service calls that the
+           DocumentService loaders delegate to
+
+Runs on a scratch SQLite database and the in-process local vector store
+(or Chroma with --backend chroma).
+
+Usage:
+    python scripts/benchmark_l1_note_loading.py --sizes 100,1000,5000 --chunks-per-doc 5
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# Scratch database and keyword index; set before the application config is loaded
+scratch_dir = tempfile.mkdtemp()
+os.environ["DB_FILE"] = os.path.join(scratch_dir, "lpm.db")
+os.environ["CHUNK_KEYWORD_INDEX_PATH"] = os.path.join(scratch_dir, "chunk_keyword_index.db")
+
+from benchmark_utils import load_scratch_config, skip_package_init
+
+skip_package_init()
+load_scratch_config(scratch_dir)
+
+from sqlalchemy import event, text
+from lpm_kernel.common.repository.database_session import DatabaseSession
+from lpm_kernel.common.repository.local_vector_store import LocalVectorClient
+from lpm_kernel.file_data.document_repository import DocumentRepository
+from lpm_kernel.file_data.embedding_service import EmbeddingService
+
+DIMENSION = 384
+
+
+class CountingCollection:
+    """Counts get() calls on a collection"""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.gets = 0
+
+    def get(self, *args, **kwargs):
+        self.gets += 1
+        return self._collection.get(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+def open_collections(backend):
+    path = os.path.join(scratch_dir, "vectors")
+    metadata = {"hnsw:space": "cosine", "dimension": DIMENSION}
+    if backend == "chroma":
+        import chromadb
+
+        client = chromadb.PersistentClient(path=path)
+    else:
+        client = LocalVectorClient(path)
+    return (
+        client.create_collection("documents", metadata=metadata),
+        client.create_collection("document_chunks", metadata=metadata),
+    )
+
+
+def create_schema():
+    with DatabaseSession.session() as session:
+        session.execute(text("CREATE TABLE IF NOT EXISTS document (id INTEGER PRIMARY KEY AUTOINCREMENT, name VARCHAR(255))"))
+        session.execute(text(
+            "CREATE TABLE IF NOT EXISTS chunk (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "document_id INTEGER NOT NULL REFERENCES document(id), content TEXT NOT NULL, "
+            "has_embedding BOOLEAN DEFAULT 0, tags JSON, topic VARCHAR(255), create_time DATETIME)"
+        ))
+        session.execute(text("CREATE INDEX IF NOT EXISTS idx_chunk_document_id ON chunk (document_id)"))
+
+
+def populate(n_documents, chunks_per_doc, repository, document_collection, chunk_collection):
+    rng = np.random.default_rng(0)
+    document_ids = []
+    for i in range(n_documents):
+        with DatabaseSession.session() as session:
+            document_id = session.execute(
+                text("INSERT INTO document (name) VALUES (:name) RETURNING id"), {"name": f"doc-{i}"}
+            ).scalar()
+        chunk_ids = repository.save_chunks_bulk(
+            document_id, [{"content": f"chunk {j} of document {i}"} for j in range(chunks_per_doc)]
+        )
+        document_collection.add(
+            ids=[str(document_id)], embeddings=rng.standard_normal((1, DIMENSION)).astype(np.float32).tolist()
+        )
+        chunk_collection.add(
+            ids=[str(chunk_id) for chunk_id in chunk_ids],
+            embeddings=rng.standard_normal((len(chunk_ids), DIMENSION)).astype(np.float32).tolist(),
+            metadatas=[{"document_id": document_id} for _ in chunk_ids],
+        )
+        document_ids.append(document_id)
+    return document_ids
+
+
+def load_per_document(document_ids, repository, embedding_service):
+    loaded = 0
+    for document_id in document_ids:
+        embedding_service.get_document_embedding_by_document_id(document_id)
+        for chunk in repository.find_chunks(document_id):
+            if embedding_service.get_chunk_embedding_by_chunk_id(chunk.id) is not None:
+                loaded += 1
+    return loaded
+
+
+def load_batched(document_ids, repository, embedding_service):
+    # Same calls as kernel/l1/l1_manager.load_note_sources, minus the DocumentService pass-throughs
+    embedding_service.get_document_embeddings(document_ids)
+    chunks_by_document = repository.find_chunks_by_documents(document_ids)
+    chunk_embeddings = embedding_service.get_chunk_embeddings(
+        [chunk.id for chunks in chunks_by_document.values() for chunk in chunks]
+    )
+    return len(chunk_embeddings)
+
+
+def main(sizes, chunks_per_doc, backend):
+    DatabaseSession.initialize()
+    create_schema()
+    statements = {"count": 0}
+
+    def count_statement(*args):
+        statements["count"] += 1
+
+    event.listen(DatabaseSession._engine, "before_cursor_execute", count_statement)
+
+    document_collection, chunk_collection = (CountingCollection(c) for c in open_collections(backend))
+    # Only the collection accessors are exercised; skip model and config setup
+    embedding_service = object.__new__(EmbeddingService)
+    embedding_service.document_collection = document_collection
+    embedding_service.chunk_collection = chunk_collection
+    repository = DocumentRepository()
+
+    document_ids = []
+    for size in sizes:
+        document_ids += populate(
+            size - len(document_ids), chunks_per_doc, repository, document_collection, chunk_collection
+        )
+        for name, load in (
+            ("per-doc", lambda: load_per_document(document_ids, repository, embedding_service)),
+            ("batched", lambda: load_batched(document_ids, repository, embedding_service)),
+        ):
+            statements["count"] = 0
+            document_collection.gets = chunk_collection.gets = 0
+            start = time.perf_counter()
+            loaded = load()
+            elapsed = time.perf_counter() - start
+            print(
+                f"docs={size:<5} {name:<8} sql={statements['count']:<6} "
+                f"vector_gets={document_collection.gets + chunk_collection.gets:<6} "
+                f"chunks={loaded:<6} time={elapsed:8.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Round-trips of per-document vs batched L1 note loading")
+    parser.add_argument("--sizes", default="100,1000,5000")
+    parser.add_argument("--chunks-per-doc", type=int, default=5)
+    parser.add_argument("--backend", choices=["local", "chroma"], default="local")
+    args = parser.parse_args()
+    main(sorted(int(size) for size in args.sizes.split(",")), args.chunks_per_doc, args.backend)
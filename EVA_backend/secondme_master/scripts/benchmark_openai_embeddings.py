@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+"""
+OpenAI Embedding Client Check and Benchmark
+
+Runs OpenAIEmbeddingClient against a local stub /embeddings server and checks:
+- batching: every request stays within the item and token budgets, and the
+  result rows come back in input order
+- retries: 429 (with Retry-After) and 5xx responses are retried until the
+  batch succeeds, and a batch that keeps failing raises once retries run out
+- session reuse: all requests go over at most max_concurrency connections
+
+It then times the same input with one batch in flight versus concurrent
+batches; the stub adds a fixed delay per request to stand in for the
+provider's latency.
+
+Usage:
+    python scripts/benchmark_openai_embeddings.py --texts 2000 --latency-ms 20
+"""
+
+import argparse
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmark_utils import skip_package_init
+
+skip_package_init()
+
+from lpm_kernel.common.strategy.strategy_openai import OpenAIEmbeddingClient, count_tokens
+
+DIMENSION = 8
+
+
+class StubState:
+    """Requests seen by the stub and the failures it should inject"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = 0.0
+        self.fail_statuses = []
+        self.requests = []
+        self.connections = set()
+
+    def reset(self, fail_statuses=(), latency=0.0):
+        with self.lock:
+            self.fail_statuses = list(fail_statuses)
+            self.latency = latency
+            self.requests = []
+            self.connections = set()
+
+
+state = StubState()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one write; separate small writes stall on delayed ACKs
+    wbufsize = 1 << 16
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        with state.lock:
+            state.connections.add(self.client_address)
+            status = state.fail_statuses.pop(0) if state.fail_statuses else 200
+            state.requests.append((status, body["input"]))
+        if state.latency:
+            time.sleep(state.latency)
+
+        if status != 200:
+            payload = json.dumps({"error": {"message": f"stub status {status}"}}).encode("utf-8")
+        else:
+            # Row i of text "t<n> ..." is [n, i, 0, ...]; returned in reverse to exercise index ordering
+            data = [
+                {"index": i, "embedding": [float(text[1:].split(" ")[0]), float(i)] + [0.0] * (DIMENSION - 2)}
+                for i, text in enumerate(body["input"])
+            ]
+            payload = json.dumps({"data": data[::-1]}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(payload)
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def check(condition, message):
+    if not condition:
+        raise SystemExit(f"FAILED: {message}")
+    print(f"ok      {message}")
+
+
+def check_batching(endpoint, texts, max_items, max_tokens, concurrency):
+    state.reset()
+    client = OpenAIEmbeddingClient(endpoint, "sk-stub", "stub", max_tokens=max_tokens,
+                                   max_items=max_items, max_concurrency=concurrency)
+    result = client.embed(texts)
+    client.close()
+
+    batches = [batch for _, batch in state.requests]
+    check(sum(len(batch) for batch in batches) == len(texts), f"{len(texts)} texts sent in {len(batches)} requests")
+    check(max(len(batch) for batch in batches) <= max_items, f"every request has at most {max_items} items")
+    check(
+        all(len(batch) == 1 or sum(count_tokens(text) for text in batch) <= max_tokens for batch in batches),
+        f"every multi-item request stays within {max_tokens} tokens",
+    )
+    check(result.shape == (len(texts), DIMENSION), f"result shape is {result.shape}")
+    check((result[:, 0] == range(len(texts))).all(), "result rows are in input order")
+    check(len(state.connections) <= concurrency, f"{len(state.connections)} connection(s) used for {concurrency} workers")
+
+
+def check_retries(endpoint, texts):
+    state.reset(fail_statuses=[429, 429, 503])
+    client = OpenAIEmbeddingClient(endpoint, "sk-stub", "stub", max_items=len(texts), max_retries=3)
+    result = client.embed(texts)
+    statuses = [status for status, _ in state.requests]
+    check(statuses == [429, 429, 503, 200], f"429/429/503 retried until success: {statuses}")
+    check(len(state.connections) == 1, "retries reuse the pooled connection")
+    check(result.shape == (len(texts), DIMENSION), "retried batch returns every embedding")
+
+    state.reset(fail_statuses=[429] * 3)
+    client.max_retries = 2
+    try:
+        client.embed(texts)
+    except Exception as e:
+        check("429" in str(e), f"gives up after {client.max_retries} retries: {e}")
+    else:
+        check(False, "exhausted retries should raise")
+    client.close()
+
+
+def timed(endpoint, texts, max_items, concurrency):
+    client = OpenAIEmbeddingClient(endpoint, "sk-stub", "stub", max_items=max_items, max_concurrency=concurrency)
+    start = time.perf_counter()
+    client.embed(texts)
+    elapsed = time.perf_counter() - start
+    client.close()
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and time OpenAIEmbeddingClient against a stub server")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--max-items", type=int, default=64)
+    parser.add_argument("--max-tokens", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    # Variable-length texts so both the item and the token budget cut batches
+    texts = [f"t{i} " + "x" * (i % 100) for i in range(args.texts)]
+
+    check_batching(endpoint, texts, args.max_items, args.max_tokens, args.concurrency)
+    check_retries(endpoint, texts[:10])
+
+    state.reset(latency=args.latency_ms / 1000)
+    batches = math.ceil(args.texts / args.max_items)
+    sequential = timed(endpoint, texts, args.max_items, 1)
+    concurrent = timed(endpoint, texts, args.max_items, args.concurrency)
+    print(
+        f"{args.texts} texts in {batches} batches, stub latency {args.latency_ms:.0f}ms: "
+        f"1 in flight {sequential * 1000:.0f}ms, {args.concurrency} in flight {concurrent * 1000:.0f}ms "
+        f"({sequential / concurrent:.1f}x)"
+    )
+    server.shutdown()
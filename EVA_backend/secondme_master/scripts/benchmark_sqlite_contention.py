@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+SQLite Contention Benchmark
+
+Runs a mixed read/write workload from several threads against a scratch
+SQLite database and compares:
+
+  default  one engine without pragmas (the old DatabaseSession setup)
+  tuned    the DB_SQLITE_PROFILE pragmas on one engine, as DatabaseSession
+           now sets it up
+
+Writers insert chunk-like rows in small transactions; readers run the
+indexed lookups and counts that the chat and progress endpoints issue.
+
+Usage:
+    python scripts/benchmark_sqlite_contention.py --readers 8 --writers 4 --seconds 10
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, text
+from lpm_kernel.common.repository.database_session import apply_sqlite_pragmas, sqlite_pragmas
+
+ROWS_PER_WRITE = 20
+CONTENT = "x" * 512
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def make_engine(db_url, mode, profile, pool_size):
+    engine = create_engine(db_url, pool_size=pool_size, max_overflow=20)
+    if mode == "tuned":
+        apply_sqlite_pragmas(engine, sqlite_pragmas({"sqlite_profile": profile}))
+    return engine
+
+
+def run(mode, n_readers, n_writers, seconds, profile):
+    db_path = os.path.join(tempfile.mkdtemp(), "contention.db")
+    db_url = f"sqlite:///{db_path}"
+    setup = create_engine(db_url)
+    with setup.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE chunk (id INTEGER PRIMARY KEY, document_id INTEGER, content TEXT, has_embedding INTEGER)"
+        ))
+        conn.execute(text("CREATE INDEX idx_chunk_document ON chunk (document_id)"))
+    setup.dispose()
+
+    engine = make_engine(db_url, mode, profile, n_readers + n_writers)
+    deadline = time.perf_counter() + seconds
+    results = {"read": [], "write": [], "errors": 0}
+    lock = threading.Lock()
+
+    def write_loop():
+        rng = random.Random()
+        latencies, errors = [], 0
+        while time.perf_counter() < deadline:
+            document_id = rng.randrange(100)
+            start = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    conn.execute(
+                        text("INSERT INTO chunk (document_id, content, has_embedding) VALUES (:d, :c, 0)"),
+                        [{"d": document_id, "c": CONTENT}] * ROWS_PER_WRITE,
+                    )
+                    conn.execute(
+                        text("UPDATE chunk SET has_embedding = 1 WHERE document_id = :d"), {"d": document_id}
+                    )
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+        with lock:
+            results["write"].extend(latencies)
+            results["errors"] += errors
+
+    def read_loop():
+        rng = random.Random()
+        latencies, errors = [], 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(
+                        text("SELECT id, content FROM chunk WHERE document_id = :d"), {"d": rng.randrange(100)}
+                    ).fetchall()
+                    conn.execute(text("SELECT COUNT(*) FROM chunk WHERE has_embedding = 0")).scalar()
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+        with lock:
+            results["read"].extend(latencies)
+            results["errors"] += errors
+
+    threads = [threading.Thread(target=write_loop) for _ in range(n_writers)]
+    threads += [threading.Thread(target=read_loop) for _ in range(n_readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    for kind in ("read", "write"):
+        latencies = results[kind]
+        mean = statistics.mean(latencies) * 1000 if latencies else 0.0
+        print(
+            f"{mode:<8} {kind:<5} ops/s={len(latencies) / seconds:8.1f} mean={mean:8.2f}ms "
+            f"p95={percentile(latencies, 0.95) * 1000:8.2f}ms p99={percentile(latencies, 0.99) * 1000:8.2f}ms"
+        )
+    print(f"{mode:<8} errors={results['errors']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mixed read/write SQLite contention benchmark")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--profile", default="performance")
+    parser.add_argument("--modes", default="default,tuned")
+    args = parser.parse_args()
+    for mode in args.modes.split(","):
+        run(mode, args.readers, args.writers, args.seconds, args.profile)
@@ -0,0 +1,48 @@
+"""
+Shared helpers for the scripts/benchmark_*.py scripts
+"""
+
+import importlib
+import sys
+import types
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# lpm_kernel.api's __init__ imports and registers every route blueprint (Flask
+# app, all domains); benchmarks only need individual services and repositories
+ROUTE_PACKAGES = ("lpm_kernel.api", "lpm_kernel.api.domains")
+
+
+def add_project_root():
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def skip_package_init(*packages: str):
+    """Register packages as bare modules so their submodules import without running the package __init__"""
+    add_project_root()
+    for name in packages or ROUTE_PACKAGES:
+        if name in sys.modules:
+            continue
+        parent_name, _, child = name.rpartition(".")
+        module = types.ModuleType(name)
+        module.__path__ = [str(PROJECT_ROOT.joinpath(*name.split(".")))]
+        module.__package__ = name
+        sys.modules[name] = module
+        if parent_name:
+            setattr(importlib.import_module(parent_name), child, module)
+
+
+def load_scratch_config(scratch_dir: str):
+    """Load Config from an empty env file in scratch_dir instead of the deployment .env
+
+    Settings then come from the process environment only, so benchmarks set
+    DB_FILE and friends in os.environ before calling this.
+    """
+    add_project_root()
+    from lpm_kernel.configs.config import Config
+
+    env_file = Path(scratch_dir) / ".env"
+    env_file.touch()
+    return Config.from_env(str(env_file))
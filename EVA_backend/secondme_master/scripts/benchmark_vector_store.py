@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+Vector Store Benchmark
+
+Compares insert throughput and query latency of the local vector store
+(flat NumPy scan and, when hnswlib is installed, HNSW) against ChromaDB on
+synthetic embeddings. Chroma is skipped when chromadb is not installed.
+
+Usage:
+    python scripts/benchmark_vector_store.py --sizes 10000 100000 1000000 \
+        --dim 384 --queries 200 --backends flat hnsw chroma
+"""
+
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from lpm_kernel.common.repository.local_vector_store import LocalVectorClient
+
+INSERT_BATCH_SIZE = 5000
+DOCUMENTS_PER_FILTER_VALUE = 100
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def make_data(size: int, dim: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((size, dim), dtype=np.float32)
+
+
+def open_collection(backend: str, path: str, dim: int):
+    metadata = {"hnsw:space": "cosine", "dimension": dim}
+    if backend == "chroma":
+        import chromadb
+
+        return chromadb.PersistentClient(path=path).create_collection(name="bench", metadata=metadata)
+    return LocalVectorClient(path, index_mode=backend).create_collection("bench", metadata)
+
+
+def insert(backend: str, collection, vectors: np.ndarray) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), INSERT_BATCH_SIZE):
+        batch = vectors[offset:offset + INSERT_BATCH_SIZE]
+        ids = [str(i) for i in range(offset, offset + len(batch))]
+        collection.add(
+            ids=ids,
+            # the local store takes arrays directly; Chroma expects lists
+            embeddings=batch.tolist() if backend == "chroma" else batch,
+            documents=[f"chunk {i}" for i in ids],
+            metadatas=[{"document_id": str(int(i) // DOCUMENTS_PER_FILTER_VALUE)} for i in ids],
+        )
+    return time.perf_counter() - start
+
+
+def query_latencies(collection, queries: np.ndarray, top_k: int, where=None):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        collection.query(query_embeddings=[query.tolist()], n_results=top_k, where=where)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(backend: str, size: int, insert_seconds: float, name: str, latencies):
+    print(
+        f"{backend:<7} n={size:<8} insert={size / insert_seconds:9.0f}/s "
+        f"{name:<9} mean={statistics.mean(latencies) * 1000:8.2f}ms "
+        f"p50={percentile(latencies, 0.5) * 1000:8.2f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:8.2f}ms"
+    )
+
+
+def run(sizes, dim: int, n_queries: int, top_k: int, backends):
+    for size in sizes:
+        vectors = make_data(size, dim)
+        queries = make_data(n_queries, dim, seed=1)
+        where = {"document_id": str(size // DOCUMENTS_PER_FILTER_VALUE // 2)}
+        for backend in backends:
+            if backend == "chroma":
+                try:
+                    import chromadb  # noqa: F401
+                except ImportError:
+                    print(f"chroma  n={size:<8} skipped: chromadb not installed")
+                    continue
+            path = tempfile.mkdtemp(prefix=f"bench_{backend}_")
+            try:
+                collection = open_collection(backend, path, dim)
+                insert_seconds = insert(backend, collection, vectors)
+                report(backend, size, insert_seconds, "query", query_latencies(collection, queries, top_k))
+                report(backend, size, insert_seconds, "filtered", query_latencies(collection, queries, top_k, where))
+            finally:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local vector store vs ChromaDB insert and query latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--backends", nargs="+", default=["flat", "hnsw", "chroma"],
+                        choices=["flat", "hnsw", "chroma"])
+    args = parser.parse_args()
+    run(args.sizes, args.dim, args.queries, args.top_k, args.backends)
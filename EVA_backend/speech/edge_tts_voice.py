@@ -30,8 +30,8 @@ class EdgeTTSVoice:
                 # 不传递其他无效参数
             )
             
-            # 添加音频数据校验
-            audio_data = b''
+            # 添加音频数据校验；分块收集后一次性拼接，避免重复拷贝
+            audio_chunks = []
             async for chunk in communicate.stream():
                 if isinstance(chunk, Dict) and chunk.get("type") == "audio":
                     audio_chunk = chunk.get("data")
@@ -39,8 +39,9 @@ class EdgeTTSVoice:
                         continue
                     if not isinstance(audio_chunk, bytes):
                         raise TypeError(f"无效的音频数据类型: {type(audio_chunk)}")
-                    audio_data += audio_chunk
-                    
+                    audio_chunks.append(audio_chunk)
+
+            audio_data = b"".join(audio_chunks)
             if len(audio_data) < 1024:  # 最小音频文件大小检查
                 raise ValueError("生成的音频数据过小")
                 
@@ -1,12 +1,16 @@
 from speech.edge_tts_voice import EdgeTTSVoice
+from speech.tts_cache import tts_audio_cache, make_cache_key
 from logs.logs import logger
 import os
 import uuid
+import asyncio
 from django.conf import settings
-from typing import List, Optional
-import time
+from typing import Dict, List, Optional
 import traceback
 
+# 默认语速
+DEFAULT_RATE = "+0%"
+
 class SpeechManager:
     def __init__(self):
         """初始化 TTS 引擎"""
@@ -50,39 +54,35 @@ class SpeechManager:
                     raise ValueError("输入文本过短")
                 logger.debug(f"SpeechManager: 生成语音，文本长度: {len(text)}字符")
                 logger.info(f"[TTS] SpeechManager: 生成语音请求，文本: '{text}', voice_index: {voice_index}, voice: {voice}")
+                # 相同 (文本, 语音, 语速) 直接复用已合成的音频，跳过 EdgeTTS 请求
+                cache_key = make_cache_key(text, voice, DEFAULT_RATE)
+                audio_url = await tts_audio_cache.get(cache_key)
+                if audio_url:
+                    logger.info(f"[TTS] SpeechManager: 命中语音缓存，URL: {audio_url}")
+                    return audio_url
                 audio_data = await self.tts_engine.generate_audio(
                     text,
-                    rate="+0%",
+                    rate=DEFAULT_RATE,
                     voice=voice
                 )
                 logger.info(f"[TTS] SpeechManager: 语音合成返回数据大小: {len(audio_data) if isinstance(audio_data, bytes) else '无效'} bytes")
                 if not isinstance(audio_data, bytes) or len(audio_data) < 2048:
                     raise ValueError("无效的音频数据或文件过小")
-                file_name = f"{uuid.uuid4()}.mp3"  # 统一保存为 .mp3 文件
-                file_path = os.path.join(settings.TTS_OUTPUT_DIR, file_name)
-                with open(file_path, "wb") as f:
-                    f.write(audio_data)
-                logger.info(f"[TTS] SpeechManager: 音频文件已写入: {file_path}")
-                start = time.time()
-                while not os.path.exists(file_path):
-                    if time.time() - start > 2.0:
-                        logger.error(f"SpeechManager: 语音文件写入超时: {file_path}")
-                        return None
-                    time.sleep(0.1)
-                file_size = os.path.getsize(file_path)
-                if file_size < 2048:
-                    raise ValueError(f"[TTS] SpeechManager: 语音文件过小，路径: {file_path}，大小: {file_size} 字节")
-                audio_url = os.path.join(settings.TTS_URL_PREFIX, file_name)
-                logger.info(f"[TTS] SpeechManager: 音频文件已保存，URL: {audio_url}，路径: {file_path}，大小: {file_size} 字节，输入文本: {text}，voice_index: {voice_index}，voice: {voice}")
+                audio_url = await tts_audio_cache.put(cache_key, audio_data)
+                logger.info(f"[TTS] SpeechManager: 音频文件已保存，URL: {audio_url}，大小: {len(audio_data)} 字节，输入文本: {text}，voice_index: {voice_index}，voice: {voice}")
                 return str(audio_url)
             except Exception as e:
                 logger.error(f"[TTS] SpeechManager: 语音生成失败（第{attempt+1}次）- {str(e)}")
                 logger.error(traceback.format_exc())
                 if attempt < max_retries - 1:
-                    time.sleep(0.5)
+                    await asyncio.sleep(0.5)
                 else:
                     return None
 
+    def get_cache_stats(self) -> Dict:
+        """获取语音缓存统计信息（命中/未命中/占用字节）"""
+        return tts_audio_cache.get_stats()
+
     async def save_to_file(self, audio_data: bytes) -> str:
         """
         存储音频数据到文件并返回文件的 URL。
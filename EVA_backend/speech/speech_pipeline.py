@@ -0,0 +1,143 @@
+# EVA_backend/speech/speech_pipeline.py
+
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+from logs.logs import logger
+
+# 句末标点：中文句号/问号/叹号/分号/省略号，英文 ! ? ; 以及换行
+SENTENCE_END_CHARS = "。！？；…!?;\n"
+# 英文句号需后接空白才视为句末，避免切开 3.14、e.g. 之类的文本
+ENGLISH_PERIOD = "."
+# 句末标点后可能紧跟的右引号/右括号，归入当前句
+TRAILING_CLOSERS = "”’\"'」』）)"
+
+# 最短分段字数，过短的句子与下一句合并，避免合成出的音频过小
+DEFAULT_MIN_SEGMENT_CHARS = 8
+# 同时进行的语音合成数
+DEFAULT_MAX_CONCURRENCY = 3
+
+
+class SentenceSplitter:
+    """增量分句器
+
+    按中英文句末标点切分流式到达的文本，不完整的句子留在缓冲区，
+    直到后续文本补全或调用 flush。
+    """
+
+    def __init__(self, min_chars: int = DEFAULT_MIN_SEGMENT_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """输入文本，返回已完整的句子列表"""
+        self._buffer += text
+        sentences = []
+        start = 0
+        index = 0
+        length = len(self._buffer)
+        while index < length:
+            char = self._buffer[index]
+            is_end = char in SENTENCE_END_CHARS
+            if char == ENGLISH_PERIOD:
+                if index + 1 >= length:
+                    # 还不知道后面是不是空白，等待更多文本
+                    break
+                is_end = self._buffer[index + 1].isspace()
+            if is_end:
+                end = index + 1
+                while end < length and self._buffer[end] in TRAILING_CLOSERS:
+                    end += 1
+                if end >= length and self._buffer[index] != "\n":
+                    # 标点后可能还有右引号未到达，暂不切分
+                    break
+                sentence = self._buffer[start:end].strip()
+                if len(sentence) >= self.min_chars:
+                    sentences.append(sentence)
+                    start = end
+                index = end
+                continue
+            index += 1
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """流结束：返回缓冲区剩余文本"""
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return rest or None
+
+
+class SpeechPipeline:
+    """分句语音合成流水线
+
+    文本到达时按句切分，使用信号量限制并发合成，
+    并保证按句子顺序通过 on_segment 回调输出音频 URL，
+    使前端在第一句合成完成后即可开始播放。
+    """
+
+    def __init__(
+        self,
+        speech_manager,
+        voice_index: int = 0,
+        on_segment: Optional[Callable[[int, Optional[str], str], Awaitable[None]]] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        min_chars: int = DEFAULT_MIN_SEGMENT_CHARS,
+    ):
+        self.speech_manager = speech_manager
+        self.voice_index = voice_index
+        self.on_segment = on_segment
+        self._splitter = SentenceSplitter(min_chars=min_chars)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: List[asyncio.Task] = []
+        self._texts: List[str] = []
+        self._results: Dict[int, Optional[str]] = {}
+        self._next_to_emit = 0
+        self._emit_lock = asyncio.Lock()
+
+    def feed(self, text: str) -> None:
+        """输入增量文本，完整的句子立即提交合成"""
+        for sentence in self._splitter.feed(text):
+            self._submit(sentence)
+
+    async def finish(self) -> List[Optional[str]]:
+        """提交剩余文本并等待全部分段合成完成，按顺序返回音频 URL"""
+        rest = self._splitter.flush()
+        if rest:
+            self._submit(rest)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        return [self._results.get(index) for index in range(len(self._texts))]
+
+    def cancel(self) -> None:
+        """取消尚未完成的合成任务"""
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+
+    def _submit(self, sentence: str) -> None:
+        index = len(self._texts)
+        self._texts.append(sentence)
+        self._tasks.append(asyncio.create_task(self._synthesize(index, sentence)))
+
+    async def _synthesize(self, index: int, sentence: str) -> None:
+        audio_url = None
+        try:
+            async with self._semaphore:
+                audio_url = await self.speech_manager.generate_speech(sentence, voice_index=self.voice_index)
+        except Exception as e:
+            logger.error(f"❌ 分段语音合成失败 (segment={index}): {str(e)}")
+        self._results[index] = audio_url
+        await self._emit_ready()
+
+    async def _emit_ready(self) -> None:
+        """按顺序输出已完成的分段，前序分段未完成时等待"""
+        async with self._emit_lock:
+            while self._next_to_emit in self._results:
+                index = self._next_to_emit
+                self._next_to_emit += 1
+                if self.on_segment is None:
+                    continue
+                try:
+                    await self.on_segment(index, self._results[index], self._texts[index])
+                except Exception as e:
+                    logger.error(f"❌ 分段语音推送失败 (segment={index}): {str(e)}")
@@ -5,12 +5,15 @@ import os
 import time
 import logging
 
+from speech.tts_cache import CACHE_FILE_PATTERN
+
 logger = logging.getLogger(__name__)
 
 @shared_task
 def clean_tts_files():
     """
     定期清理过期的 TTS 语音文件（超过 24 小时）。
+    TTS 音频缓存文件（<sha256>.mp3）由缓存按 LRU 淘汰，这里跳过。
     """
     tts_folder = "/app/media/tts_output"
     expiration_time = 24 * 3600  # 24 小时（秒）
@@ -23,6 +26,8 @@ def clean_tts_files():
     deleted_files = []
 
     for filename in os.listdir(tts_folder):
+        if CACHE_FILE_PATTERN.match(filename):
+            continue
         file_path = os.path.join(tts_folder, filename)
         try:
             if os.path.isfile(file_path):
@@ -0,0 +1,163 @@
+# EVA_backend/speech/tts_cache.py
+
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from typing import Dict, Optional
+from django.conf import settings
+from logs.logs import logger
+
+# 缓存文件名为 64 位 sha256 十六进制串 + .mp3
+CACHE_FILE_PATTERN = re.compile(r"^[0-9a-f]{64}\.mp3$")
+# 默认缓存总大小上限（字节）
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def normalize_text(text: str) -> str:
+    """规范化文本：去掉首尾空白并折叠连续空白，使仅空白不同的文本命中同一缓存"""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def make_cache_key(text: str, voice: str, rate: str) -> str:
+    """根据 (规范化文本, 语音, 语速) 计算内容寻址的缓存键"""
+    raw = "\x00".join([voice, rate, normalize_text(text)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TTSAudioCache:
+    """内容寻址的 TTS 音频磁盘缓存
+
+    音频以 <sha256>.mp3 保存在 TTS_OUTPUT_DIR 下，可直接通过 TTS_URL_PREFIX 访问；
+    内存中维护 LRU 索引（键 -> 文件大小），总大小超过上限时淘汰最久未用的文件；
+    缓存文件只由本类淘汰，定期清理任务 clean_tts_files 会跳过它们。
+    写入先落到同目录临时文件再原子重命名，读取方不会看到半写入的文件。
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    @property
+    def directory(self) -> str:
+        if self._directory is None:
+            self._directory = str(settings.TTS_OUTPUT_DIR)
+        return self._directory
+
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is None:
+            self._max_bytes = int(getattr(settings, "TTS_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        return self._max_bytes
+
+    def file_name(self, key: str) -> str:
+        return f"{key}.mp3"
+
+    def url_for(self, key: str) -> str:
+        return f"{settings.TTS_URL_PREFIX}{self.file_name(key)}"
+
+    def _load_index(self) -> None:
+        """首次使用时扫描目录重建索引，按修改时间排序近似 LRU 顺序"""
+        if self._loaded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and CACHE_FILE_PATTERN.match(entry.name):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        self._loaded = True
+        logger.info(f"[TTSCache] 索引加载完成: {len(self._index)} 项, {self._total_bytes} 字节")
+
+    async def get(self, key: str) -> Optional[str]:
+        """命中时返回音频 URL 并刷新 LRU 顺序，未命中返回 None"""
+        async with self._lock:
+            self._load_index()
+            if key in self._index:
+                path = os.path.join(self.directory, self.file_name(key))
+                if os.path.exists(path):
+                    self._index.move_to_end(key)
+                    # 刷新修改时间：重启后按修改时间重建的 LRU 顺序与实际使用一致
+                    try:
+                        os.utime(path)
+                    except OSError:
+                        pass
+                    self._stats["hits"] += 1
+                    return self.url_for(key)
+                # 文件被外部删除，索引同步移除
+                self._total_bytes -= self._index.pop(key)
+            self._stats["misses"] += 1
+            return None
+
+    async def put(self, key: str, audio_data: bytes) -> str:
+        """原子写入音频并登记索引，返回音频 URL"""
+        path = os.path.join(self.directory, self.file_name(key))
+        await asyncio.to_thread(self._write_atomic, path, audio_data)
+        async with self._lock:
+            self._load_index()
+            if key in self._index:
+                self._total_bytes -= self._index.pop(key)
+            self._index[key] = len(audio_data)
+            self._total_bytes += len(audio_data)
+            self._stats["writes"] += 1
+            evicted = self._evict_if_needed()
+        if evicted:
+            await asyncio.to_thread(self._remove_files, evicted)
+        return self.url_for(key)
+
+    def _write_atomic(self, path: str, audio_data: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio_data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _evict_if_needed(self) -> list:
+        """超过容量上限时按 LRU 顺序淘汰，返回待删除的文件路径"""
+        evicted = []
+        # 至少保留最新写入的一项
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self._stats["evictions"] += 1
+            evicted.append(os.path.join(self.directory, self.file_name(key)))
+        return evicted
+
+    def _remove_files(self, paths: list) -> None:
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"[TTSCache] 删除缓存文件失败 {path}: {e}")
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计信息"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": len(self._index),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# 全局 TTS 音频缓存实例
+tts_audio_cache = TTSAudioCache()
@@ -1,7 +1,8 @@
 # speech/urls.py
 from django.urls import path
-from .views import tts_generation
+from .views import tts_generation, tts_cache_stats
 
 urlpatterns = [
     path("tts/", tts_generation, name="tts-generation"),
+    path("tts/cache/stats/", tts_cache_stats, name="tts-cache-stats"),
 ]
@@ -15,3 +15,9 @@ def tts_generation(request):
         return JsonResponse({"audio_url": audio_url})
     
     return JsonResponse({"error": "只支持 POST 请求"}, status=405)
+
+
+def tts_cache_stats(request):
+    """语音缓存统计：命中/未命中次数与占用字节"""
+    from .tts_cache import tts_audio_cache
+    return JsonResponse(tts_audio_cache.get_stats())
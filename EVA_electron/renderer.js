@@ -5,6 +5,11 @@ let outputField;
 let sendButton;
 let apiSelector;
 const fixedVoiceIndex = 0;
+// 流式回复中的消息气泡，按 message_id 索引
+const streamingMessages = new Map();
+// 分段语音播放队列
+const speechQueue = [];
+let speechPlaying = false;
 
 const CONNECTION_STATE = {
     maxReconnectAttempts: 5,
@@ -127,6 +132,44 @@ function renderMessage(content, type = "system") {
     outputField.scrollTop = outputField.scrollHeight;
 }
 
+// 分段语音按到达顺序依次播放
+function enqueueSpeechSegment(audioUrl) {
+    if (!audioUrl) return;
+    speechQueue.push(audioUrl);
+    if (!speechPlaying) {
+        playNextSpeechSegment();
+    }
+}
+
+function playNextSpeechSegment() {
+    const audioUrl = speechQueue.shift();
+    if (!audioUrl) {
+        speechPlaying = false;
+        return;
+    }
+    speechPlaying = true;
+    const audio = new Audio(`${getBackendBaseUrl()}${audioUrl}`);
+    audio.onended = playNextSpeechSegment;
+    audio.onerror = playNextSpeechSegment;
+    audio.play().catch(error => {
+        console.error("❌ 分段音频播放失败:", error);
+        playNextSpeechSegment();
+    });
+}
+
+// 将流式增量文本追加到对应的助手消息气泡
+function appendStreamingDelta(messageId, delta) {
+    if (!delta) return;
+    let messageContent = streamingMessages.get(messageId);
+    if (!messageContent) {
+        renderMessage("", "assistant");
+        messageContent = outputField.lastElementChild.querySelector(".message-content");
+        streamingMessages.set(messageId, messageContent);
+    }
+    messageContent.textContent += delta;
+    outputField.scrollTop = outputField.scrollHeight;
+}
+
 // 健康检查函数：只在真正网络断开、接口500/超时等异常时才弹窗
 async function checkBackendHealth() {
     try {
@@ -418,8 +461,20 @@ async function handleWebSocketMessage(event) {
             case "error":
                 renderMessage(data.message, "error");
                 break;
+            case "speech_segment":
+                enqueueSpeechSegment(data.speech_url);
+                break;
+            case "response_delta":
+                appendStreamingDelta(data.message_id, data.delta);
+                break;
             case "response":
-                renderMessage(data.response, "assistant");
+                if (streamingMessages.has(data.message_id)) {
+                    // 用完整文本覆盖流式片段
+                    streamingMessages.get(data.message_id).textContent = data.response;
+                    streamingMessages.delete(data.message_id);
+                } else {
+                    renderMessage(data.response, "assistant");
+                }
                 if (data.speech_url) {
                     playAudioFromURL(data.speech_url);
                 }